@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from app.libs.sync_metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Exposes the sync metrics in the Prometheus text format for scraping.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,394 +1,604 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-import requests
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import httpx
 import json
 import os
-from app.libs.database_management import get_mysql_connection
+from app.libs import sync_metrics
+from app.libs.case_counts import bump_data_generation_now
+from app.libs.lifecycle_reclassification import reclassify_if_outdated
+from app.libs.case_mapping import map_case_payload
+from app.libs.case_payload import canonical_json, decode_raw_detail, encode_raw_detail, payload_digest
+from app.libs.case_writer import CaseWriteBuffer
+from app.libs.database_management import SYNC_POOL, get_mysql_connection, get_pool_stats
+from app.libs.negative_cache import NonInsuranceCaseCache
+from app.libs.presence_sweep import sweep_presence_flags
+from app.libs.repair_case_schema import RepairCaseSchema, get_repair_case_schema, invalidate_repair_case_schema
+from app.libs.repairline_client import RepairlineClient
+from app.libs.sync_checkpoints import RUN_STALE_SECONDS, SyncRunCheckpoint, find_interrupted_run
+from app.libs.sync_coordination import (
+    STATUS_PUBLISH_INTERVAL,
+    SyncCoordinationError,
+    SyncCoordinator,
+    read_shared_sync_status,
+)
+from app.libs.sync_events import SyncEventBroadcaster
+from app.libs.sync_tiers import select_hot_case_ids
+from apscheduler.schedulers.background import BackgroundScheduler
+from app.libs.sync_pipeline import PipelineStage, SyncPipeline
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import threading
 from typing import Optional
 
-router = APIRouter()
 
-# Get credentials from environment variables
-REPAIRLINE_API_USERNAME = os.getenv("REPAIRLINE_API_USERNAME")
-REPAIRLINE_API_PASSWORD = os.getenv("REPAIRLINE_API_PASSWORD")
-REPAIRLINE_API_BASE_URL = "http://api.system.repairline.de/v2/"
+@asynccontextmanager
+async def _lifespan(app):
+    # Merged into the app's lifespan by include_router
+    await asyncio.to_thread(resume_interrupted_sync_on_startup)
+    start_sync_scheduler()
+    try:
+        yield
+    finally:
+        stop_sync_scheduler()
+
 
-# Configuration
-MAX_WORKERS = 10  # Number of parallel requests
-REQUEST_TIMEOUT = 30  # Reduced from 60 seconds
-MAX_RETRIES = 3  # Number of retries for failed requests
-RETRY_DELAY = 1  # Seconds to wait between retries
+router = APIRouter(lifespan=_lifespan)
 
+# Configuration - each pipeline stage has its own concurrency
+MAX_CONCURRENT_FETCHES = int(os.getenv("SYNC_MAX_CONCURRENT_FETCHES", "200"))  # Ceiling for in-flight Repairline requests, the actual limit adapts
+DIFF_WORKERS = int(os.getenv("SYNC_DIFF_WORKERS", "10"))  # Threads comparing cases with the DB (each holds a pooled connection)
+MAP_WORKERS = int(os.getenv("SYNC_MAP_WORKERS", "2"))  # Threads mapping payloads to rows
+PERSIST_WORKERS = int(os.getenv("SYNC_PERSIST_WORKERS", "1"))  # Threads handing rows to the write buffer
+SYNC_EVENTS_INTERVAL = float(os.getenv("SYNC_EVENTS_INTERVAL", "1.0"))  # Seconds between pushed progress snapshots
 
-def _fetch_case_with_retry(case_id: int, max_retries: int = MAX_RETRIES) -> Optional[dict]:
+# Scheduled syncs - opt-in, enable them in one process only. The sync lock
+# still keeps a second scheduler from starting an overlapping sync.
+SYNC_SCHEDULE_ENABLED = os.getenv("SYNC_SCHEDULE_ENABLED", "false").lower() == "true"
+SYNC_HOT_INTERVAL_MINUTES = int(os.getenv("SYNC_HOT_INTERVAL_MINUTES", "15"))  # Refresh of open, recently changed cases
+SYNC_FULL_INTERVAL_HOURS = int(os.getenv("SYNC_FULL_INTERVAL_HOURS", "24"))  # Full sync, also refreshes closed and stale cases
+
+
+async def _fetch_case(
+    client: RepairlineClient,
+    case_id: int,
+    negative_cache: Optional[NonInsuranceCaseCache] = None,
+):
     """
-    Fetches case data from API with retry logic.
-    Returns the case data dict or None if all retries failed.
+    Fetch stage: loads the case detail and checks for an active insurance.
+    Returns the work item for the next stage or a final result string.
     """
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    
-    for attempt in range(max_retries):
-        try:
-            detail_response = requests.get(
-                f"{REPAIRLINE_API_BASE_URL}cases/{case_id}",
-                auth=(REPAIRLINE_API_USERNAME, REPAIRLINE_API_PASSWORD),
-                headers=headers,
-                timeout=REQUEST_TIMEOUT,
-            )
-            detail_response.raise_for_status()
-            return detail_response.json()
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                print(f"[{case_id}] Request timeout (attempt {attempt + 1}/{max_retries}), retrying...")
-                time.sleep(RETRY_DELAY * (attempt + 1))  # Exponential backoff
-            else:
-                print(f"[{case_id}] Request timeout after {max_retries} attempts.")
-                return None
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                print(f"[{case_id}] Request error (attempt {attempt + 1}/{max_retries}): {e}, retrying...")
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                print(f"[{case_id}] Request failed after {max_retries} attempts: {e}")
-                return None
-    
-    return None
+    # 1. Fetch detailed data with retry logic
+    case_data = await client.fetch_case(case_id)
+    if not case_data:
+        return "error_fetch_failed"
+
+    print(f"[{case_id}] Fetched raw API data.")
+
+    # 2. Check if it's an insurance case
+    insurance_data = case_data.get('Insurance') # Can be None
+    if not (insurance_data and insurance_data.get('InsuranceIsActivated')):
+        print(f"[{case_id}] Is not an insurance case or Insurance object is null/inactive. Skipping.")
+        if negative_cache:
+            negative_cache.record_not_insurance(case_id)
+        return "skipped_not_insurance"
 
+    if negative_cache:
+        negative_cache.record_insurance(case_id)
 
-def _process_single_case(case_id: int, start_time_utc: datetime):
+    print(f"[{case_id}] Is an insurance case. Proceeding.")
+    return {"case_id": case_id, "case_data": case_data}
+
+
+def _legacy_payload_digest(cnx, case_id: int, schema: RepairCaseSchema) -> Optional[bytes]:
+    """
+    Computes the digest of a stored rawApiDetail that has no rawApiDetailHash yet.
+    Returns None if the stored payload cannot be parsed.
+    """
+    raw_detail_expr, payload_join = schema.raw_detail_source()
+    cursor = cnx.cursor(dictionary=True)
+    cursor.execute(
+        f"SELECT {raw_detail_expr} AS rawApiDetail FROM repair_cases r {payload_join} WHERE r.caseId = %s",
+        (case_id,),
+    )
+    record = cursor.fetchone()
+    cursor.close()
+
+    try:
+        existing_raw_detail = decode_raw_detail((record or {}).get('rawApiDetail')) or '{}'
+        return payload_digest(canonical_json(json.loads(existing_raw_detail)))
+    except (json.JSONDecodeError, TypeError) as json_err:
+        print(f"[{case_id}] Warning: Could not compare JSON. Proceeding with update. Error: {json_err}")
+        return None
+
+
+def _diff_case(work: dict, schema: RepairCaseSchema):
     """
-    Fetches, parses, and saves a single insurance case.
-    Creates its own database connection for thread safety.
+    Diff stage: compares the case with the database record.
+    Returns the work item if it is new or changed, otherwise a final result string.
+    Checks out its own pooled database connection for thread safety.
     """
-    # Create a new database connection for this thread
-    cnx = get_mysql_connection()
+    case_id = work["case_id"]
+    cnx = get_mysql_connection(SYNC_POOL)
     if not cnx:
         print(f"[{case_id}] Failed to get database connection.")
         return "error_db_connection"
-    
-    try:
-        # 1. Fetch detailed data with retry logic
-        case_data = _fetch_case_with_retry(case_id)
-        if not case_data:
-            return "error_fetch_failed"
-        
-        print(f"[{case_id}] Fetched raw API data.")
-
-        # 2. Check if it's an insurance case
-        insurance_data = case_data.get('Insurance') # Can be None
-        if not (insurance_data and insurance_data.get('InsuranceIsActivated')):
-            print(f"[{case_id}] Is not an insurance case or Insurance object is null/inactive. Skipping.")
-            return "skipped_not_insurance"
-        
-        print(f"[{case_id}] Is an insurance case. Proceeding.")
 
-        # 3. Compare with existing data to see if an update is needed
-        cursor = cnx.cursor(dictionary=True)
-        cursor.execute("SELECT `rawApiDetail` FROM `repair_cases` WHERE `caseId` = %s", (case_id,))
-        existing_record = cursor.fetchone()
-        cursor.close()
+    try:
+        # 3. Compare with existing data to see if an update is needed.
+        # Only the stored 32-byte digest is read; rawApiDetail itself is loaded
+        # just for rows that have not been given a digest yet.
+        has_hash_column = 'rawApiDetailHash' in schema.columns
+        with sync_metrics.DB_READ_SECONDS.time():
+            cursor = cnx.cursor(dictionary=True)
+            if has_hash_column:
+                cursor.execute("SELECT `rawApiDetailHash` FROM `repair_cases` WHERE `caseId` = %s", (case_id,))
+            else:
+                cursor.execute("SELECT `caseId` FROM `repair_cases` WHERE `caseId` = %s", (case_id,))
+            existing_record = cursor.fetchone()
+            cursor.close()
 
-        new_raw_detail_json = json.dumps(case_data, sort_keys=True)
-        
-        # Track if this is a new case or if data has changed
-        is_new_case = existing_record is None
-        data_changed = False
+        with sync_metrics.NORMALIZE_SECONDS.labels(step="hash").time():
+            work["raw_detail_json"] = canonical_json(work["case_data"])
+            work["raw_detail_hash"] = payload_digest(work["raw_detail_json"])
 
         if existing_record:
-            try:
-                existing_raw_detail = existing_record.get('rawApiDetail', '{}')
-                if isinstance(existing_raw_detail, bytes):
-                    existing_raw_detail = existing_raw_detail.decode('utf-8')
-                
-                normalized_existing = json.dumps(json.loads(existing_raw_detail), sort_keys=True)
-                
-                if normalized_existing == new_raw_detail_json:
-                    print(f"[{case_id}] Data is identical to DB record. Skipping update.")
-                    return "skipped_no_change"
-                else:
-                    data_changed = True
-                    print(f"[{case_id}] Data has changed. Proceeding with update.")
-            except (json.JSONDecodeError, TypeError) as json_err:
-                print(f"[{case_id}] Warning: Could not compare JSON. Proceeding with update. Error: {json_err}")
-                data_changed = True
+            existing_hash = existing_record.get('rawApiDetailHash') if has_hash_column else None
+            if existing_hash is None:
+                existing_hash = _legacy_payload_digest(cnx, case_id, schema)
+
+            if existing_hash is not None and bytes(existing_hash) == work["raw_detail_hash"]:
+                print(f"[{case_id}] Data is identical to DB record. Skipping update.")
+                return "skipped_no_change"
+            print(f"[{case_id}] Data has changed. Proceeding with update.")
         else:
             print(f"[{case_id}] New case. Proceeding with insert.")
-            data_changed = True
-        
-        # 4. Robust Data Mapping
-        print(f"[{case_id}] Mapping fields for upsert.")
-        
-        # Safer access to bookings
-        bookings = case_data.get('Bookings') or []
-        latest_status = bookings[-1].get('Status') if bookings and len(bookings) > 0 else None
-        if not latest_status:
-            latest_status = case_data.get('Status')  # Fallback to top-level status
-
-        # Safer access to nested objects, providing default empty dicts
-        customer_data = case_data.get('Customer') or {}
-        product_data = case_data.get('Product') or {}
-        insurance_data = case_data.get('Insurance') or {}
-        symptoms_data = case_data.get('Symptoms') or {}
-        store_data = case_data.get('Store') or {}
-        service_data = case_data.get('Service') or {}
-        
-        # Helper function to convert empty strings to None
-        def clean_value(value):
-            if value is None:
-                return None
-            if isinstance(value, str):
-                return value.strip() if value.strip() else None
-            return value
-        
-        # Build customer name from first and last name
-        first_name = clean_value(customer_data.get('FirstName'))
-        last_name = clean_value(customer_data.get('LastName'))
-        customer_name = None
-        if first_name and last_name:
-            customer_name = f"{first_name} {last_name}"
-        elif first_name:
-            customer_name = first_name
-        elif last_name:
-            customer_name = last_name
-        
-        # Calculate total repair cost
-        positions = case_data.get('Positions') or []
-        total_repair_cost = None
-        if positions:
-            try:
-                total_repair_cost = sum(float(pos.get('PriceGross', 0.0) or 0.0) for pos in positions)
-                if total_repair_cost == 0.0:
-                    total_repair_cost = None
-            except (ValueError, TypeError):
-                total_repair_cost = None
-
-        # Build complete data dictionary - include ALL fields that exist in the database, even if None
-        # This ensures NULL fields in DB get updated properly
-        # Based on the actual database schema from view_cases/__init__.py
-        # IMPORTANT: Only update lastApiUpdate if this is a new case or data has changed
-        db_data = {
-            'caseId': case_data.get('CaseId'),
-            'caseNumber': clean_value(case_data.get('CaseNumber')),
-            'customerName': customer_name,
-            'customerEmail': clean_value(customer_data.get('Email')),
-            'customerCity': clean_value(customer_data.get('City')),
-            'productName': clean_value(product_data.get('ProductName')),
-            'manufacturer': clean_value(product_data.get('Manufacturer')),
-            'symptoms': clean_value(symptoms_data.get('Comment')),
-            'storeName': clean_value(store_data.get('Current')),
-            'status': clean_value(latest_status),
-            'warranty': clean_value(case_data.get('Warranty')),
-            'serviceType': clean_value(service_data.get('Servicetype')),
-            'currency': clean_value(case_data.get('Currency')),
-            'insuranceContractNumber': clean_value(insurance_data.get('ContractNumber')),
-            'insuranceIsActive': 1,
-            'insuranceName': clean_value(insurance_data.get('Name')),
-            'insuranceDeductible': insurance_data.get('Retention') if insurance_data.get('Retention') is not None else None,
-            'insuranceSettlementAmount': insurance_data.get('SettlementAmount') if insurance_data.get('SettlementAmount') is not None else None,
-            'customerCompanyName': clean_value(customer_data.get('CompanyName')),
-            'customerNumber': clean_value(customer_data.get('CustomerNumber')),
-            'customerFirstName': first_name,
-            'customerLastName': last_name,
-            'customerPhoneMain': clean_value(customer_data.get('PhoneMain')),
-            'customerZipCode': clean_value(customer_data.get('ZipCode')),
-            'productSerialNumber': clean_value(product_data.get('SerialNumber')),
-            'totalRepairCost': total_repair_cost,
-            'rawApiDetail': new_raw_detail_json,
-            'isPresentInLastApiSync': 1,
-        }
-        
-        # Only update lastApiUpdate timestamp if this is a new case or data has changed
-        if is_new_case or data_changed:
-            db_data['lastApiUpdate'] = start_time_utc
-
-        # 5. Get existing columns from database to filter out non-existent columns
-        # This allows the code to work even if some columns don't exist yet
-        cursor = cnx.cursor()
-        cursor.execute("SHOW COLUMNS FROM repair_cases")
-        existing_columns = {row[0] for row in cursor.fetchall()}
-        cursor.close()
-        
-        # Filter db_data to only include columns that exist in the database
-        filtered_db_data = {k: v for k, v in db_data.items() if k in existing_columns}
-        
-        if not filtered_db_data:
-            print(f"[{case_id}] Warning: No valid columns found for database insert.")
-            return "error_no_columns"
-        
-        # Log any fields that were filtered out (for debugging)
-        missing_columns = set(db_data.keys()) - existing_columns
-        if missing_columns:
-            print(f"[{case_id}] Note: {len(missing_columns)} fields not in database schema (will be skipped): {', '.join(sorted(missing_columns))}")
-    
-        # 6. Upsert to Database - include ALL fields in update clause, even NULL ones
-        # This ensures that fields that were previously NULL get updated properly
-        columns = ", ".join(f"`{k}`" for k in filtered_db_data.keys())
-        placeholders = ", ".join(["%s"] * len(filtered_db_data))
-        # Update ALL fields, including NULL values
-        update_clause = ", ".join([f"`{key}` = VALUES(`{key}`)" for key in filtered_db_data.keys()])
-        sql = f"INSERT INTO repair_cases ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {update_clause}"
-        
-        print(f"[{case_id}] Executing SQL upsert with {len(filtered_db_data)} fields.")
-        cursor = cnx.cursor()
-        cursor.execute(sql, list(filtered_db_data.values()))
-        cursor.close()
-        cnx.commit()
-        
-        return "upserted"
-    except Exception as e:
-        print(f"[{case_id}] Error in _process_single_case: {e}")
-        if cnx:
-            cnx.rollback()
-        return "error_processing"
+        return work
     finally:
         if cnx and cnx.is_connected():
             cnx.close()
 
 
-def sync_insurance_cases_task():
+def _map_case(work: dict, schema: RepairCaseSchema, start_time_utc: datetime):
+    """
+    Map stage: turns the raw API payload into a repair_cases row.
+    Returns the work item with its row, or a final result string.
+    """
+    case_id = work["case_id"]
+    case_data = work["case_data"]
+
+    # 4. Declarative mapping, shared with scripts/backfill_case_columns.py
+    print(f"[{case_id}] Mapping fields for upsert.")
+
+    # Complete data dictionary - includes ALL mapped fields, even if None,
+    # so NULL fields in DB get updated properly
+    db_data = map_case_payload(case_data)
+    db_data['insuranceIsActive'] = 1  # Only insurance cases reach this stage
+    if schema.has_payload_table:
+        # The payload goes to repair_case_payloads, the hot row keeps no copy of it
+        work['raw_detail'] = encode_raw_detail(work['raw_detail_json'])
+        db_data['rawApiDetail'] = None
+    elif 'rawApiDetail' in schema.binary_columns:
+        db_data['rawApiDetail'] = encode_raw_detail(work['raw_detail_json'])
+    else:
+        # Column not migrated to LONGBLOB yet, keep writing plain JSON text
+        db_data['rawApiDetail'] = work['raw_detail_json']
+    db_data['rawApiDetailHash'] = work['raw_detail_hash']
+    db_data['isPresentInLastApiSync'] = 1
+
+    # Only new or changed cases reach this stage, so their API timestamp is refreshed
+    db_data['lastApiUpdate'] = start_time_utc
+
+    # 5. Filter db_data to the columns introspected once for this sync.
+    # This allows the code to work even if some columns don't exist yet
+    filtered_db_data = schema.filter_row(db_data)
+
+    if not filtered_db_data:
+        print(f"[{case_id}] Warning: No valid columns found for database insert.")
+        return "error_no_columns"
+
+    work["row"] = filtered_db_data
+    return work
+
+
+def _timed_map_case(work: dict, schema: RepairCaseSchema, start_time_utc: datetime):
+    with sync_metrics.NORMALIZE_SECONDS.labels(step="map").time():
+        return _map_case(work, schema, start_time_utc)
+
+
+def _persist_case(work: dict, writer: CaseWriteBuffer):
+    """
+    Persist stage: hands the row to the write-behind buffer, which upserts it as part of a batch.
+    Blocks while the buffer is full, which throttles the stages before it.
+    """
+    print(f"[{work['case_id']}] Queueing upsert with {len(work['row'])} fields.")
+    writer.add(work["row"], work.get("raw_detail"))
+    return "upserted"
+
+
+async def _process_single_case(
+    client: RepairlineClient,
+    case_id: int,
+    start_time_utc: datetime,
+    writer: CaseWriteBuffer,
+):
+    """
+    Runs one case through all sync stages in order, without the pipeline.
+    Used for debugging single cases.
+    """
+    outcome = await _fetch_case(client, case_id)
+    if isinstance(outcome, str):
+        return outcome
+    outcome = await asyncio.to_thread(_diff_case, outcome, writer.schema)
+    if isinstance(outcome, str):
+        return outcome
+    outcome = _map_case(outcome, writer.schema, start_time_utc)
+    if isinstance(outcome, str):
+        return outcome
+    return await asyncio.to_thread(_persist_case, outcome, writer)
+
+
+def _record_run_metrics(tier: str, outcome: str, run_started: float):
+    sync_metrics.RUNS.labels(tier=tier, outcome=outcome).inc()
+    sync_metrics.RUN_DURATION_SECONDS.labels(tier=tier).observe(time.monotonic() - run_started)
+    if outcome == "success":
+        sync_metrics.LAST_SUCCESS_TIMESTAMP.labels(tier=tier).set_to_current_time()
+
+
+def sync_insurance_cases_task(resume_only: bool = False, tier: str = "full"):
     """
     The main background task to fetch, filter, and save insurance cases.
+    Runs the async sync engine on its own event loop, since background tasks
+    are executed in a worker thread. With resume_only, nothing happens unless
+    an interrupted run can be resumed. The "hot" tier only refreshes the
+    details of open, recently changed cases, without the upstream case list.
     """
-    print("Starting simple insurance case sync...")
+    asyncio.run(_sync_insurance_cases_async(resume_only, tier))
+
+
+async def _sync_insurance_cases_async(resume_only: bool = False, tier: str = "full"):
+    checkpoint = None
+    hot_case_ids = None
+    if tier == "hot":
+        hot_case_ids = await asyncio.to_thread(select_hot_case_ids)
+        print(f"Hot tier sync: {len(hot_case_ids)} open, recently changed cases to refresh.")
+    if resume_only:
+        checkpoint = await asyncio.to_thread(SyncRunCheckpoint.resume_interrupted)
+        if checkpoint is None:
+            print("No interrupted sync run to resume.")
+            return
+
+    print(f"Starting simple insurance case sync ({tier} tier)...")
     start_time_utc = datetime.now(timezone.utc)
+    run_started = time.monotonic()
 
     try:
-        # Step 1: Fetch all cases from the Repairline API
-        print("Fetching all cases from Repairline API...")
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(
-            f"{REPAIRLINE_API_BASE_URL}cases",
-            auth=(REPAIRLINE_API_USERNAME, REPAIRLINE_API_PASSWORD),
-            headers=headers,
-            timeout=300,  # Generous timeout for a potentially large response
-        )
-        response.raise_for_status()
-        all_cases = response.json()
-        print(f"Fetched {len(all_cases)} total cases from the API.")
+        async with RepairlineClient(max_connections=MAX_CONCURRENT_FETCHES) as client:
+            # Known non-insurance cases are skipped without fetching their details
+            negative_cache = NonInsuranceCaseCache()
+            await asyncio.to_thread(negative_cache.load)
 
-        # The initial list from the API doesn't contain the detailed insurance flag.
-        # We must fetch details for each case to check if it's an insurance case.
-        case_ids_to_process = [case['CaseId'] for case in all_cases]
-        print(f"Found {len(case_ids_to_process)} total cases to check for details.")
+            # Introspect the table once per sync, so a migration run between syncs is picked up
+            invalidate_repair_case_schema()
+            schema = get_repair_case_schema()
 
-        if not case_ids_to_process:
-            print("No cases found in API response. Task finished.")
-            return
+            # Rows classified with an older status list are rewritten before new ones are written
+            # Until that finished, the case list keeps filtering on the status list
+            if schema.has_lifecycle_column and not schema.has_lifecycle:
+                try:
+                    await asyncio.to_thread(reclassify_if_outdated)
+                    invalidate_repair_case_schema()
+                    schema = get_repair_case_schema()
+                except Exception as reclassify_err:
+                    print(f"Lifecycle reclassification failed: {reclassify_err}")
 
-        # Step 4: Fetch details and save each insurance case using parallel processing
-        global _sync_stats
-        with _sync_lock:
-            _sync_stats["total_cases"] = len(case_ids_to_process)
-        
-        upsert_count = 0
-        skipped_no_change_count = 0
-        skipped_not_insurance_count = 0
-        error_count = 0
-        
-        print(f"Starting parallel processing with {MAX_WORKERS} workers...")
-        start_time = time.time()
-        
-        # Use ThreadPoolExecutor for parallel processing
-        # Note: Each thread creates its own DB connection for thread safety
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # Submit all tasks
-            future_to_case_id = {
-                executor.submit(_process_single_case, case_id, start_time_utc): case_id
-                for case_id in case_ids_to_process
-            }
-            
-            # Process completed tasks
+            # Progress is checkpointed in MySQL, so a run interrupted by a restart
+            # can be resumed with only the case IDs that are not done yet.
+            # Hot tier runs are short and are not checkpointed.
+            if checkpoint is None and hot_case_ids is None:
+                checkpoint = await asyncio.to_thread(SyncRunCheckpoint.start_or_resume, start_time_utc)
+            resuming = checkpoint is not None and checkpoint.resumed
+            if resuming:
+                # Keep the original run's timestamp for lastApiUpdate
+                start_time_utc = checkpoint.started_at
+
+            upsert_count = 0
+            skipped_no_change_count = 0
+            skipped_not_insurance_count = 0
+            error_count = 0
+            listed = 0
             completed = 0
-            for future in as_completed(future_to_case_id):
-                case_id = future_to_case_id[future]
-                completed += 1
-                
-                if completed % 50 == 0 or completed == len(case_ids_to_process):
+            list_complete = False
+            # Results are recorded from the event loop and from stage threads
+            counts_lock = threading.Lock()
+
+            def tally(result, n=1):
+                nonlocal upsert_count, skipped_no_change_count, skipped_not_insurance_count, error_count, completed
+                completed += n
+                if result == "upserted":
+                    upsert_count += n
+                elif result == "skipped_no_change":
+                    skipped_no_change_count += n
+                elif result in ["skipped_not_insurance", "skipped_not_insurance_cached"]:
+                    skipped_not_insurance_count += n
+                elif result in ["error_fetch_failed", "error_db_connection", "error_processing", "error_no_columns"]:
+                    error_count += n
+
+            # Without checkpoint tables, the seen case IDs for the presence sweep are kept in memory
+            seen_case_ids = set() if checkpoint is None and hot_case_ids is None else None
+
+            if resuming:
+                for result, n in checkpoint.prior_result_counts.items():
+                    tally(result, n)
+                if checkpoint.list_complete:
+                    listed = checkpoint.total_cases
+
+            def publish_stats():
+                with _sync_lock:
+                    _sync_stats["total_cases"] = listed
+                    _sync_stats["processed"] = completed
+                    _sync_stats["upserted"] = upsert_count
+                    _sync_stats["skipped_no_change"] = skipped_no_change_count
+                    _sync_stats["skipped_not_insurance"] = skipped_not_insurance_count
+                    _sync_stats["errors"] = error_count
+                    _sync_stats["negative_cache_hits"] = negative_cache.hits
+                    _sync_stats["negative_cache_hit_rate"] = round(negative_cache.hit_rate, 3)
+                    _sync_stats["stages"] = pipeline.stats()
+                    _sync_stats["tier"] = tier
+                    _sync_stats["fetch_limit"] = client.limiter.stats()
+                    _sync_stats["fetch_retries"] = client.retries
+
+            async def publish_shared_status_periodically():
+                # The shared status row is written from a worker thread, never from the event loop
+                while True:
+                    await asyncio.sleep(STATUS_PUBLISH_INTERVAL)
+                    publish_stats()
+                    await asyncio.to_thread(_publish_shared_status)
+
+            # Start time of every case in the pipeline, for the per-case latency
+            case_started = {}
+
+            def record_result(case_id, result):
+                with counts_lock:
+                    tally(result)
+                    report_progress = completed % 50 == 0
+                sync_metrics.CASE_RESULTS.labels(result=result).inc()
+                started = case_started.pop(case_id, None)
+                if started is not None:
+                    sync_metrics.CASE_SECONDS.observe(time.monotonic() - started)
+
+                # Upserts are checkpointed by the write buffer once their batch is committed
+                if checkpoint and result != "upserted":
+                    checkpoint.record_result(case_id, result)
+
+                # Update stats periodically
+                if report_progress:
                     elapsed = time.time() - start_time
                     rate = completed / elapsed if elapsed > 0 else 0
-                    remaining = len(case_ids_to_process) - completed
-                    eta = remaining / rate if rate > 0 else 0
-                    print(f"Progress: {completed}/{len(case_ids_to_process)} cases processed "
-                          f"({rate:.1f} cases/sec, ETA: {eta:.0f}s)")
-                    # Update stats
-                    with _sync_lock:
-                        _sync_stats["processed"] = completed
+                    if list_complete:
+                        remaining = listed - completed
+                        eta = remaining / rate if rate > 0 else 0
+                        print(f"Progress: {completed}/{listed} cases processed "
+                              f"({rate:.1f} cases/sec, ETA: {eta:.0f}s)")
+                    else:
+                        print(f"Progress: {completed} cases processed, {listed} listed so far "
+                              f"({rate:.1f} cases/sec)")
+                    publish_stats()
+
+            def finish_or_forward(case_id, outcome):
+                # Stages return a result string once a case is done, or the work item for the next stage
+                if isinstance(outcome, str):
+                    record_result(case_id, outcome)
+                    return None
+                return outcome
+
+            def on_stage_error(stage_name, item, err):
+                case_id = item["case_id"] if isinstance(item, dict) else item
+                print(f"[{case_id}] Error in {stage_name} stage: {err}")
+                record_result(case_id, "error_processing")
+
+            def on_batch_written(rows):
+                if checkpoint:
+                    for row in rows:
+                        checkpoint.record_result(row["caseId"], "upserted")
 
+            async def fetch_stage(case_id):
+                case_started[case_id] = time.monotonic()
+                if negative_cache.should_skip(case_id):
+                    return finish_or_forward(case_id, "skipped_not_insurance_cached")
+                return finish_or_forward(case_id, await _fetch_case(client, case_id, negative_cache))
+
+            async def case_id_source():
+                nonlocal listed, list_complete
+                if hot_case_ids is not None:
+                    listed = len(hot_case_ids)
+                    list_complete = True
+                    for case_id in hot_case_ids:
+                        yield case_id
+                    return
+
+                if resuming and checkpoint.list_complete:
+                    # The full case list of the run is already stored, only the rest is processed
+                    print(f"Resuming sync run {checkpoint.run_id}: {listed - completed} of {listed} cases remaining.")
+                    list_complete = True
+                    async for case_id in checkpoint.iter_remaining_case_ids():
+                        yield case_id
+                    return
+
+                # Step 1: Stream all cases from the Repairline API.
+                # The list doesn't contain the detailed insurance flag, so the
+                # details of each case must be fetched to check it.
+                print("Streaming all cases from Repairline API...")
+                async for case in client.iter_case_list():
+                    case_id = case['CaseId']
+                    listed += 1
+                    if seen_case_ids is not None:
+                        seen_case_ids.add(case_id)
+                    if checkpoint:
+                        if case_id in checkpoint.done_case_ids:
+                            continue  # Finished before the run was interrupted
+                        checkpoint.record_listed(case_id)
+                    yield case_id
+                list_complete = True
+                if checkpoint:
+                    await asyncio.to_thread(checkpoint.mark_list_complete, listed)
+                print(f"Fetched {listed} total cases from the API.")
+
+            with CaseWriteBuffer(schema=schema, on_batch_written=on_batch_written) as writer:
+                # Step 2: Run every case through independent fetch, diff, map and persist
+                # stages. Each stage has its own workers and a bounded input queue, so
+                # a slow stage throttles the ones before it and shows up in the stats.
+                pipeline = SyncPipeline([
+                    PipelineStage("fetch", fetch_stage, concurrency=MAX_CONCURRENT_FETCHES),
+                    PipelineStage("diff", lambda work: finish_or_forward(work["case_id"], _diff_case(work, schema)),
+                                  concurrency=DIFF_WORKERS, blocking=True),
+                    PipelineStage("map", lambda work: finish_or_forward(work["case_id"], _timed_map_case(work, schema, start_time_utc)),
+                                  concurrency=MAP_WORKERS, blocking=True),
+                    PipelineStage("persist", lambda work: finish_or_forward(work["case_id"], _persist_case(work, writer)),
+                                  concurrency=PERSIST_WORKERS, blocking=True),
+                ], on_error=on_stage_error)
+
+                print(f"Starting sync pipeline with {MAX_CONCURRENT_FETCHES} fetch, {DIFF_WORKERS} diff, "
+                      f"{MAP_WORKERS} map and {PERSIST_WORKERS} persist workers...")
+                start_time = time.time()
+                status_publisher = asyncio.create_task(publish_shared_status_periodically())
                 try:
-                    result = future.result()
-                    if result == "upserted":
-                        upsert_count += 1
-                    elif result == "skipped_no_change":
-                        skipped_no_change_count += 1
-                    elif result == "skipped_not_insurance":
-                        skipped_not_insurance_count += 1
-                    elif result in ["error_fetch_failed", "error_db_connection", "error_processing"]:
-                        error_count += 1
-                except Exception as detail_err:
-                    print(f"Error processing case {case_id}: {detail_err}")
-                    error_count += 1
-                    
-                # Update stats periodically
-                if completed % 50 == 0:
-                    with _sync_lock:
-                        _sync_stats["upserted"] = upsert_count
-                        _sync_stats["skipped_no_change"] = skipped_no_change_count
-                        _sync_stats["skipped_not_insurance"] = skipped_not_insurance_count
-                        _sync_stats["errors"] = error_count
-                        
-        elapsed_total = time.time() - start_time
-        
-        # Final stats update
-        with _sync_lock:
-            _sync_stats["upserted"] = upsert_count
-            _sync_stats["skipped_no_change"] = skipped_no_change_count
-            _sync_stats["skipped_not_insurance"] = skipped_not_insurance_count
-            _sync_stats["errors"] = error_count
-            _sync_stats["processed"] = len(case_ids_to_process)
-        
-        print(f"Sync finished in {elapsed_total:.1f}s. "
-              f"Upserted: {upsert_count}, "
-              f"Skipped (no change): {skipped_no_change_count}, "
-              f"Skipped (not insurance): {skipped_not_insurance_count}, "
-              f"Errors: {error_count}")
+                    await pipeline.run(case_id_source())
+                finally:
+                    status_publisher.cancel()
+
+            if listed == 0:
+                print("No cases found in API response. Task finished.")
+                if checkpoint:
+                    await asyncio.to_thread(checkpoint.complete)
+                _record_run_metrics(tier, "success", run_started)
+                return
+
+            await asyncio.to_thread(negative_cache.flush)
+
+            # Step 3: Mark which cases were part of this upstream list, for the whole table at once.
+            # Hot tier runs never see the upstream list, so they leave the flags alone.
+            if list_complete and hot_case_ids is None:
+                try:
+                    if checkpoint:
+                        marked_present, marked_absent = await asyncio.to_thread(
+                            sweep_presence_flags, run_id=checkpoint.run_id,
+                        )
+                    else:
+                        marked_present, marked_absent = await asyncio.to_thread(
+                            sweep_presence_flags, seen_case_ids=seen_case_ids,
+                        )
+                    print(f"Presence sweep: {marked_present} cases marked present, "
+                          f"{marked_absent} cases no longer in the API marked absent.")
+                except Exception as sweep_err:
+                    print(f"Presence sweep failed: {sweep_err}")
+
+            if schema.has_generation_table:
+                await asyncio.to_thread(bump_data_generation_now)
+
+            # Rows whose batch could not be written after all retries count as errors
+            upsert_count -= writer.rows_failed
+            error_count += writer.rows_failed
+            print(f"Write buffer flushed {writer.rows_written} cases in {writer.batches_written} batches.")
+
+            elapsed_total = time.time() - start_time
+
+            # Final stats update
+            publish_stats()
+            await asyncio.to_thread(_publish_shared_status)
+            if checkpoint:
+                await asyncio.to_thread(checkpoint.complete)
+            _record_run_metrics(tier, "success", run_started)
+
+            print(f"Sync finished in {elapsed_total:.1f}s. "
+                  f"Upserted: {upsert_count}, "
+                  f"Skipped (no change): {skipped_no_change_count}, "
+                  f"Skipped (not insurance): {skipped_not_insurance_count} "
+                  f"({negative_cache.hits} from negative cache, {negative_cache.hit_rate:.0%} hit rate), "
+                  f"Errors: {error_count}")
+            fetch_limit = client.limiter.stats()
+            print(f"  Fetch concurrency ended at {fetch_limit['limit']} of {fetch_limit['max_limit']} "
+                  f"({fetch_limit['increases']} increases, {fetch_limit['decreases']} decreases, "
+                  f"{fetch_limit['pauses']} Retry-After pauses, {client.retries} retries)")
+            for stage_name, stage_stats in pipeline.stats().items():
+                print(f"  Stage {stage_name}: {stage_stats['processed']} processed, "
+                      f"{stage_stats['throughput_per_sec']} per sec with {stage_stats['concurrency']} workers")
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Failed to fetch case list from Repairline API: {e}")
+        if checkpoint:
+            await asyncio.to_thread(checkpoint.fail)
+        _record_run_metrics(tier, "failed", run_started)
     except Exception as e:
         import traceback
         print(f"An unexpected error occurred during the sync process: {e}")
         print(traceback.format_exc())
-    
+        if checkpoint:
+            await asyncio.to_thread(checkpoint.fail)
+        _record_run_metrics(tier, "failed", run_started)
+
     print("Simple insurance case sync finished.")
 
 
-# Global flag to prevent multiple simultaneous syncs (thread-safe)
+# Global flag to prevent multiple simultaneous syncs in this process (thread-safe).
+# Across workers and nodes, the database sync lock held by _sync_coordinator does the same.
 _sync_in_progress = False
 _sync_lock = threading.Lock()
 _sync_start_time = None
-_sync_stats = {
-    "total_cases": 0,
-    "processed": 0,
-    "upserted": 0,
-    "skipped_no_change": 0,
-    "skipped_not_insurance": 0,
-    "errors": 0
-}
+_sync_coordinator: Optional[SyncCoordinator] = None
 
-@router.get("/sync-status")
-async def get_sync_status():
+
+def _empty_sync_stats() -> dict:
+    return {
+        "total_cases": 0,
+        "processed": 0,
+        "upserted": 0,
+        "skipped_no_change": 0,
+        "skipped_not_insurance": 0,
+        "errors": 0,
+        "negative_cache_hits": 0,
+        "negative_cache_hit_rate": 0.0,
+        "stages": {},
+        "tier": None,
+        "fetch_limit": {},
+        "fetch_retries": 0,
+    }
+
+
+_sync_stats = _empty_sync_stats()
+
+
+def _publish_shared_status(force: bool = False):
+    """Copies this process's sync stats to the shared status row, throttled unless forced."""
+    with _sync_lock:
+        coordinator = _sync_coordinator
+        is_running = _sync_in_progress
+        start_time = _sync_start_time
+        stats = _sync_stats.copy()
+    if coordinator:
+        coordinator.publish_status(is_running, start_time, stats, force=force)
+
+
+async def _current_sync_status() -> dict:
     """
-    Returns the current sync status.
+    Builds the sync status snapshot.
+    A sync running in another worker is reported from the shared status row,
+    so every worker gives the same answer.
     """
-    global _sync_in_progress, _sync_start_time, _sync_stats
-    
     with _sync_lock:
         is_running = _sync_in_progress
         start_time = _sync_start_time
         stats = _sync_stats.copy()
+        owner = _sync_coordinator.owner_id if _sync_coordinator else None
+
+    if not is_running:
+        shared = await asyncio.to_thread(read_shared_sync_status)
+        if shared is not None:
+            is_running = shared["is_running"]
+            start_time = shared["start_time"]
+            stats = {**_empty_sync_stats(), **shared["stats"]}
+            owner = shared["owner"]
     
     if is_running and start_time:
         elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
@@ -399,58 +609,197 @@ async def get_sync_status():
         "is_running": is_running,
         "start_time": start_time.isoformat() if start_time else None,
         "elapsed_seconds": elapsed,
-        "stats": stats
+        "stats": stats,
+        "owner": owner,
+        "db_pool": get_pool_stats(),
     }
 
-@router.post("/sync-insurance-cases")
-async def trigger_sync(background_tasks: BackgroundTasks):
+
+_sync_events = SyncEventBroadcaster(_current_sync_status, interval=SYNC_EVENTS_INTERVAL)
+
+
+@router.get("/sync-status")
+async def get_sync_status():
     """
-    Triggers the simple insurance case sync process in the background.
-    Prevents multiple simultaneous syncs using thread-safe locking.
+    Returns the current sync status.
     """
-    global _sync_in_progress
-    
-    global _sync_start_time, _sync_stats
-    
+    return await _current_sync_status()
+
+
+@router.get("/sync-events")
+async def stream_sync_events(request: Request):
+    """
+    Streams the sync status as server-sent events, instead of polling /sync-status.
+    Sends a 'status' event with the same payload as /sync-status on connect and
+    at most once per SYNC_EVENTS_INTERVAL, and a 'summary' event when a run ends.
+    """
+    async def event_stream():
+        async for event in _sync_events.subscribe():
+            if await request.is_disconnected():
+                break
+            yield event
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _release_sync_slot():
+    global _sync_in_progress, _sync_start_time, _sync_coordinator
+    with _sync_lock:
+        _sync_in_progress = False
+        _sync_start_time = None
+        _sync_coordinator = None
+
+
+def _claim_sync_slot() -> bool:
+    """
+    Marks a sync as running in this process and takes the database sync lock,
+    so no other worker or node starts one at the same time.
+    Returns False if a sync is already running anywhere.
+    Raises SyncCoordinationError if the lock cannot be checked.
+    """
+    global _sync_in_progress, _sync_start_time, _sync_stats, _sync_coordinator
     with _sync_lock:
         if _sync_in_progress:
-            raise HTTPException(
-                status_code=409,
-                detail="A sync is already in progress. Please wait for it to complete."
-            )
+            return False
         _sync_in_progress = True
+
+    coordinator = SyncCoordinator()
+    try:
+        acquired = coordinator.try_acquire()
+    except SyncCoordinationError:
+        _release_sync_slot()
+        raise
+    if not acquired:
+        _release_sync_slot()
+        return False
+
+    with _sync_lock:
+        _sync_coordinator = coordinator
         _sync_start_time = datetime.now(timezone.utc)
-        _sync_stats = {
-            "total_cases": 0,
-            "processed": 0,
-            "upserted": 0,
-            "skipped_no_change": 0,
-            "skipped_not_insurance": 0,
-            "errors": 0
-        }
+        _sync_stats = _empty_sync_stats()
+    _publish_shared_status(force=True)
+    return True
+
+
+def _sync_with_cleanup(resume_only: bool = False, tier: str = "full"):
+    try:
+        sync_insurance_cases_task(resume_only, tier)
+    finally:
+        with _sync_lock:
+            coordinator = _sync_coordinator
+            start_time = _sync_start_time
+            stats = _sync_stats.copy()
+        _release_sync_slot()
+        if coordinator:
+            coordinator.publish_status(False, start_time, stats, force=True)
+            coordinator.release()
+
+
+@router.post("/sync-insurance-cases")
+async def trigger_sync(background_tasks: BackgroundTasks):
+    """
+    Triggers the simple insurance case sync process in the background.
+    If an earlier run was interrupted, that run is resumed instead of starting over.
+    Prevents multiple simultaneous syncs, also across workers, using a database lock.
+    """
+    try:
+        claimed = await asyncio.to_thread(_claim_sync_slot)
+    except SyncCoordinationError as e:
+        print(f"Could not check the sync lock: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable, cannot start a sync.")
+    if not claimed:
+        raise HTTPException(
+            status_code=409,
+            detail="A sync is already in progress. Please wait for it to complete."
+        )
     
     print("Received request to trigger simple insurance case sync.")
     
-    def sync_with_cleanup():
-        global _sync_in_progress, _sync_start_time
-        try:
-            sync_insurance_cases_task()
-        finally:
-            with _sync_lock:
-                _sync_in_progress = False
-                _sync_start_time = None
-    
-    background_tasks.add_task(sync_with_cleanup)
+    background_tasks.add_task(_sync_with_cleanup)
     return {"message": "Simple insurance case sync process started in the background."}
 
 
+def resume_interrupted_sync_on_startup():
+    """
+    Resumes a sync run that was interrupted by a restart.
+    The run is only claimed once its heartbeat is stale, so a run still being
+    processed by another worker is left alone.
+    """
+    if os.getenv("SYNC_RESUME_ON_STARTUP", "true").lower() != "true":
+        return
+    run = find_interrupted_run()
+    if not run:
+        return
+
+    def resume_when_stale():
+        heartbeat_age = (datetime.now(timezone.utc).replace(tzinfo=None) - run["heartbeatAt"]).total_seconds()
+        wait_seconds = max(0, RUN_STALE_SECONDS - heartbeat_age) + 1
+        print(f"Found interrupted sync run {run['runId']}, trying to resume it in {wait_seconds:.0f}s.")
+        time.sleep(wait_seconds)
+        try:
+            claimed = _claim_sync_slot()
+        except SyncCoordinationError as e:
+            print(f"Could not resume interrupted sync run {run['runId']}: {e}")
+            return
+        if claimed:
+            _sync_with_cleanup(resume_only=True)
+
+    threading.Thread(target=resume_when_stale, name="sync-resume", daemon=True).start()
+
+
+def _run_scheduled_sync(tier: str):
+    try:
+        claimed = _claim_sync_slot()
+    except SyncCoordinationError as e:
+        print(f"Scheduled {tier} tier sync skipped: {e}")
+        return
+    if not claimed:
+        print(f"Scheduled {tier} tier sync skipped, a sync is already running.")
+        return
+    print(f"Starting scheduled {tier} tier sync.")
+    _sync_with_cleanup(tier=tier)
+
+
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def start_sync_scheduler():
+    """
+    Schedules the hot tier refresh every SYNC_HOT_INTERVAL_MINUTES and the
+    full sync every SYNC_FULL_INTERVAL_HOURS. A run that finds another sync
+    in progress (in any worker) is skipped until its next turn.
+    """
+    global _scheduler
+    if not SYNC_SCHEDULE_ENABLED or _scheduler is not None:
+        return
+    _scheduler = BackgroundScheduler(timezone="UTC", job_defaults={"coalesce": True, "max_instances": 1})
+    _scheduler.add_job(_run_scheduled_sync, "interval", args=["hot"], id="sync_hot_tier",
+                       minutes=SYNC_HOT_INTERVAL_MINUTES, jitter=30)
+    _scheduler.add_job(_run_scheduled_sync, "interval", args=["full"], id="sync_full",
+                       hours=SYNC_FULL_INTERVAL_HOURS, jitter=60)
+    _scheduler.start()
+    print(f"Sync scheduler started: hot tier every {SYNC_HOT_INTERVAL_MINUTES} min, "
+          f"full sync every {SYNC_FULL_INTERVAL_HOURS} h.")
+
+
+def stop_sync_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+
+
 @router.post("/sync-all-insurance-cases")
 async def trigger_sync_all(background_tasks: BackgroundTasks):
     """
     Triggers a sync of all insurance cases in the background.
     This is the same as /sync-insurance-cases but with a more explicit name.
     Updates all existing cases and only changes the API timestamp if there's an actual change.
-    Prevents multiple simultaneous syncs using thread-safe locking.
+    Prevents multiple simultaneous syncs across workers using the database sync lock.
     """
     # Reuse the same sync logic
     return await trigger_sync(background_tasks)
@@ -464,7 +813,15 @@ async def test_single_sync(case_id: int):
     print(f"Received request to test sync for single case ID: {case_id}")
     try:
         start_time_utc = datetime.now(timezone.utc)
-        result = _process_single_case(case_id, start_time_utc)
+        writer = CaseWriteBuffer(batch_size=1)
+        writer.start()
+        try:
+            async with RepairlineClient(max_connections=1) as client:
+                result = await _process_single_case(client, case_id, start_time_utc, writer)
+        finally:
+            await asyncio.to_thread(writer.close)
+        if writer.rows_failed:
+            result = "error_processing"
         
         return {"message": f"Sync test for case {case_id} completed.", "result": result}
     except Exception as e:
@@ -6,17 +6,33 @@ import datetime
 import json
 import pandas as pd
 import io
+import time
 
 # Import the corrected database utility
 from app.libs.database_management import get_mysql_connection
+from app.libs.case_filters import build_case_filters
+from app.libs.case_payload import decode_raw_detail
+from app.libs.repair_case_schema import get_repair_case_schema
+from app.libs.case_search import SEARCH_INDEX, build_search
+from app.libs.case_counts import case_count_cache, estimate_count, read_data_generation
+from app.libs.keyset_cursor import CursorError, decode_cursor, encode_cursor, keyset_predicate
 
 import mysql.connector  # For Error
 
 router = APIRouter()
 
 
-# Pydantic model representing a repair case from the database
-class RepairCaseDB(BaseModel):
+def _get_connection():
+    """Checks out a pooled connection, answering 503 while none becomes free in time."""
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise HTTPException(status_code=503, detail="Database is busy, please try again shortly.")
+    return cnx
+
+
+# Pydantic model of a repair case row in the /cases list, without the raw payload.
+# Fields not requested via fields= are left unset and omitted from the response.
+class RepairCaseListItem(BaseModel):
     caseId: str
     caseNumber: Optional[str] = None
     customerName: Optional[str] = None
@@ -32,7 +48,6 @@ class RepairCaseDB(BaseModel):
     currency: Optional[str] = None
     fetchedAt: Optional[datetime.datetime] = None
     lastApiUpdate: Optional[datetime.datetime] = None
-    rawApiDetail: str | dict | None = None  # JSON string
     insuranceContractNumber: Optional[str] = None
     insuranceIsActive: Optional[bool] = None
     insuranceName: Optional[str] = None
@@ -52,127 +67,219 @@ class RepairCaseDB(BaseModel):
         json_encoders = {datetime.datetime: lambda v: v.isoformat() if v else None}
 
 
+# Pydantic model representing a repair case from the database
+class RepairCaseDB(RepairCaseListItem):
+    rawApiDetail: str | dict | None = None  # JSON string
+
+
+# Columns /cases may return, in response order. caseId is always included.
+CASE_LIST_FIELDS = tuple(RepairCaseListItem.model_fields)
+
+
+def _parse_case_fields(fields: Optional[str]) -> tuple:
+    """Validates a comma-separated fields= value against CASE_LIST_FIELDS. Raises HTTPException(400)."""
+    if not fields or not fields.strip():
+        return CASE_LIST_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CASE_LIST_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(CASE_LIST_FIELDS)}",
+        )
+    requested.add('caseId')
+    return tuple(field for field in CASE_LIST_FIELDS if field in requested)
+
+
 class FilteredRepairCasesResponse(BaseModel):
-    cases: List[RepairCaseDB]
+    cases: List[RepairCaseListItem]
     total_count: int
+    total_count_is_approximate: bool = False  # True if total_count is an optimizer estimate
     page: int
     limit: int
     total_pages: int
+    next_cursor: Optional[str] = None  # Pass as cursor= to get the following page
+    prev_cursor: Optional[str] = None  # Pass as cursor= to get the preceding page
 
 
-@router.get("/cases", response_model=FilteredRepairCasesResponse)
-async def get_cases(
+@router.get("/cases", response_model=FilteredRepairCasesResponse, response_model_exclude_unset=True)
+def get_cases(
     insuranceName: str | None = Query(None),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     limit: int = Query(50, ge=1, le=200, description="Number of items per page (max 200)"),
     search: str | None = Query(None, description="Search term to filter cases"),
     showActiveOnly: bool = Query(True, description="Filter out inactive/closed cases"),
     timeRangeMonths: int | None = Query(None, ge=0, description="Filter cases updated within last N months"),
-    sortBy: str | None = Query("lastApiUpdate", description="Field to sort by"),
-    sortDirection: str | None = Query("desc", description="Sort direction: 'asc' or 'desc'")
+    sortBy: str | None = Query("lastApiUpdate", description="Field to sort by, or 'relevance' to rank search results"),
+    sortDirection: str | None = Query("desc", description="Sort direction: 'asc' or 'desc'"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. 'caseNumber,status' (default: all)"),
+    pageCursor: str | None = Query(None, alias="cursor", description="next_cursor or prev_cursor of a previous response; replaces page"),
+    approximateCount: bool = Query(False, description="Estimate total_count instead of counting (ignored with search)")
 ):
     """
     Fetches repair cases from the MySQL database with pagination and filtering.
     Core logic: (insuranceIsActive = 1 OR (insuranceIsActive = 0 AND IFNULL(LOWER(insuranceName), '') != 'wertgarantie'))
     Optionally filters by a specific insurance name if provided (ANDed with core logic).
     Supports search, active-only filter, time range filter, and sorting.
+    search matches case/contract numbers by prefix and every other word as a word prefix
+    (short words: as a substring); sortBy=relevance ranks the matches.
+    fields= limits the selected columns and the response to the listed ones.
+    Pages can be addressed by page (OFFSET) or, at the same cost for every page,
+    by the cursor= returned as next_cursor/prev_cursor.
+    Counts are cached per filter until the next sync write; approximateCount=true
+    returns an optimizer estimate instead for filters without a search term.
     Requires authentication.
     """
+    selected_fields = _parse_case_fields(fields)
+
+    # Validate and set sort parameters
+    valid_sort_fields = [
+        'caseId', 'caseNumber', 'customerName', 'productName', 'status',
+        'insuranceName', 'lastApiUpdate', 'insuranceContractNumber'
+    ]
+    sort_field = sortBy if sortBy in valid_sort_fields else 'lastApiUpdate'
+    searching = bool(search and search.strip())
+    if sortBy == 'relevance' and searching:
+        sort_field = 'relevance'  # Search rank, best matches first with sortDirection=desc
+    sort_dir = 'DESC' if sortDirection and sortDirection.lower() == 'desc' else 'ASC'
+
+    position = None
+    if pageCursor:
+        try:
+            position = decode_cursor(pageCursor, sort_field, sort_dir)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     cnx = None
     try:
-        cnx = get_mysql_connection()
+        cnx = _get_connection()
         cursor = cnx.cursor(dictionary=True)
 
-        # Build WHERE clause
-        core_filter_condition = "insuranceIsActive = 1 AND IFNULL(LOWER(insuranceName), '') != 'wertgarantie'"
-        where_clauses = [core_filter_condition]
-        query_params = []
-
+        # Build WHERE clause on the normalized, indexed filter columns (see app/libs/case_filters.py)
+        schema = get_repair_case_schema()
         # Check if insuranceName is provided and is not the string 'null' (or other placeholder for 'all')
-        if insuranceName and insuranceName.lower() != "null":
-            if insuranceName != "_ALL_INSURANCES_":
-                where_clauses.append("LOWER(insuranceName) = %s")
-                query_params.append(insuranceName.lower())
-
-        # Add active-only filter (exclude closed/inactive statuses)
-        if showActiveOnly:
-            inactive_statuses = [
-                'abgeschlossen', 'geschlossen', 'storniert', 'abgelehnt',
-                'cancelled', 'closed', 'completed', 'rejected',
-                'unsachgemäßer abbruch', 'reparaturabbruch', 'gerät entsorgen'
-            ]
-            # Build NOT IN clause for statuses
-            status_placeholders = ', '.join(['%s'] * len(inactive_statuses))
-            where_clauses.append(f"LOWER(status) NOT IN ({status_placeholders})")
-            query_params.extend([s.lower() for s in inactive_statuses])
-
-        # Add time range filter
-        if timeRangeMonths and timeRangeMonths > 0:
-            where_clauses.append("lastApiUpdate >= DATE_SUB(NOW(), INTERVAL %s MONTH)")
-            query_params.append(timeRangeMonths)
-
-        # Add search filter
-        if search and search.strip():
-            search_term = f"%{search.strip().lower()}%"
-            where_clauses.append("""
-                (LOWER(caseNumber) LIKE %s 
-                OR LOWER(customerName) LIKE %s 
-                OR LOWER(productName) LIKE %s 
-                OR LOWER(insuranceContractNumber) LIKE %s 
-                OR LOWER(status) LIKE %s 
-                OR LOWER(insuranceName) LIKE %s)
-            """)
-            query_params.extend([search_term] * 6)
+        insurance_filter = None
+        if insuranceName and insuranceName.lower() != "null" and insuranceName != "_ALL_INSURANCES_":
+            insurance_filter = insuranceName
+        where_clauses, query_params = build_case_filters(
+            schema,
+            insurance_name=insurance_filter,
+            active_only=showActiveOnly,
+            time_range_months=timeRangeMonths,
+        )
+
+        # Add search filter: FULLTEXT once migrations/008 is applied, LIKE scan before
+        case_search = None
+        if searching:
+            case_search = build_search(search.strip(), SEARCH_INDEX in schema.indexes)
+            where_clauses.append(case_search.where_sql)
+            query_params.extend(case_search.where_params)
 
         where_clause = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-        # First, get total count for pagination
-        count_query = f"SELECT COUNT(*) as total FROM repair_cases {where_clause}"
-        cursor.execute(count_query, tuple(query_params))
-        total_count_result = cursor.fetchone()
-        total_count = total_count_result['total'] if total_count_result else 0
+        # First, get total count for pagination. Counts are cached per filter and
+        # data generation, so paging through a result costs one query instead of two.
+        total_count = None
+        total_count_is_approximate = False
+        if approximateCount and not searching:
+            total_count = estimate_count(cursor, where_clause, tuple(query_params))
+            total_count_is_approximate = total_count is not None
+        if total_count is None:
+            count_key = (where_clause, tuple(query_params))
+            if timeRangeMonths and timeRangeMonths > 0:
+                # NOW() keeps moving, so a relative time filter's count is only reused within the same minute
+                count_key += (int(time.time() // 60),)
+            generation = read_data_generation(cursor)
+            total_count = case_count_cache.get(count_key, generation)
+            if total_count is None:
+                count_query = f"SELECT COUNT(*) as total FROM repair_cases {where_clause}"
+                cursor.execute(count_query, tuple(query_params))
+                total_count_result = cursor.fetchone()
+                total_count = total_count_result['total'] if total_count_result else 0
+                case_count_cache.put(count_key, generation, total_count)
 
         # Calculate pagination
         total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
         offset = (page - 1) * limit
 
-        # Validate and set sort parameters
-        valid_sort_fields = [
-            'caseId', 'caseNumber', 'customerName', 'productName', 'status',
-            'insuranceName', 'lastApiUpdate', 'insuranceContractNumber'
-        ]
-        sort_field = sortBy if sortBy in valid_sort_fields else 'lastApiUpdate'
-        sort_dir = 'DESC' if sortDirection and sortDirection.lower() == 'desc' else 'ASC'
-
         # Build main query with pagination
-        base_query = """
-            SELECT 
-                caseId, caseNumber, customerName, customerEmail, customerCity,
-                productName, manufacturer, symptoms, storeName, status, warranty,
-                serviceType, currency, fetchedAt, lastApiUpdate, rawApiDetail,
-                insuranceContractNumber, insuranceIsActive, insuranceName,
-                insuranceDeductible, insuranceSettlementAmount, customerCompanyName,
-                customerNumber, customerFirstName, customerLastName, customerPhoneMain,
-                customerZipCode, productSerialNumber, totalRepairCost
-            FROM repair_cases 
-        """
-
-        full_query = base_query + where_clause + f" ORDER BY {sort_field} {sort_dir} LIMIT %s OFFSET %s"
-        query_params_with_pagination = list(query_params) + [limit, offset]
+        # Only the requested columns are selected; they come from the CASE_LIST_FIELDS whitelist.
+        # rawApiDetail is only loaded by /repair-case/{case_id} and the exports.
+        # The sort key and caseId are selected again for the cursors of the page.
+        sort_sql, sort_params = sort_field, []
+        if sort_field == 'relevance':
+            if case_search.relevance_sql:
+                sort_sql, sort_params = case_search.relevance_sql, list(case_search.relevance_params)
+            else:
+                sort_sql = 'lastApiUpdate'  # LIKE fallback has no rank
+        base_query = (
+            f"SELECT {', '.join(selected_fields)}, {sort_sql} AS _cursorValue, caseId AS _cursorId "
+            "FROM repair_cases "
+        )
 
-        cursor.execute(full_query, tuple(query_params_with_pagination))
+        # caseId breaks ties, so the order is total and cursors never skip or repeat rows
+        ascending = sort_dir == 'ASC'
+        backwards = position is not None and position["direction"] == "prev"
+        if backwards:
+            # The previous page is read in reverse order from the cursor row and flipped afterwards
+            ascending = not ascending
+        order_dir = 'ASC' if ascending else 'DESC'
+        order_clause = f" ORDER BY {sort_sql} {order_dir}, caseId {order_dir}"
+
+        # Placeholders appear in SELECT, WHERE, ORDER BY, LIMIT order
+        page_params = sort_params + list(query_params)
+        page_where = where_clause
+        if position is not None:
+            keyset_sql, keyset_params = keyset_predicate(
+                sort_sql, "caseId", ascending, position["value"], position["id"], sort_params,
+            )
+            page_where = where_clause + " AND " + keyset_sql
+            page_params += keyset_params + sort_params
+            # One extra row tells whether there is another page beyond this one
+            full_query = base_query + page_where + order_clause + " LIMIT %s"
+            page_params.append(limit + 1)
+        else:
+            full_query = base_query + page_where + order_clause + " LIMIT %s OFFSET %s"
+            page_params += sort_params + [limit + 1, offset]
+
+        cursor.execute(full_query, tuple(page_params))
         fetched_cases_dicts = cursor.fetchall()
 
-        validated_cases = [RepairCaseDB(**case_dict) for case_dict in fetched_cases_dicts]
+        has_more = len(fetched_cases_dicts) > limit
+        fetched_cases_dicts = fetched_cases_dicts[:limit]
+        if backwards:
+            fetched_cases_dicts.reverse()
+        has_next = has_more if not backwards else True
+        has_prev = has_more if backwards else (position is not None or offset > 0)
+
+        next_cursor = None
+        prev_cursor = None
+        if fetched_cases_dicts:
+            first, last = fetched_cases_dicts[0], fetched_cases_dicts[-1]
+            if has_next:
+                next_cursor = encode_cursor(sort_field, sort_dir, last["_cursorValue"], last["_cursorId"], "next")
+            if has_prev:
+                prev_cursor = encode_cursor(sort_field, sort_dir, first["_cursorValue"], first["_cursorId"], "prev")
+
+        validated_cases = []
+        for case_dict in fetched_cases_dicts:
+            case_dict.pop("_cursorValue")
+            case_dict.pop("_cursorId")
+            validated_cases.append(RepairCaseListItem(**case_dict))
 
         return FilteredRepairCasesResponse(
             cases=validated_cases,
             total_count=total_count,
             page=page,
             limit=limit,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            total_count_is_approximate=total_count_is_approximate,
         )
 
+    except HTTPException:
+        raise
     except mysql.connector.Error as err:
         print(f"MySQL Error: {err}")
         raise HTTPException(status_code=500, detail=f"Database error occurred: {err}")
@@ -188,26 +295,27 @@ async def get_cases(
 
 
 @router.get("/repair-case/{case_id}", response_model=RepairCaseDB)
-async def get_repair_case_details(case_id: str):
+def get_repair_case_details(case_id: str):
     """
     Fetches the full details for a specific repair case by its caseId.
     """
     cnx = None
     try:
-        cnx = get_mysql_connection()
+        cnx = _get_connection()
         cursor = cnx.cursor(dictionary=True)
 
-        query = """
+        raw_detail_expr, payload_join = get_repair_case_schema().raw_detail_source()
+        query = f"""
             SELECT 
-                caseId, caseNumber, customerName, customerEmail, customerCity,
+                r.caseId, caseNumber, customerName, customerEmail, customerCity,
                 productName, manufacturer, symptoms, storeName, status, warranty,
-                serviceType, currency, fetchedAt, lastApiUpdate, rawApiDetail,
+                serviceType, currency, fetchedAt, lastApiUpdate, {raw_detail_expr} AS rawApiDetail,
                 insuranceContractNumber, insuranceIsActive, insuranceName,
                 insuranceDeductible, insuranceSettlementAmount, customerCompanyName,
                 customerNumber, customerFirstName, customerLastName, customerPhoneMain,
                 customerZipCode, productSerialNumber, totalRepairCost
-            FROM repair_cases 
-            WHERE caseId = %s
+            FROM repair_cases r {payload_join}
+            WHERE r.caseId = %s
         """
 
         # print(f"DEBUG: Executing SQL Query: {query}") # For debugging
@@ -218,6 +326,9 @@ async def get_repair_case_details(case_id: str):
         if not case_dict:
             raise HTTPException(status_code=404, detail="Repair case not found")
 
+        # rawApiDetail may be stored compressed, decode it before parsing the JSON
+        case_dict["rawApiDetail"] = decode_raw_detail(case_dict.get("rawApiDetail"))
+
         # Attempt to parse rawApiDetail if it's a JSON string
         if case_dict.get("rawApiDetail") and isinstance(case_dict["rawApiDetail"], str):
             try:
@@ -229,6 +340,8 @@ async def get_repair_case_details(case_id: str):
 
         return RepairCaseDB(**case_dict)
 
+    except HTTPException:
+        raise
     except mysql.connector.Error as err:
         print(f"MySQL Error: {err}")
         raise HTTPException(status_code=500, detail=f"Database error occurred: {err}")
@@ -247,14 +360,14 @@ async def get_repair_case_details(case_id: str):
 
 
 @router.get("/export-repair-cases-csv", response_class=StreamingResponse, tags=["stream"])
-async def export_repair_cases_csv(insuranceName: str | None = Query(None)):
+def export_repair_cases_csv(insuranceName: str | None = Query(None)):
     """
     Fetches repair cases from the MySQL database, similar to /filtered-repair-cases,
     and returns them as a CSV file download.
     """
     cnx = None
     try:
-        cnx = get_mysql_connection()
+        cnx = _get_connection()
         cursor = cnx.cursor(dictionary=True)
 
         base_query = """
@@ -264,14 +377,10 @@ async def export_repair_cases_csv(insuranceName: str | None = Query(None)):
             FROM repair_cases 
         """
 
-        core_filter_condition = "insuranceIsActive = 1 AND IFNULL(LOWER(insuranceName), '') != 'wertgarantie'"
-
-        where_clauses = [core_filter_condition]
-        query_params = []
-
+        insurance_filter = None
         if insuranceName and insuranceName.lower() != "null" and insuranceName != "_ALL_INSURANCES_":
-            where_clauses.append("LOWER(insuranceName) = %s")
-            query_params.append(insuranceName.lower())
+            insurance_filter = insuranceName
+        where_clauses, query_params = build_case_filters(get_repair_case_schema(), insurance_name=insurance_filter)
 
         full_query = base_query + " WHERE " + " AND ".join(where_clauses) + " ORDER BY lastApiUpdate DESC;"
 
@@ -344,6 +453,8 @@ async def export_repair_cases_csv(insuranceName: str | None = Query(None)):
             headers={"Content-Disposition": "attachment; filename=reparaturfaelle_export.csv"},
         )
 
+    except HTTPException:
+        raise
     except mysql.connector.Error as err:
         print(f"MySQL Error during CSV export: {err}")
         raise HTTPException(status_code=500, detail=f"Database error during CSV export: {err}")
@@ -361,7 +472,7 @@ async def export_repair_cases_csv(insuranceName: str | None = Query(None)):
 
 
 @router.get("/export-old-repair-cases-excel", tags=["View Cases", "stream"])
-async def export_old_repair_cases_excel():
+def export_old_repair_cases_excel():
     """
     Fetches repair cases from MySQL where isPresentInLastApiSync = 0
     and returns them as an Excel (XLSX) file.
@@ -369,26 +480,23 @@ async def export_old_repair_cases_excel():
     cnx = None
     cursor = None
     try:
-        # Use the imported get_mysql_connection_and_ensure_table function
-        cnx = get_mysql_connection()
-        if not cnx:
-            # This path might not be hit if get_mysql_connection_and_ensure_table raises on failure
-            raise HTTPException(status_code=500, detail="Failed to connect to database for export.")
+        cnx = _get_connection()
 
         cursor = cnx.cursor(dictionary=True)  # Fetch as dictionaries
 
         # Fetch all columns for old cases
-        query = """
+        raw_detail_expr, payload_join = get_repair_case_schema().raw_detail_source()
+        query = f"""
             SELECT 
-                id, caseId, caseNumber, customerName, customerEmail, customerCity, 
+                r.id, r.caseId, caseNumber, customerName, customerEmail, customerCity, 
                 productName, manufacturer, symptoms, insuranceStatus_old, storeName, 
-                status, warranty, serviceType, currency, rawApiDetail, fetchedAt, 
+                status, warranty, serviceType, currency, {raw_detail_expr} AS rawApiDetail, fetchedAt, 
                 lastApiUpdate, insuranceContractNumber, insuranceIsActive, insuranceName, 
                 insuranceDeductible, insuranceSettlementAmount, customerCompanyName, 
                 customerNumber, customerFirstName, customerLastName, customerPhoneMain, 
                 customerZipCode, productSerialNumber, totalRepairCost, 
                 isPresentInLastApiSync, sourceType
-            FROM repair_cases
+            FROM repair_cases r {payload_join}
             WHERE isPresentInLastApiSync = 0;
         """
         print(f"Executing query for old cases export (Excel): {query}")
@@ -414,10 +522,13 @@ async def export_old_repair_cases_excel():
         # Convert to pandas DataFrame
         df = pd.DataFrame(old_cases)
 
-        # Handle potential JSON in rawApiDetail for Excel compatibility
+        # Decompress rawApiDetail and handle potential JSON for Excel compatibility
         if "rawApiDetail" in df.columns:
             df["rawApiDetail"] = df["rawApiDetail"].apply(
-                lambda x: (json.dumps(x) if x is not None and not isinstance(x, str) else x)
+                lambda x: (
+                    decode_raw_detail(x) if isinstance(x, (bytes, bytearray))
+                    else json.dumps(x) if x is not None and not isinstance(x, str) else x
+                )
             )
 
         # Create Excel file in memory
@@ -434,6 +545,8 @@ async def export_old_repair_cases_excel():
             headers=headers,
         )
 
+    except HTTPException:
+        raise
     except mysql.connector.Error as err:
         print(f"MySQL Error during old cases Excel export: {err}")
         raise HTTPException(status_code=500, detail=f"Database error during Excel export: {err}")
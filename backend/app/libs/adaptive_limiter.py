@@ -0,0 +1,129 @@
+"""Adaptive (AIMD) concurrency limit for upstream requests.
+
+Usage:
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, max_limit=200)
+
+    await limiter.acquire()
+    started = time.monotonic()
+    try:
+        response = await send_request()
+    finally:
+        limiter.release()
+    limiter.on_success(time.monotonic() - started)  # or limiter.on_overload() on 429/5xx/timeouts
+    limiter.pause(retry_after_seconds)               # when upstream sends Retry-After
+
+The limit grows by about one request per round of successful, fast
+responses (additive increase) and is halved when upstream shows overload
+(multiplicative decrease), at most once per cooldown so that a burst of
+failures from requests that were already in flight only counts once. A
+response much slower than the fastest seen so far stops the growth before
+upstream starts failing.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+# Configuration
+INITIAL_LIMIT = int(os.getenv("SYNC_FETCH_INITIAL_CONCURRENCY", "20"))
+MIN_LIMIT = 1
+DECREASE_FACTOR = 0.5
+LATENCY_TOLERANCE = float(os.getenv("SYNC_FETCH_LATENCY_TOLERANCE", "3.0"))  # Slower than baseline * this counts as congested
+DECREASE_COOLDOWN = 2.0  # Seconds between two decreases
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bounds in-flight requests by a limit that follows what upstream can sustain."""
+
+    def __init__(self, initial_limit: int = INITIAL_LIMIT, max_limit: int = 200, min_limit: int = MIN_LIMIT):
+        self.max_limit = max(min_limit, max_limit)
+        self.min_limit = min_limit
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.pauses = 0
+
+        self._baseline_latency = None
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._waiters = deque()
+
+    async def acquire(self):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done():
+                    self._wake()  # Pass the wakeup on to the next waiter
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def on_success(self, latency: float):
+        if self._baseline_latency is None or latency < self._baseline_latency:
+            self._baseline_latency = latency
+        else:
+            # Let the baseline drift up slowly, so one lucky response does not pin it forever
+            self._baseline_latency += (latency - self._baseline_latency) * 0.01
+
+        if latency > self._baseline_latency * LATENCY_TOLERANCE:
+            return  # Upstream is slowing down, hold the current limit
+        if self.limit < self.max_limit:
+            previous = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if int(self.limit) > previous:
+                self.increases += 1
+                self._wake()
+
+    def on_overload(self):
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        new_limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.decreases += 1
+
+    def pause(self, seconds: float):
+        """Holds back all new requests for the given time, e.g. from a Retry-After header."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self.pauses += 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "pauses": self.pauses,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+        }
@@ -0,0 +1,129 @@
+"""Cached and estimated row counts for the /cases filters.
+
+Usage:
+
+    from app.libs.case_counts import bump_data_generation, case_count_cache, estimate_count, read_data_generation
+
+    generation = read_data_generation(cursor)  # None if the generation table is missing
+    total = case_count_cache.get(key, generation)
+    if total is None:
+        cursor.execute("SELECT COUNT(*) ...")
+        case_count_cache.put(key, generation, total)
+
+    estimate = estimate_count(cursor, where_clause, params)  # Optimizer estimate, no scan
+
+    bump_data_generation(cursor)  # In the transaction that changes repair_cases
+
+The generation is a single counter row in MySQL, bumped with every batch the
+sync writes and when a sync finishes. A cached count is only used while the
+generation it was computed at is still current, so every uvicorn worker sees
+a change as soon as it is committed. COUNT_CACHE_TTL additionally bounds the
+age of an entry, for edits made to repair_cases outside of the sync. Filters
+relative to NOW() move on by themselves, so callers put the current minute
+into the key of such a filter.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import mysql.connector
+
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+from app.libs.repair_case_schema import GENERATION_TABLE
+
+COUNT_CACHE_TTL = float(os.getenv("CASES_COUNT_CACHE_TTL", "300"))  # Seconds
+COUNT_CACHE_SIZE = int(os.getenv("CASES_COUNT_CACHE_SIZE", "1000"))  # Distinct filters
+
+
+class CountCache:
+    """LRU of filter key -> (generation, count, stored at)."""
+
+    def __init__(self, max_entries: int = COUNT_CACHE_SIZE, ttl: float = COUNT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: Optional[int]) -> Optional[int]:
+        if generation is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation or time.monotonic() - entry[2] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, generation: Optional[int], count: int):
+        if generation is None:
+            return
+        with self._lock:
+            self._entries[key] = (generation, count, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+case_count_cache = CountCache()
+
+
+def read_data_generation(cursor) -> Optional[int]:
+    """Returns the current repair_cases generation, or None if it cannot be read."""
+    try:
+        cursor.execute(f"SELECT generation FROM {GENERATION_TABLE} WHERE id = 1")
+        row = cursor.fetchone()
+    except mysql.connector.Error as err:
+        print(f"Could not read {GENERATION_TABLE}, counts are not cached: {err}")
+        return None
+    if row is None:
+        return None
+    return row['generation'] if isinstance(row, dict) else row[0]
+
+
+def bump_data_generation(cursor):
+    """Invalidates the cached counts of every worker. Runs in the caller's transaction."""
+    cursor.execute(f"UPDATE {GENERATION_TABLE} SET generation = generation + 1, updatedAt = UTC_TIMESTAMP() WHERE id = 1")
+
+
+def bump_data_generation_now():
+    """Bumps the generation on its own sync pool connection and commits. Failures are only logged."""
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        print("Failed to get database connection to bump the data generation.")
+        return
+    try:
+        cursor = cnx.cursor()
+        bump_data_generation(cursor)
+        cursor.close()
+        cnx.commit()
+    except mysql.connector.Error as err:
+        print(f"Could not bump the data generation: {err}")
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+
+def estimate_count(cursor, where_clause: str, params: tuple) -> Optional[int]:
+    """Returns the optimizer's row estimate for the filter from EXPLAIN, without counting."""
+    try:
+        cursor.execute(f"EXPLAIN SELECT COUNT(*) FROM repair_cases {where_clause}", params)
+        rows = cursor.fetchall()
+    except mysql.connector.Error as err:
+        print(f"EXPLAIN for the count estimate failed: {err}")
+        return None
+    if not rows:
+        return None
+    row = rows[0]
+    if not isinstance(row, dict):
+        row = dict(zip(cursor.column_names, row))
+    if row.get('rows') is None:
+        return None
+    # 'filtered' is the share of examined rows expected to match the remaining conditions
+    return int(float(row['rows']) * float(row.get('filtered') or 100) / 100)
@@ -0,0 +1,68 @@
+"""WHERE clauses of the case list filters, shared by /cases, the CSV export and scripts/check_case_indexes.py.
+
+Usage:
+
+    from app.libs.case_filters import build_case_filters
+
+    where_clauses, params = build_case_filters(
+        schema, insurance_name="allianz", active_only=True, time_range_months=6,
+    )
+    where_clause = " WHERE " + " AND ".join(where_clauses)
+
+Once migrations/009_normalized_filter_columns.sql is applied, the filters
+compare the stored lower-cased columns insuranceNameNorm and statusNorm,
+which the composite indexes of that migration cover together with the
+lastApiUpdate sort. Before that, the same conditions are written with
+LOWER() around the original columns. With migrations/010_case_lifecycle.sql
+applied and all rows classified with the current status list, "active only"
+is an equality on the lifecycle column the sync classifies from the status,
+instead of a NOT IN over all ended statuses.
+"""
+
+from typing import Optional
+
+from app.libs.case_status import INACTIVE_STATUSES, LIFECYCLE_OPEN
+from app.libs.repair_case_schema import RepairCaseSchema
+
+NORMALIZED_COLUMNS = ('insuranceNameNorm', 'statusNorm')
+
+# Cases of this insurer are never listed
+EXCLUDED_INSURANCE = 'wertgarantie'
+
+
+def normalized_expressions(schema: RepairCaseSchema) -> tuple:
+    """Returns the SQL for the lower-cased insuranceName ('' for NULL) and the lower-cased status."""
+    if set(NORMALIZED_COLUMNS) <= schema.columns:
+        return 'insuranceNameNorm', 'statusNorm'
+    return "IFNULL(LOWER(insuranceName), '')", "LOWER(status)"
+
+
+def build_case_filters(
+    schema: RepairCaseSchema,
+    insurance_name: Optional[str] = None,
+    active_only: bool = False,
+    time_range_months: Optional[int] = None,
+) -> tuple:
+    """Returns (where_clauses, params) for the list filters. insurance_name is matched case-insensitively."""
+    insurance_expr, status_expr = normalized_expressions(schema)
+    where_clauses = [f"insuranceIsActive = 1 AND {insurance_expr} != %s"]
+    params = [EXCLUDED_INSURANCE]
+
+    if insurance_name:
+        where_clauses.append(f"{insurance_expr} = %s")
+        params.append(insurance_name.lower())
+
+    # Exclude closed/inactive statuses
+    if active_only and schema.has_lifecycle:
+        where_clauses.append("lifecycle = %s")
+        params.append(LIFECYCLE_OPEN)
+    elif active_only:
+        status_placeholders = ', '.join(['%s'] * len(INACTIVE_STATUSES))
+        where_clauses.append(f"{status_expr} NOT IN ({status_placeholders})")
+        params.extend(s.lower() for s in INACTIVE_STATUSES)
+
+    if time_range_months and time_range_months > 0:
+        where_clauses.append("lastApiUpdate >= DATE_SUB(NOW(), INTERVAL %s MONTH)")
+        params.append(time_range_months)
+
+    return where_clauses, params
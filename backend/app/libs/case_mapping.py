@@ -0,0 +1,144 @@
+"""Declarative mapping from a Repairline case payload to repair_cases columns.
+
+Usage:
+
+    from app.libs.case_mapping import map_case_payload, MAPPED_COLUMNS
+
+    row = map_case_payload(case_data)                                  # All mapped columns
+    row = map_case_payload(case_data, columns=("customerZipCode",))    # Only some
+
+A new column only needs an entry in CASE_MAPPING_SPEC. The sync picks it up
+right away, and scripts/backfill_case_columns.py fills it for existing rows
+from the stored rawApiDetail, without calling the Repairline API.
+
+The spec is compiled once into one extractor function per column, so mapping
+a case is a flat loop over prepared getters instead of re-reading the spec.
+"""
+
+from typing import Callable, Iterable, Optional
+
+from app.libs.case_status import classify_lifecycle
+
+
+def clean_value(value):
+    """Converts empty strings to None and strips surrounding whitespace."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip() if value.strip() else None
+    return value
+
+
+class Field:
+    """A value read from a path of nested keys, cleaned unless clean=False."""
+
+    def __init__(self, *path: str, clean: bool = True):
+        self.path = path
+        self.clean = clean
+
+
+class Computed:
+    """A value computed from the whole payload by a function."""
+
+    def __init__(self, func: Callable[[dict], object]):
+        self.func = func
+
+
+def _latest_status(case_data: dict):
+    bookings = case_data.get('Bookings') or []
+    latest_status = bookings[-1].get('Status') if bookings else None
+    if not latest_status:
+        latest_status = case_data.get('Status')  # Fallback to top-level status
+    return clean_value(latest_status)
+
+
+def _lifecycle(case_data: dict):
+    return classify_lifecycle(_latest_status(case_data))
+
+
+def _customer_name(case_data: dict):
+    customer_data = case_data.get('Customer') or {}
+    first_name = clean_value(customer_data.get('FirstName'))
+    last_name = clean_value(customer_data.get('LastName'))
+    if first_name and last_name:
+        return f"{first_name} {last_name}"
+    return first_name or last_name or None
+
+
+def _total_repair_cost(case_data: dict):
+    positions = case_data.get('Positions') or []
+    try:
+        total = sum(float(pos.get('PriceGross', 0.0) or 0.0) for pos in positions)
+    except (ValueError, TypeError):
+        return None
+    return total if total != 0.0 else None
+
+
+# Column name -> where its value comes from in the API payload
+CASE_MAPPING_SPEC = {
+    'caseId': Field('CaseId', clean=False),
+    'caseNumber': Field('CaseNumber'),
+    'customerName': Computed(_customer_name),
+    'customerEmail': Field('Customer', 'Email'),
+    'customerCity': Field('Customer', 'City'),
+    'productName': Field('Product', 'ProductName'),
+    'manufacturer': Field('Product', 'Manufacturer'),
+    'symptoms': Field('Symptoms', 'Comment'),
+    'storeName': Field('Store', 'Current'),
+    'status': Computed(_latest_status),
+    'warranty': Field('Warranty'),
+    'serviceType': Field('Service', 'Servicetype'),
+    'currency': Field('Currency'),
+    'insuranceContractNumber': Field('Insurance', 'ContractNumber'),
+    'insuranceName': Field('Insurance', 'Name'),
+    'insuranceDeductible': Field('Insurance', 'Retention', clean=False),
+    'insuranceSettlementAmount': Field('Insurance', 'SettlementAmount', clean=False),
+    'customerCompanyName': Field('Customer', 'CompanyName'),
+    'customerNumber': Field('Customer', 'CustomerNumber'),
+    'customerFirstName': Field('Customer', 'FirstName'),
+    'customerLastName': Field('Customer', 'LastName'),
+    'customerPhoneMain': Field('Customer', 'PhoneMain'),
+    'customerZipCode': Field('Customer', 'ZipCode'),
+    'productSerialNumber': Field('Product', 'SerialNumber'),
+    'totalRepairCost': Computed(_total_repair_cost),
+    'lifecycle': Computed(_lifecycle),
+}
+
+MAPPED_COLUMNS = tuple(CASE_MAPPING_SPEC)
+
+
+def _compile_field(field: Field) -> Callable[[dict], object]:
+    *parents, key = field.path
+
+    def extract(case_data: dict):
+        data = case_data
+        for parent in parents:
+            # Nested objects can be missing or null in the payload
+            data = data.get(parent) or {}
+        value = data.get(key)
+        return clean_value(value) if field.clean else value
+
+    return extract
+
+
+def compile_mapping(spec: dict) -> dict:
+    """Turns a mapping spec into a dict of column name -> extractor function."""
+    compiled = {}
+    for column, source in spec.items():
+        if isinstance(source, Field):
+            compiled[column] = _compile_field(source)
+        elif isinstance(source, Computed):
+            compiled[column] = source.func
+        else:
+            raise TypeError(f"Unsupported mapping for column {column}: {source!r}")
+    return compiled
+
+
+_COMPILED_MAPPING = compile_mapping(CASE_MAPPING_SPEC)
+
+
+def map_case_payload(case_data: dict, columns: Optional[Iterable[str]] = None) -> dict:
+    """Maps a case payload to column values, for all mapped columns or the given ones."""
+    if columns is None:
+        return {column: extract(case_data) for column, extract in _COMPILED_MAPPING.items()}
+    return {column: _COMPILED_MAPPING[column](case_data) for column in columns}
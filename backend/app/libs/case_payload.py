@@ -0,0 +1,85 @@
+"""Helpers for the raw Repairline payload stored in repair_cases.rawApiDetail.
+
+Usage:
+
+    from app.libs.case_payload import canonical_json, payload_digest, encode_raw_detail, decode_raw_detail
+
+    raw_detail_json = canonical_json(case_data)
+    digest = payload_digest(raw_detail_json)  # 32 bytes, stored in rawApiDetailHash
+    stored = encode_raw_detail(raw_detail_json)  # Compressed bytes for a LONGBLOB column
+    raw_detail_json = decode_raw_detail(row['rawApiDetail'])  # Plain JSON text again
+
+Compressed values start with a short marker (a NUL byte, which never occurs in
+JSON text, followed by the codec name), so plain JSON written before
+migrations/005_compress_raw_api_detail.sql and compressed values can sit side
+by side and decode_raw_detail() reads both. RAW_DETAIL_COMPRESSION selects the
+codec for new writes: zlib (default), zstd (needs the zstandard package,
+falls back to zlib without it) or none. The digest is always taken over the
+plain JSON, so switching codecs never makes a case look changed.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # Optional, only needed for RAW_DETAIL_COMPRESSION=zstd
+    zstandard = None
+
+RAW_DETAIL_COMPRESSION = os.getenv("RAW_DETAIL_COMPRESSION", "zlib").strip().lower()
+ZLIB_LEVEL = int(os.getenv("RAW_DETAIL_ZLIB_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("RAW_DETAIL_ZSTD_LEVEL", "3"))
+
+_ZLIB_MARKER = b"\x00zl1"
+_ZSTD_MARKER = b"\x00zs1"
+
+if RAW_DETAIL_COMPRESSION == "zstd" and zstandard is None:
+    print("Warning: RAW_DETAIL_COMPRESSION=zstd but the zstandard package is not installed. Using zlib.")
+    RAW_DETAIL_COMPRESSION = "zlib"
+elif RAW_DETAIL_COMPRESSION not in ("zlib", "zstd", "none"):
+    print(f"Warning: Unknown RAW_DETAIL_COMPRESSION '{RAW_DETAIL_COMPRESSION}'. Using zlib.")
+    RAW_DETAIL_COMPRESSION = "zlib"
+
+
+def canonical_json(case_data) -> str:
+    """Serializes a payload in the normalized form stored in rawApiDetail."""
+    return json.dumps(case_data, sort_keys=True)
+
+
+def payload_digest(raw_detail_json: str) -> bytes:
+    """Returns the SHA-256 digest of an already canonical rawApiDetail string."""
+    return hashlib.sha256(raw_detail_json.encode('utf-8')).digest()
+
+
+def encode_raw_detail(raw_detail_json: str, compression: Optional[str] = None) -> bytes:
+    """Encodes a rawApiDetail string for storage, compressed with the configured codec."""
+    compression = compression or RAW_DETAIL_COMPRESSION
+    data = raw_detail_json.encode('utf-8')
+    if compression == "zstd":
+        return _ZSTD_MARKER + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if compression == "zlib":
+        return _ZLIB_MARKER + zlib.compress(data, ZLIB_LEVEL)
+    return data
+
+
+def is_compressed_raw_detail(value) -> bool:
+    """Tells whether a stored rawApiDetail value carries a compression marker."""
+    return isinstance(value, (bytes, bytearray)) and value[:1] == b"\x00"
+
+
+def decode_raw_detail(value: Union[str, bytes, bytearray, None]) -> Optional[str]:
+    """Returns the plain JSON text of a stored rawApiDetail value, compressed or not."""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value.startswith(_ZLIB_MARKER):
+        return zlib.decompress(value[len(_ZLIB_MARKER):]).decode('utf-8')
+    if value.startswith(_ZSTD_MARKER):
+        if zstandard is None:
+            raise RuntimeError("rawApiDetail is zstd-compressed but the zstandard package is not installed.")
+        # Frames written by ZstdCompressor.compress() carry their content size
+        return zstandard.ZstdDecompressor().decompress(value[len(_ZSTD_MARKER):]).decode('utf-8')
+    return value.decode('utf-8')
@@ -0,0 +1,119 @@
+"""Search over the /cases text columns.
+
+Usage:
+
+    from app.libs.case_search import build_search
+
+    search = build_search("müller iphone", use_fulltext=SEARCH_INDEX in schema.indexes)
+    where_clauses.append(search.where_sql)
+    query_params.extend(search.where_params)
+    if search.relevance_sql:  # Not for the LIKE scan
+        ... ORDER BY {search.relevance_sql} DESC  (with search.relevance_params)
+
+A search that looks like a case or contract number ("RL-12345") is a prefix
+match on caseNumber and insuranceContractNumber, which their indexes serve;
+exact matches rank first.
+
+Otherwise, with migrations/008_case_search_fulltext.sql applied, a search is a
+FULLTEXT match in boolean mode: every word of the search must start a word
+somewhere in the indexed columns, and rows are ranked by relevance. MariaDB's
+parser only indexes words of at least innodb_ft_min_token_size characters, so
+shorter words are left out of the MATCH and checked as substrings of the
+matched rows instead. Searches made only of short words, and all searches
+before the migration, fall back to the LIKE scan, which also matches inside
+words.
+"""
+
+import os
+import re
+from typing import NamedTuple, Optional
+
+# Must match the columns of the FULLTEXT index, in the same order
+SEARCH_COLUMNS = (
+    'caseNumber', 'customerName', 'productName', 'insuranceContractNumber', 'status', 'insuranceName',
+)
+# Columns with a plain index (database_indexes.sql, migrations/008) searched by number prefix
+NUMBER_COLUMNS = ('caseNumber', 'insuranceContractNumber')
+SEARCH_INDEX = "ft_case_search"
+MIN_TOKEN_SIZE = int(os.getenv("SEARCH_MIN_TOKEN_SIZE", "3"))  # MariaDB's innodb_ft_min_token_size
+MAX_SEARCH_TERMS = 8
+# MATCH scores are floats; the relevance is scaled to an integer so that keyset
+# cursors can compare it for equality
+RELEVANCE_SCALE = 10000
+
+# Words as the FULLTEXT parser splits them; punctuation, including the boolean mode operators, separates terms
+_WORD = re.compile(r"\w+")
+# Letters followed by digits, like case numbers (RL-00012345) and contract numbers (V-1)
+_NUMBER = re.compile(r"[^\W\d_]+-?\d[\w-]*")
+
+
+class CaseSearch(NamedTuple):
+    where_sql: str
+    where_params: tuple
+    relevance_sql: Optional[str] = None
+    relevance_params: tuple = ()
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def split_terms(search: str) -> tuple:
+    """Returns (long_terms, short_terms): the words the FULLTEXT index holds and the ones it is too short for."""
+    terms = _WORD.findall(search)[:MAX_SEARCH_TERMS]
+    return (
+        [term for term in terms if len(term) >= MIN_TOKEN_SIZE],
+        [term for term in terms if len(term) < MIN_TOKEN_SIZE],
+    )
+
+
+def fulltext_query(terms) -> str:
+    """Builds the boolean mode query requiring every term."""
+    # The truncation operator matches every indexed word starting with the term
+    return " ".join(f"+{term}*" for term in terms)
+
+
+def _substring_filter(term: str) -> tuple:
+    pattern = f"%{_like_escape(term.lower())}%"
+    return (
+        "(" + " OR ".join(f"LOWER({column}) LIKE %s" for column in SEARCH_COLUMNS) + ")",
+        (pattern,) * len(SEARCH_COLUMNS),
+    )
+
+
+def _like_search(search: str) -> CaseSearch:
+    search_term = f"%{search.strip().lower()}%"
+    where_sql = "(" + " OR ".join(f"LOWER({column}) LIKE %s" for column in SEARCH_COLUMNS) + ")"
+    return CaseSearch(where_sql, (search_term,) * len(SEARCH_COLUMNS))
+
+
+def _number_search(number: str) -> CaseSearch:
+    # No LOWER() here, it would keep the indexes from being used; the collation ignores case anyway
+    prefix = f"{_like_escape(number)}%"
+    where_sql = "(" + " OR ".join(f"{column} LIKE %s" for column in NUMBER_COLUMNS) + ")"
+    relevance_sql = "(" + " OR ".join(f"{column} = %s" for column in NUMBER_COLUMNS) + ")"
+    return CaseSearch(
+        where_sql, (prefix,) * len(NUMBER_COLUMNS),
+        relevance_sql, (number,) * len(NUMBER_COLUMNS),
+    )
+
+
+def build_search(search: str, use_fulltext: bool) -> CaseSearch:
+    """Returns the WHERE condition for a search term and, unless it is a LIKE scan, the relevance expression."""
+    search = search.strip()
+    if _NUMBER.fullmatch(search):
+        return _number_search(search)
+    long_terms, short_terms = split_terms(search) if use_fulltext else ([], [])
+    if not long_terms:
+        return _like_search(search)
+
+    query = fulltext_query(long_terms)
+    match_sql = f"MATCH({', '.join(SEARCH_COLUMNS)}) AGAINST (%s IN BOOLEAN MODE)"
+    where_sql, where_params = match_sql, (query,)
+    for term in short_terms:
+        # The index narrows the rows down, the short words are then checked on those rows only
+        filter_sql, filter_params = _substring_filter(term)
+        where_sql += " AND " + filter_sql
+        where_params += filter_params
+    relevance_sql = f"CAST({match_sql} * {RELEVANCE_SCALE} AS SIGNED)"
+    return CaseSearch(where_sql, where_params, relevance_sql, (query,))
@@ -0,0 +1,86 @@
+"""Case status groups and lifecycles shared by the case list and the sync.
+
+Usage:
+
+    from app.libs.case_status import INACTIVE_STATUSES, LIFECYCLE_OPEN, classify_lifecycle
+
+    classify_lifecycle("Abgeschlossen")  # "closed"
+    classify_lifecycle("In Reparatur")   # "open"
+
+This is the one place that decides which statuses end a case. The sync stores
+classify_lifecycle(status) in repair_cases.lifecycle when it writes a row, and
+the case list filters on that column. Set CASE_STATUS_LIFECYCLES to a JSON
+object of lower-cased status -> "closed" or "cancelled" to replace the list
+below; statuses not listed are open. After a change, the next sync rewrites
+the column for all rows (see app/libs/lifecycle_reclassification.py).
+
+Statuses are compared stripped and lower-cased (normalize_status), in Python
+only: the sync and the lifecycle reclassification both call classify_lifecycle,
+so they can never disagree about a status.
+"""
+
+import hashlib
+import json
+import os
+from typing import Optional
+
+LIFECYCLE_OPEN = "open"
+LIFECYCLE_CLOSED = "closed"
+LIFECYCLE_CANCELLED = "cancelled"
+LIFECYCLE_UNKNOWN = "unknown"  # The case has no status, or a blank one
+_ENDED_LIFECYCLES = (LIFECYCLE_CLOSED, LIFECYCLE_CANCELLED)
+
+# Statuses of closed or inactive cases
+_DEFAULT_STATUS_LIFECYCLES = {
+    'abgeschlossen': LIFECYCLE_CLOSED,
+    'geschlossen': LIFECYCLE_CLOSED,
+    'closed': LIFECYCLE_CLOSED,
+    'completed': LIFECYCLE_CLOSED,
+    'gerät entsorgen': LIFECYCLE_CLOSED,
+    'storniert': LIFECYCLE_CANCELLED,
+    'cancelled': LIFECYCLE_CANCELLED,
+    'abgelehnt': LIFECYCLE_CANCELLED,
+    'rejected': LIFECYCLE_CANCELLED,
+    'unsachgemäßer abbruch': LIFECYCLE_CANCELLED,
+    'reparaturabbruch': LIFECYCLE_CANCELLED,
+}
+
+
+def normalize_status(status) -> str:
+    """Returns the form statuses are compared in."""
+    return str(status).strip().lower()
+
+
+def _load_status_lifecycles() -> dict:
+    configured = os.getenv("CASE_STATUS_LIFECYCLES")
+    if not configured:
+        return dict(_DEFAULT_STATUS_LIFECYCLES)
+    try:
+        mapping = json.loads(configured)
+        if not isinstance(mapping, dict) or any(value not in _ENDED_LIFECYCLES for value in mapping.values()):
+            raise ValueError(f"values must be one of {', '.join(_ENDED_LIFECYCLES)}")
+    except ValueError as e:
+        print(f"Warning: Invalid CASE_STATUS_LIFECYCLES ({e}). Using the default status list.")
+        return dict(_DEFAULT_STATUS_LIFECYCLES)
+    return {normalize_status(status): lifecycle for status, lifecycle in mapping.items()}
+
+
+# Lower-cased status -> lifecycle, for every status that ends a case
+STATUS_LIFECYCLES = _load_status_lifecycles()
+
+INACTIVE_STATUSES = tuple(STATUS_LIFECYCLES)
+
+
+def classify_lifecycle(status: Optional[str]) -> str:
+    """Returns the lifecycle of a case with the given status."""
+    if status is None:
+        return LIFECYCLE_UNKNOWN
+    status = normalize_status(status)
+    if not status:
+        return LIFECYCLE_UNKNOWN  # The sync stores a blank status as NULL
+    return STATUS_LIFECYCLES.get(status, LIFECYCLE_OPEN)
+
+
+def lifecycle_fingerprint() -> str:
+    """Identifies the current status list, to detect when stored lifecycles are outdated."""
+    return hashlib.sha256(json.dumps(STATUS_LIFECYCLES, sort_keys=True).encode('utf-8')).hexdigest()
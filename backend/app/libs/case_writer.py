@@ -0,0 +1,173 @@
+"""Write-behind stage for repair_cases upserts.
+
+Usage:
+
+    with CaseWriteBuffer(batch_size=200, flush_interval=2.0) as writer:
+        writer.add({"caseId": 1, "caseNumber": "A-1", ...})
+        writer.add({"caseId": 2, ...}, raw_detail=encoded_payload)  # Also upserts repair_case_payloads
+    print(writer.rows_written, writer.rows_failed)
+
+Rows added from any thread are collected and written by a single flusher
+thread as multi-row `INSERT ... ON DUPLICATE KEY UPDATE` statements, one
+commit per batch. Raw payloads passed along with a row are upserted into
+repair_case_payloads in the same transaction. A batch is flushed when it is
+full or when the flush interval has passed, and the whole batch is retried
+if the write fails.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import mysql.connector
+
+from app.libs import sync_metrics
+from app.libs.case_counts import bump_data_generation
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+from app.libs.repair_case_schema import RepairCaseSchema, get_repair_case_schema
+
+# Configuration
+WRITE_BATCH_SIZE = int(os.getenv("SYNC_WRITE_BATCH_SIZE", "200"))
+WRITE_FLUSH_INTERVAL = float(os.getenv("SYNC_WRITE_FLUSH_INTERVAL", "2.0"))  # Seconds
+WRITE_MAX_RETRIES = 3
+WRITE_RETRY_DELAY = 1  # Seconds, multiplied by the attempt number
+
+
+class CaseWriteBuffer:
+    """Collects mapped repair_cases rows and upserts them in batches."""
+
+    def __init__(
+        self,
+        batch_size: int = WRITE_BATCH_SIZE,
+        flush_interval: float = WRITE_FLUSH_INTERVAL,
+        max_retries: int = WRITE_MAX_RETRIES,
+        schema: Optional[RepairCaseSchema] = None,
+        on_batch_written: Optional[Callable[[list], None]] = None,
+    ):
+        # Rows must already be filtered through this schema; its upsert statements are reused
+        self.schema = schema or get_repair_case_schema()
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max(1, max_retries)
+        # Called from the flusher thread with the rows of every committed batch
+        self.on_batch_written = on_batch_written
+        # Producers block once this many rows are waiting, so a slow database
+        # slows down the fetch side instead of growing the buffer without bound
+        self.max_pending = self.batch_size * 4
+
+        self.batches_written = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+        self._cnx = None
+
+    def __enter__(self) -> "CaseWriteBuffer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="case-write-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, row: dict, raw_detail: Optional[bytes] = None):
+        """Queues one row, and optionally its raw payload, for upsert. Blocks while the buffer is full."""
+        with self._cond:
+            while len(self._pending) >= self.max_pending and not self._closing:
+                self._cond.wait()
+            self._pending.append((row, raw_detail))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def close(self):
+        """Flushes all remaining rows and stops the flusher thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._flush_pending()
+        if self._cnx is not None and self._cnx.is_connected():
+            self._cnx.close()
+        self._cnx = None
+
+    def _run(self):
+        while not self._closing:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush_pending()
+
+    def _flush_pending(self):
+        while True:
+            with self._cond:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                self._cond.notify_all()
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list):
+        # Rows are grouped by column set, since each group needs its own statement
+        groups = {}
+        payloads = []
+        for row, raw_detail in batch:
+            groups.setdefault(tuple(row.keys()), []).append(row)
+            if raw_detail is not None:
+                payloads.append((row['caseId'], raw_detail))
+        batch_rows = [row for row, _ in batch]
+
+        for attempt in range(self.max_retries):
+            try:
+                if self._cnx is None or not self._cnx.is_connected():
+                    self._cnx = get_mysql_connection(SYNC_POOL)
+                    if not self._cnx:
+                        raise mysql.connector.Error(msg="Failed to get database connection.")
+
+                with sync_metrics.DB_WRITE_SECONDS.time():
+                    cursor = self._cnx.cursor()
+                    for columns, rows in groups.items():
+                        cursor.executemany(self.schema.upsert_sql(columns), [list(row.values()) for row in rows])
+                    if payloads:
+                        cursor.executemany(self.schema.payload_upsert_sql(), payloads)
+                    if self.schema.has_generation_table:
+                        # Invalidates the cached /cases counts together with the commit
+                        bump_data_generation(cursor)
+                    cursor.close()
+                    self._cnx.commit()
+                break
+            except Exception as err:
+                if self._cnx is not None:
+                    try:
+                        self._cnx.rollback()
+                    except mysql.connector.Error:
+                        pass
+                if attempt < self.max_retries - 1:
+                    print(f"Batch upsert of {len(batch)} cases failed (attempt {attempt + 1}/{self.max_retries}): {err}, retrying...")
+                    time.sleep(WRITE_RETRY_DELAY * (attempt + 1))
+                else:
+                    print(f"Batch upsert of {len(batch)} cases failed after {self.max_retries} attempts: {err}")
+                    self.rows_failed += len(batch)
+                    sync_metrics.DB_WRITE_ROWS.labels(outcome="failed").inc(len(batch))
+                    return
+
+        # Only reached once the batch is committed, so nothing below can cause it to be written again
+        self.batches_written += 1
+        self.rows_written += len(batch)
+        sync_metrics.DB_WRITE_ROWS.labels(outcome="written").inc(len(batch))
+        print(f"Flushed batch of {len(batch)} cases to the database.")
+        if self.on_batch_written is not None:
+            try:
+                self.on_batch_written(batch_rows)
+            except Exception as err:
+                print(f"Callback for a written batch of {len(batch)} cases failed: {err}")
@@ -1,25 +1,246 @@
 import mysql.connector
 import os
+import threading
+import time
+from collections import deque
 
-def get_mysql_connection():
-    """Establishes and returns a MySQL database connection."""
-    try:
-        # Get credentials from environment variables
-        host = os.getenv("MYSQL_HOST")
-        user = os.getenv("MYSQL_USER")
-        password = os.getenv("MYSQL_PASSWORD")
-        database = os.getenv("MYSQL_DATABASE")
-        
+# Pool configuration
+POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "20"))  # Max open connections per process for request handlers
+SYNC_POOL_SIZE = int(os.getenv("MYSQL_SYNC_POOL_SIZE", "12"))  # Max open connections per process for the case sync
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "10"))  # Seconds to wait for a free connection
+POOL_RECYCLE_SECONDS = float(os.getenv("MYSQL_POOL_RECYCLE", "1800"))  # Reopen connections older than this
+POOL_PING_AFTER_SECONDS = float(os.getenv("MYSQL_POOL_PING_AFTER", "30"))  # Health check connections idle this long
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    Proxy for a pooled MySQL connection.
+    close() hands the connection back to the pool instead of closing it, so
+    callers keep using the usual connect/close pattern.
+    """
+
+    def __init__(self, pool: "MySQLConnectionPool", cnx, created_at: float):
+        self._pool = pool
+        self._cnx = cnx
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def is_connected(self) -> bool:
+        if self._released:
+            return False
+        if self._cnx.is_connected():
+            return True
+        # A dropped connection is never closed by callers, so give its slot back here
+        self._pool._release(self, broken=True)
+        return False
+
+    def close(self):
+        if not self._released:
+            self._pool._release(self)
+
+    def __del__(self):
+        if not self._released:
+            # The garbage collector can run this on a thread that holds the pool lock,
+            # so the slot is only queued here and reclaimed by the next pool call
+            self._released = True
+            self._pool._orphaned.append(self._cnx)
+
+
+class MySQLConnectionPool:
+    """Thread-safe pool with checkout timeout, idle health checks and recycling."""
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+        recycle_seconds: float = POOL_RECYCLE_SECONDS,
+        ping_after_seconds: float = POOL_PING_AFTER_SECONDS,
+    ):
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.recycle_seconds = recycle_seconds
+        self.ping_after_seconds = ping_after_seconds
+
+        self._idle = deque()  # (cnx, created_at, last_used_at)
+        self._open = 0  # Idle plus checked-out connections
+        self._cond = threading.Condition()
+        self._orphaned = deque()  # Connections of proxies that were never closed, see PooledConnection.__del__
+
+        self._stats = {
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "checkout_wait_seconds": 0.0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "connections_discarded": 0,
+        }
+
+    def get_connection(self) -> PooledConnection:
+        wait_started = time.monotonic()
+        deadline = wait_started + self.checkout_timeout
+        orphaned = []
+        with self._cond:
+            while True:
+                orphaned += self._reclaim_orphaned()
+                if self._idle:
+                    entry = self._idle.pop()  # Most recently used first, it is least likely to be stale
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["checkout_timeouts"] += 1
+                    for cnx in orphaned:
+                        _close_quietly(cnx)
+                    raise PoolTimeoutError(
+                        f"No database connection free after {self.checkout_timeout}s (pool size {self.size})."
+                    )
+                # Reclaimed orphans do not notify, so waiters check for them every second
+                self._cond.wait(min(remaining, 1.0))
+            self._stats["checkouts"] += 1
+            self._stats["checkout_wait_seconds"] += time.monotonic() - wait_started
+        for cnx in orphaned:
+            _close_quietly(cnx)
+
+        try:
+            if entry is None:
+                cnx, created_at = self._connect()
+            else:
+                cnx, created_at = self._validate(*entry)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, cnx, created_at)
+
+    def stats(self) -> dict:
+        with self._cond:
+            orphaned = self._reclaim_orphaned()
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["open"] = self._open
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._open - len(self._idle)
+        for cnx in orphaned:
+            _close_quietly(cnx)
+        return stats
+
+    def _reclaim_orphaned(self) -> list:
+        """Frees the slots of queued orphaned connections. Call with the lock held, close the returned connections after."""
+        orphaned = []
+        while self._orphaned:
+            orphaned.append(self._orphaned.popleft())
+        if orphaned:
+            self._open -= len(orphaned)
+            self._stats["connections_discarded"] += len(orphaned)
+        return orphaned
+
+    def _connect(self):
         cnx = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database,
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE"),
         )
-        return cnx
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return cnx, time.monotonic()
+
+    def _validate(self, cnx, created_at: float, last_used_at: float):
+        now = time.monotonic()
+        if now - created_at > self.recycle_seconds:
+            with self._cond:
+                self._stats["connections_recycled"] += 1
+            _close_quietly(cnx)
+            return self._connect()
+        if now - last_used_at > self.ping_after_seconds:
+            try:
+                cnx.ping(reconnect=False)
+            except mysql.connector.Error:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                _close_quietly(cnx)
+                return self._connect()
+        return cnx, created_at
+
+    def _release(self, pooled: PooledConnection, broken: bool = False):
+        pooled._released = True
+        cnx = pooled._cnx
+        if not broken:
+            try:
+                # Never hand out a connection with an open transaction or a stale read snapshot
+                if cnx.in_transaction:
+                    cnx.rollback()
+            except mysql.connector.Error:
+                broken = True
+
+        with self._cond:
+            if broken:
+                self._open -= 1
+                self._stats["connections_discarded"] += 1
+            else:
+                self._idle.append((cnx, pooled._created_at, time.monotonic()))
+            self._cond.notify()
+
+        if broken:
+            _close_quietly(cnx)
+
+
+def _close_quietly(cnx):
+    try:
+        cnx.close()
+    except Exception:
+        pass
+
+
+# Named pools. The case sync gets its own pool so a running sync can never
+# take the connections the HTTP handlers need.
+API_POOL = "api"
+SYNC_POOL = "sync"
+_POOL_SIZES = {API_POOL: POOL_SIZE, SYNC_POOL: SYNC_POOL_SIZE}
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool(name: str) -> MySQLConnectionPool:
+    with _pool_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = MySQLConnectionPool(size=_POOL_SIZES[name])
+        return pool
+
+
+def get_mysql_connection(pool: str = API_POOL):
+    """
+    Returns a connection from the named process-wide pool.
+    Code running on behalf of the case sync passes pool=SYNC_POOL.
+    Calling close() on it returns it to the pool. Returns None on failure.
+    """
+    try:
+        return _get_pool(pool).get_connection()
+    except PoolTimeoutError as e:
+        print(f"Database connection pool exhausted: {e}")
+        return None
     except mysql.connector.Error as err:
         print(f"An unexpected error occurred during DB connection: {err}")
         return None
     except Exception as e:
         print(f"A general error occurred: {e}")
         return None
+
+
+def get_pool_stats() -> dict:
+    """Returns counters and current usage of each connection pool, keyed by pool name."""
+    return {name: _get_pool(name).stats() for name in _POOL_SIZES}
@@ -0,0 +1,99 @@
+"""Opaque cursors and WHERE predicates for keyset pagination.
+
+Usage:
+
+    from app.libs.keyset_cursor import CursorError, decode_cursor, encode_cursor, keyset_predicate
+
+    position = decode_cursor(token, sort_field, sort_dir)        # Raises CursorError
+    sql, params = keyset_predicate(sort_field, "caseId", ascending, position["value"], position["id"])
+    ... ORDER BY sortField ASC, caseId ASC LIMIT 51
+
+    next_token = encode_cursor(sort_field, sort_dir, last_row_value, last_row_id, "next")
+
+A cursor holds the sort value and the tiebreaker of the row a page ends (or
+starts) at, so the next page is a range scan from that row instead of an
+OFFSET that reads and discards every row before it. Rows inserted or updated
+while paging do not shift the following pages.
+
+NULL sort values are treated as smaller than every other value, matching
+MySQL's ORDER BY (first when ascending, last when descending).
+"""
+
+import base64
+import datetime
+import json
+
+
+class CursorError(ValueError):
+    """The cursor token is malformed or belongs to a different sort order."""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return datetime.date.fromisoformat(value["d"])
+        raise CursorError("Unsupported cursor value.")
+    return value
+
+
+def encode_cursor(sort_field: str, sort_dir: str, value, row_id, direction: str) -> str:
+    """Returns an opaque token for the page after ("next") or before ("prev") a row."""
+    payload = {"f": sort_field, "o": sort_dir, "v": _encode_value(value), "id": row_id, "dir": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_field: str, sort_dir: str) -> dict:
+    """Decodes a token into {"value", "id", "direction"}. Raises CursorError."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        position = {
+            "value": _decode_value(payload["v"]),
+            "id": payload["id"],
+            "direction": payload["dir"],
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorError(f"Invalid cursor: {e}") from e
+    if payload.get("f") != sort_field or payload.get("o") != sort_dir:
+        raise CursorError("Cursor was issued for a different sort order.")
+    if position["direction"] not in ("next", "prev"):
+        raise CursorError("Invalid cursor direction.")
+    return position
+
+
+def keyset_predicate(sort_field: str, id_field: str, ascending: bool, value, row_id, sort_params=()) -> tuple:
+    """
+    Returns (sql, params) matching the rows after (value, row_id) in the order
+    `sort_field, id_field`, both ascending or both descending. sort_field may
+    be an expression with placeholders, whose sort_params are repeated for
+    each use of it.
+    """
+    sort_params = list(sort_params)
+    op = ">" if ascending else "<"
+    if sort_field == id_field:
+        return f"{id_field} {op} %s", [row_id]
+    if value is None:
+        if ascending:
+            # NULLs come first, then every non-NULL value
+            return (
+                f"(({sort_field} IS NULL AND {id_field} > %s) OR {sort_field} IS NOT NULL)",
+                sort_params + [row_id] + sort_params,
+            )
+        return f"({sort_field} IS NULL AND {id_field} < %s)", sort_params + [row_id]
+    sql = f"({sort_field} {op} %s OR ({sort_field} = %s AND {id_field} {op} %s)"
+    params = sort_params + [value] + sort_params + [value, row_id]
+    if not ascending:
+        sql += f" OR {sort_field} IS NULL"  # NULLs come last when descending
+        params += sort_params
+    return sql + ")", params
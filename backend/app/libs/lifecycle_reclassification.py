@@ -0,0 +1,132 @@
+"""Bulk rewrite of repair_cases.lifecycle after the status list changed.
+
+Usage:
+
+    from app.libs.lifecycle_reclassification import reclassify_if_outdated, reclassify_lifecycles
+
+    reclassify_if_outdated()             # At the start of a sync: only if the status list changed
+    changed = reclassify_lifecycles()    # Unconditionally, e.g. from scripts/reclassify_case_lifecycle.py
+
+Rows are read in caseId order in chunks and classified with the same
+classify_lifecycle() the sync uses, so a status is never classified
+differently by the reclassification than by the sync. Rows whose stored
+lifecycle differs are written back per chunk, one short transaction each,
+through a temporary table with a single joined UPDATE. A row whose status was
+changed by the sync in the meantime is left to the value the sync wrote. The
+fingerprint of the status list is stored in case_lifecycle_state afterwards,
+so an interrupted run is simply repeated by the next sync.
+"""
+
+from typing import Optional
+
+from app.libs.case_status import classify_lifecycle, lifecycle_fingerprint
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+from app.libs.repair_case_schema import LIFECYCLE_STATE_TABLE
+
+CHUNK_SIZE = 5000
+
+
+def outdated_lifecycles(rows) -> list:
+    """Returns (caseId, status, lifecycle) for the (caseId, status, stored lifecycle) rows that need a new value."""
+    outdated = []
+    for case_id, status, stored in rows:
+        lifecycle = classify_lifecycle(status)
+        if lifecycle != stored:
+            outdated.append((case_id, status, lifecycle))
+    return outdated
+
+
+def _stored_fingerprint(cnx) -> Optional[str]:
+    cursor = cnx.cursor()
+    cursor.execute(f"SELECT fingerprint FROM {LIFECYCLE_STATE_TABLE} WHERE id = 1")
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else None
+
+
+def _store_fingerprint(cnx, fingerprint: str):
+    cursor = cnx.cursor()
+    cursor.execute(
+        f"INSERT INTO {LIFECYCLE_STATE_TABLE} (id, fingerprint, reclassifiedAt) VALUES (1, %s, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint), reclassifiedAt = VALUES(reclassifiedAt)",
+        (fingerprint,),
+    )
+    cursor.close()
+    cnx.commit()
+
+
+def reclassify_lifecycles(chunk_size: int = CHUNK_SIZE) -> int:
+    """Rewrites the lifecycle of every row whose value is outdated. Returns the number of rows changed."""
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        raise RuntimeError("Failed to connect to database for lifecycle reclassification.")
+
+    fingerprint = lifecycle_fingerprint()
+    changed = 0
+    last_case_id = None
+    cursor = None
+    try:
+        cursor = cnx.cursor()
+        # The temporary table copies the column types of repair_cases
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS case_lifecycle_values")
+        cursor.execute("CREATE TEMPORARY TABLE case_lifecycle_values SELECT caseId, status, lifecycle FROM repair_cases LIMIT 0")
+        cursor.execute("ALTER TABLE case_lifecycle_values ADD PRIMARY KEY (caseId)")
+
+        while True:
+            if last_case_id is None:
+                cursor.execute("SELECT caseId, status, lifecycle FROM repair_cases ORDER BY caseId LIMIT %s", (chunk_size,))
+            else:
+                cursor.execute(
+                    "SELECT caseId, status, lifecycle FROM repair_cases WHERE caseId > %s ORDER BY caseId LIMIT %s",
+                    (last_case_id, chunk_size),
+                )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_case_id = rows[-1][0]
+
+            outdated = outdated_lifecycles(rows)
+            if outdated:
+                cursor.execute("TRUNCATE TABLE case_lifecycle_values")
+                cursor.executemany(
+                    "INSERT INTO case_lifecycle_values (caseId, status, lifecycle) VALUES (%s, %s, %s)", outdated,
+                )
+                # BINARY: a status the collation only considers equal may classify differently
+                cursor.execute(
+                    "UPDATE repair_cases r JOIN case_lifecycle_values t ON t.caseId = r.caseId "
+                    "SET r.lifecycle = t.lifecycle WHERE BINARY r.status <=> BINARY t.status"
+                )
+                changed += cursor.rowcount
+                cnx.commit()
+            print(f"Reclassified lifecycles up to caseId {last_case_id}, {changed} rows changed so far.")
+
+        _store_fingerprint(cnx, fingerprint)
+    finally:
+        if cursor is not None:
+            # The connection goes back to the pool, so the temporary table must not outlive the run
+            try:
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS case_lifecycle_values")
+                cursor.close()
+            except Exception as err:
+                print(f"Could not drop the lifecycle reclassification table: {err}")
+        if cnx.is_connected():
+            cnx.close()
+    return changed
+
+
+def reclassify_if_outdated() -> Optional[int]:
+    """Reclassifies all rows if they were classified with a different status list. Returns rows changed or None."""
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        raise RuntimeError("Failed to connect to database to check the lifecycle status list.")
+    try:
+        stored = _stored_fingerprint(cnx)
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+    if stored == lifecycle_fingerprint():
+        return None
+    print("Case status list changed since the last classification, reclassifying lifecycles...")
+    changed = reclassify_lifecycles()
+    print(f"Lifecycle reclassification finished, {changed} rows changed.")
+    return changed
@@ -0,0 +1,131 @@
+"""Persisted negative cache of case IDs that are not insurance cases.
+
+Usage:
+
+    cache = NonInsuranceCaseCache()
+    cache.load()
+    if cache.should_skip(case_id):
+        ...  # No detail fetch needed
+    cache.record_not_insurance(case_id)  # or record_insurance(case_id)
+    cache.flush()
+
+Entries are re-fetched once they are older than the TTL, and a small random
+sample of fresh entries is re-fetched on every sync, so a case that becomes
+insured is picked up again and removed from the cache.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import mysql.connector
+
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+
+# Configuration
+NEGATIVE_CACHE_TTL_DAYS = float(os.getenv("SYNC_NEGATIVE_CACHE_TTL_DAYS", "7"))
+NEGATIVE_CACHE_SAMPLE_RATE = float(os.getenv("SYNC_NEGATIVE_CACHE_SAMPLE_RATE", "0.02"))
+FLUSH_CHUNK_SIZE = 1000
+
+
+class NonInsuranceCaseCache:
+    """In-memory view of sync_non_insurance_cases for one sync run."""
+
+    def __init__(
+        self,
+        ttl_days: float = NEGATIVE_CACHE_TTL_DAYS,
+        sample_rate: float = NEGATIVE_CACHE_SAMPLE_RATE,
+    ):
+        self.ttl = timedelta(days=ttl_days)
+        self.sample_rate = sample_rate
+        self.enabled = False
+
+        self.lookups = 0
+        self.hits = 0
+        self.flipped_to_insurance = 0
+
+        self._verified_at = {}  # caseId -> lastVerifiedAt (naive UTC, as stored)
+        self._not_insurance = set()
+        self._insurance = set()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def load(self):
+        """Reads the cache table. The cache stays disabled if the table is unavailable."""
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print("Negative cache disabled: failed to get database connection.")
+            return
+        try:
+            cursor = cnx.cursor()
+            cursor.execute("SELECT caseId, lastVerifiedAt FROM sync_non_insurance_cases")
+            self._verified_at = {int(case_id): verified_at for case_id, verified_at in cursor.fetchall()}
+            cursor.close()
+            self.enabled = True
+            print(f"Loaded {len(self._verified_at)} known non-insurance cases into the negative cache.")
+        except mysql.connector.Error as err:
+            print(f"Negative cache disabled: could not read sync_non_insurance_cases: {err}")
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+
+    def should_skip(self, case_id: int) -> bool:
+        """True if the case is a fresh non-insurance entry that was not picked for re-verification."""
+        if not self.enabled:
+            return False
+        self.lookups += 1
+        verified_at = self._verified_at.get(int(case_id))
+        if verified_at is None:
+            return False
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if now - verified_at > self.ttl:
+            return False
+        if random.random() < self.sample_rate:
+            return False
+        self.hits += 1
+        return True
+
+    def record_not_insurance(self, case_id: int):
+        self._not_insurance.add(int(case_id))
+
+    def record_insurance(self, case_id: int):
+        if int(case_id) in self._verified_at:
+            self.flipped_to_insurance += 1
+            self._insurance.add(int(case_id))
+
+    def flush(self):
+        """Writes new and re-verified entries and removes cases that became insured."""
+        if not self.enabled or not (self._not_insurance or self._insurance):
+            return
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print("Failed to get database connection to persist the negative cache.")
+            return
+        try:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            cursor = cnx.cursor()
+            not_insurance = sorted(self._not_insurance)
+            for i in range(0, len(not_insurance), FLUSH_CHUNK_SIZE):
+                cursor.executemany(
+                    "INSERT INTO sync_non_insurance_cases (caseId, firstSeenAt, lastVerifiedAt) VALUES (%s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE lastVerifiedAt = VALUES(lastVerifiedAt)",
+                    [(case_id, now, now) for case_id in not_insurance[i:i + FLUSH_CHUNK_SIZE]],
+                )
+            insurance = sorted(self._insurance)
+            for i in range(0, len(insurance), FLUSH_CHUNK_SIZE):
+                cursor.executemany(
+                    "DELETE FROM sync_non_insurance_cases WHERE caseId = %s",
+                    [(case_id,) for case_id in insurance[i:i + FLUSH_CHUNK_SIZE]],
+                )
+            cursor.close()
+            cnx.commit()
+            print(f"Negative cache updated: {len(not_insurance)} entries verified, "
+                  f"{len(insurance)} cases removed because they are now insured.")
+        except mysql.connector.Error as err:
+            print(f"Failed to persist the negative cache: {err}")
+            cnx.rollback()
+        finally:
+            if cnx.is_connected():
+                cnx.close()
@@ -0,0 +1,91 @@
+"""Set-based update of repair_cases.isPresentInLastApiSync after a full sync.
+
+Usage:
+
+    from app.libs.presence_sweep import sweep_presence_flags
+
+    marked_present, marked_absent = sweep_presence_flags(run_id=checkpoint.run_id)
+    # or, without checkpoint tables:
+    marked_present, marked_absent = sweep_presence_flags(seen_case_ids=case_ids)
+
+The case IDs seen in the upstream list are loaded into a temporary table in
+bulk, and the flag of the whole table is then fixed with two joined UPDATE
+statements instead of one update per row. Only call this after the complete
+case list was received, otherwise cases would wrongly be marked absent.
+
+Only rows with sourceType 'api' are ever marked absent, so cases that were
+entered or imported by other means keep their flag. Every case seen in the
+list is tagged as 'api' by the first statement.
+"""
+
+from typing import Iterable, Optional
+
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+
+LOAD_CHUNK_SIZE = 5000
+API_SOURCE_TYPE = "api"  # sourceType of rows that come from the Repairline API
+
+
+def sweep_presence_flags(
+    seen_case_ids: Optional[Iterable[int]] = None,
+    run_id: Optional[int] = None,
+) -> tuple:
+    """
+    Sets isPresentInLastApiSync to 1 for seen cases and 0 for all other API cases.
+    The seen IDs come from the sync_run_cases list of run_id if given.
+    Returns (rows marked present, rows marked absent).
+    """
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        raise RuntimeError("Failed to get database connection for the presence sweep.")
+    cursor = None
+    try:
+        cursor = cnx.cursor()
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS sync_seen_cases")
+        cursor.execute("CREATE TEMPORARY TABLE sync_seen_cases (caseId BIGINT NOT NULL PRIMARY KEY) ENGINE=MEMORY")
+
+        if run_id is not None:
+            cursor.execute(
+                "INSERT IGNORE INTO sync_seen_cases (caseId) SELECT caseId FROM sync_run_cases WHERE runId = %s",
+                (run_id,),
+            )
+        else:
+            chunk = []
+            for case_id in seen_case_ids or []:
+                chunk.append((case_id,))
+                if len(chunk) >= LOAD_CHUNK_SIZE:
+                    cursor.executemany("INSERT IGNORE INTO sync_seen_cases (caseId) VALUES (%s)", chunk)
+                    chunk = []
+            if chunk:
+                cursor.executemany("INSERT IGNORE INTO sync_seen_cases (caseId) VALUES (%s)", chunk)
+
+        cursor.execute(
+            "UPDATE repair_cases r JOIN sync_seen_cases s ON s.caseId = r.caseId "
+            "SET r.isPresentInLastApiSync = 1, r.sourceType = %s "
+            "WHERE r.isPresentInLastApiSync IS NULL OR r.isPresentInLastApiSync <> 1 OR NOT (r.sourceType <=> %s)",
+            (API_SOURCE_TYPE, API_SOURCE_TYPE),
+        )
+        marked_present = cursor.rowcount
+        cursor.execute(
+            "UPDATE repair_cases r LEFT JOIN sync_seen_cases s ON s.caseId = r.caseId "
+            "SET r.isPresentInLastApiSync = 0 "
+            "WHERE s.caseId IS NULL AND r.sourceType = %s "
+            "AND (r.isPresentInLastApiSync IS NULL OR r.isPresentInLastApiSync <> 0)",
+            (API_SOURCE_TYPE,),
+        )
+        marked_absent = cursor.rowcount
+        cnx.commit()
+        return marked_present, marked_absent
+    except Exception:
+        cnx.rollback()
+        raise
+    finally:
+        if cursor is not None:
+            # The connection goes back to the pool, so the temporary table must not outlive the sweep
+            try:
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS sync_seen_cases")
+                cursor.close()
+            except Exception as err:
+                print(f"Could not drop the presence sweep table: {err}")
+        if cnx.is_connected():
+            cnx.close()
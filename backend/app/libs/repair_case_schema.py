@@ -0,0 +1,172 @@
+"""Cached column set of the repair_cases table.
+
+Usage:
+
+    from app.libs.repair_case_schema import get_repair_case_schema, invalidate_repair_case_schema
+
+    invalidate_repair_case_schema()  # e.g. once at the start of a sync
+    schema = get_repair_case_schema()
+    row = schema.filter_row(db_data)
+    sql = schema.upsert_sql(tuple(row.keys()))
+
+    # rawApiDetail lives in repair_case_payloads once that table exists
+    raw_detail_expr, payload_join = schema.raw_detail_source()
+    sql = f"SELECT {raw_detail_expr} AS rawApiDetail FROM repair_cases r {payload_join} WHERE r.caseId = %s"
+
+The sync writes every column it knows about, and filtering against the
+introspected column set lets it keep working while a migration that adds
+new columns has not been run yet. The cached schema is introspected again
+once it is older than REPAIR_CASE_SCHEMA_TTL, so every uvicorn worker picks
+up a migration, or a finished lifecycle reclassification, without a restart.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from app.libs.case_status import lifecycle_fingerprint
+from app.libs.database_management import get_mysql_connection
+
+PAYLOAD_TABLE = "repair_case_payloads"
+GENERATION_TABLE = "repair_cases_generation"
+LIFECYCLE_STATE_TABLE = "case_lifecycle_state"
+SCHEMA_TTL = float(os.getenv("REPAIR_CASE_SCHEMA_TTL", "60"))  # Seconds
+
+
+def _is_binary_type(column_type) -> bool:
+    if isinstance(column_type, (bytes, bytearray)):
+        column_type = column_type.decode('utf-8')
+    column_type = str(column_type).lower()
+    return "blob" in column_type or "binary" in column_type
+
+
+class RepairCaseSchema:
+    """Snapshot of the repair_cases columns plus the statements built for them."""
+
+    def __init__(self, columns, binary_columns=(), tables=(), indexes=(), stored_lifecycle_fingerprint=None):
+        self.columns = frozenset(columns)
+        # Index names of repair_cases, for features that depend on a migrated index
+        self.indexes = frozenset(indexes)
+        # Columns of a BLOB/BINARY type, which can hold compressed bytes
+        self.binary_columns = frozenset(binary_columns)
+        # Whether migrations/006_repair_case_payloads.sql has been applied
+        self.has_payload_table = PAYLOAD_TABLE in tables
+        # Whether migrations/007_repair_cases_generation.sql has been applied
+        self.has_generation_table = GENERATION_TABLE in tables
+        # Whether migrations/010_case_lifecycle.sql has been applied
+        self.has_lifecycle_column = 'lifecycle' in self.columns and LIFECYCLE_STATE_TABLE in tables
+        # Whether every stored lifecycle was classified with the current status list,
+        # so filters can use the column. Until then they keep using the status list.
+        self.has_lifecycle = (
+            self.has_lifecycle_column and stored_lifecycle_fingerprint == lifecycle_fingerprint()
+        )
+        self._upsert_sql = {}
+        self._reported_missing = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> "RepairCaseSchema":
+        cnx = get_mysql_connection()
+        if not cnx:
+            raise RuntimeError("Failed to get database connection for schema introspection.")
+        try:
+            cursor = cnx.cursor()
+            cursor.execute("SHOW COLUMNS FROM repair_cases")
+            rows = cursor.fetchall()
+            cursor.close()
+            columns = {row[0] for row in rows}
+            binary_columns = {row[0] for row in rows if _is_binary_type(row[1])}
+            cursor = cnx.cursor()
+            cursor.execute("SHOW TABLES")
+            tables = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+            cursor = cnx.cursor()
+            cursor.execute("SHOW INDEX FROM repair_cases")
+            indexes = {row[2] for row in cursor.fetchall()}  # Key_name
+            cursor.close()
+            stored_lifecycle_fingerprint = None
+            if LIFECYCLE_STATE_TABLE in tables:
+                cursor = cnx.cursor()
+                cursor.execute(f"SELECT fingerprint FROM {LIFECYCLE_STATE_TABLE} WHERE id = 1")
+                row = cursor.fetchone()
+                stored_lifecycle_fingerprint = row[0] if row else None
+                cursor.close()
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+        return cls(columns, binary_columns, tables, indexes, stored_lifecycle_fingerprint)
+
+    def filter_row(self, row: dict) -> dict:
+        """Drops keys that are not columns of repair_cases, reporting each missing column once."""
+        missing_columns = row.keys() - self.columns
+        if missing_columns:
+            with self._lock:
+                new_missing = missing_columns - self._reported_missing
+                self._reported_missing |= new_missing
+            if new_missing:
+                print(f"Note: {len(new_missing)} fields not in database schema (will be skipped): {', '.join(sorted(new_missing))}")
+            return {k: v for k, v in row.items() if k in self.columns}
+        return row
+
+    def raw_detail_source(self) -> tuple:
+        """
+        Returns the select expression and join clause that read rawApiDetail for repair_cases aliased as r.
+        Rows not moved to the payload table yet still have their payload in repair_cases.
+        """
+        if not self.has_payload_table:
+            return "r.rawApiDetail", ""
+        join = f"LEFT JOIN {PAYLOAD_TABLE} p ON p.caseId = r.caseId"
+        if 'rawApiDetail' in self.columns:
+            return "COALESCE(p.rawApiDetail, r.rawApiDetail)", join
+        return "p.rawApiDetail", join
+
+    def payload_upsert_sql(self) -> str:
+        """Returns the upsert statement for (caseId, rawApiDetail) rows of the payload table."""
+        return (
+            f"INSERT INTO {PAYLOAD_TABLE} (caseId, rawApiDetail) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE rawApiDetail = VALUES(rawApiDetail)"
+        )
+
+    def upsert_sql(self, columns: tuple) -> str:
+        """Returns the INSERT ... ON DUPLICATE KEY UPDATE statement for a column tuple, built once."""
+        sql = self._upsert_sql.get(columns)
+        if sql is None:
+            # Update ALL fields, including NULL values, so previously NULL columns get filled
+            column_list = ", ".join(f"`{k}`" for k in columns)
+            placeholders = ", ".join(["%s"] * len(columns))
+            update_clause = ", ".join([f"`{key}` = VALUES(`{key}`)" for key in columns])
+            sql = f"INSERT INTO repair_cases ({column_list}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {update_clause}"
+            with self._lock:
+                self._upsert_sql[columns] = sql
+        return sql
+
+
+_schema: Optional[RepairCaseSchema] = None
+_schema_loaded_at = 0.0
+_schema_lock = threading.Lock()
+
+
+def get_repair_case_schema() -> RepairCaseSchema:
+    """Returns the cached schema, introspecting the table on first use and once it is older than SCHEMA_TTL."""
+    global _schema, _schema_loaded_at
+    with _schema_lock:
+        if _schema is not None and time.monotonic() - _schema_loaded_at < SCHEMA_TTL:
+            return _schema
+        try:
+            _schema = RepairCaseSchema.load()
+        except Exception as e:
+            if _schema is None:
+                raise
+            # Keep serving the previous schema, the next access tries again
+            print(f"Could not refresh the repair_cases schema, using the cached one: {e}")
+            return _schema
+        _schema_loaded_at = time.monotonic()
+        return _schema
+
+
+def invalidate_repair_case_schema():
+    """Forgets the cached schema so the next access introspects the table again."""
+    global _schema
+    with _schema_lock:
+        _schema = None
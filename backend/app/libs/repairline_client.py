@@ -0,0 +1,199 @@
+"""Async client for the Repairline API.
+
+Usage:
+
+    async with RepairlineClient(max_connections=200) as client:
+        async for case in client.iter_case_list():
+            case_data = await client.fetch_case(case['CaseId'])
+        print(client.limiter.stats())
+
+All requests made through one client share a single keep-alive connection
+pool, so a sync does not pay a TCP handshake for every case it fetches. The
+case list is parsed while it downloads, so memory use does not grow with
+the number of cases upstream returns.
+
+Detail requests go through an AdaptiveConcurrencyLimiter: max_connections is
+only the ceiling, the number of requests actually in flight follows what
+upstream sustains. 429, 5xx and timeouts shrink it, retries back off
+exponentially with jitter, and a Retry-After header holds back all requests.
+"""
+
+import asyncio
+import codecs
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from app.libs import sync_metrics
+from app.libs.adaptive_limiter import AdaptiveConcurrencyLimiter
+
+# Get credentials from environment variables
+REPAIRLINE_API_USERNAME = os.getenv("REPAIRLINE_API_USERNAME")
+REPAIRLINE_API_PASSWORD = os.getenv("REPAIRLINE_API_PASSWORD")
+REPAIRLINE_API_BASE_URL = os.getenv("REPAIRLINE_API_BASE_URL", "http://api.system.repairline.de/v2/")  # Override e.g. for scripts/fake_repairline.py
+
+# Configuration
+REQUEST_TIMEOUT = float(os.getenv("SYNC_REQUEST_TIMEOUT", "30"))  # Seconds per case detail request
+LIST_REQUEST_TIMEOUT = 300  # Generous timeout for the potentially large case list
+MAX_RETRIES = int(os.getenv("SYNC_MAX_RETRIES", "4"))  # Attempts per case detail request
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled with every attempt
+RETRY_MAX_DELAY = 30  # Upper bound for one backoff, also caps Retry-After
+DEFAULT_MAX_CONNECTIONS = 200
+
+
+class RepairlineClient:
+    """Holds one pooled httpx.AsyncClient for the lifetime of a sync."""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self.limiter = AdaptiveConcurrencyLimiter(max_limit=max_connections)
+        self.retries = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "RepairlineClient":
+        self._client = httpx.AsyncClient(
+            base_url=REPAIRLINE_API_BASE_URL,
+            auth=(REPAIRLINE_API_USERNAME, REPAIRLINE_API_PASSWORD),
+            headers={'User-Agent': 'Mozilla/5.0'},
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def iter_case_list(self):
+        """
+        Streams the full case list, yielding each case summary as soon as it has
+        been received. Raises httpx.HTTPError on failure.
+        """
+        async with self._client.stream("GET", "cases", timeout=LIST_REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            async for case in _iter_json_array(response.aiter_bytes()):
+                yield case
+
+    async def fetch_case(self, case_id: int, max_retries: int = MAX_RETRIES) -> Optional[dict]:
+        """
+        Fetches case data from API with retry logic.
+        Returns the case data dict or None if all retries failed.
+        """
+        for attempt in range(max_retries):
+            retry_after = None
+            await self.limiter.acquire()
+            started = time.monotonic()
+            outcome = "ok"
+            try:
+                detail_response = await self._client.get(f"cases/{case_id}")
+            except httpx.TimeoutException:
+                self.limiter.on_overload()
+                outcome, error = "timeout", "Request timeout"
+            except httpx.HTTPError as e:
+                outcome, error = "transport_error", f"Request error: {e}"
+            else:
+                status = detail_response.status_code
+                if status == 429 or status >= 500:
+                    self.limiter.on_overload()
+                    retry_after = _retry_after_seconds(detail_response)
+                    if retry_after is not None:
+                        self.limiter.pause(retry_after)
+                    outcome = "throttled" if status == 429 else "server_error"
+                    error = f"Upstream returned {status}"
+                elif status >= 400:
+                    # Other client errors will not go away by retrying
+                    print(f"[{case_id}] Request failed with status {status}, not retrying.")
+                    outcome = "client_error"
+                    return None
+                else:
+                    self.limiter.on_success(time.monotonic() - started)
+                    try:
+                        return detail_response.json()
+                    except ValueError as e:
+                        outcome, error = "invalid_json", f"Invalid JSON: {e}"
+            finally:
+                self.limiter.release()
+                sync_metrics.UPSTREAM_FETCH_SECONDS.observe(time.monotonic() - started)
+                sync_metrics.UPSTREAM_REQUESTS.labels(outcome=outcome).inc()
+
+            if attempt >= max_retries - 1:
+                print(f"[{case_id}] {error}, giving up after {max_retries} attempts.")
+                return None
+            # Full jitter keeps retries of many cases from hitting upstream in lockstep
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self.retries += 1
+            sync_metrics.UPSTREAM_RETRIES.inc()
+            print(f"[{case_id}] {error} (attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+        return None
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parses a Retry-After header given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_MAX_DELAY)
+
+
+_json_decoder = json.JSONDecoder()
+
+
+async def _iter_json_array(byte_chunks):
+    """Incrementally parses a top-level JSON array, yielding each element once it is complete."""
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    started = False
+    finished = False
+
+    async for chunk in byte_chunks:
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\n\r,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected the case list to be a JSON array.")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                finished = True
+                break
+            try:
+                item, end = _json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Element is not complete yet, wait for more data
+            if end >= len(buffer):
+                break  # A trailing value could still continue in the next chunk
+            yield item
+            pos = end
+        # Only the unparsed tail is kept, so memory is bounded by the largest element
+        buffer = buffer[pos:]
+        if finished:
+            return
+
+    raise ValueError("Case list ended before the closing bracket of the JSON array.")
@@ -0,0 +1,340 @@
+"""Durable checkpoints for the case sync, stored in sync_runs and sync_run_cases.
+
+Usage:
+
+    checkpoint = SyncRunCheckpoint.start_or_resume(start_time_utc)
+    if checkpoint is None:
+        ...  # Checkpoint tables are missing, the sync runs without them
+    checkpoint.record_listed(case_id)
+    checkpoint.record_result(case_id, "skipped_no_change")
+    checkpoint.mark_list_complete(total_cases)
+    checkpoint.complete()
+
+Recorded entries are buffered in memory and written, together with the run
+heartbeat, by a flusher thread of the checkpoint, so recording never blocks
+the event loop of the sync. A run whose process died keeps status 'running'
+and stops refreshing its heartbeat. Once the heartbeat is older than
+SYNC_RUN_STALE_SECONDS the next sync claims that run and only processes the
+case IDs not marked done yet.
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import mysql.connector
+
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+
+# Configuration
+RUN_STALE_SECONDS = int(os.getenv("SYNC_RUN_STALE_SECONDS", "120"))  # Heartbeat age after which a run counts as interrupted
+CHECKPOINT_BATCH_SIZE = 500  # Pending case updates that trigger a flush
+CHECKPOINT_INTERVAL = 5.0  # Seconds between flushes (and heartbeats) at the latest
+REMAINING_CHUNK_SIZE = 1000
+
+
+def _utcnow() -> datetime:
+    # DATETIME columns are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def find_interrupted_run() -> Optional[dict]:
+    """Returns the most recent run still marked 'running', or None."""
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        return None
+    try:
+        cursor = cnx.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT runId, heartbeatAt FROM sync_runs WHERE status = 'running' ORDER BY runId DESC LIMIT 1"
+        )
+        run = cursor.fetchone()
+        cursor.close()
+        return run
+    except mysql.connector.Error as err:
+        print(f"Could not look up interrupted sync runs: {err}")
+        return None
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+
+class SyncRunCheckpoint:
+    """Records the case list and per-case completion of one sync run."""
+
+    def __init__(self, run_id: int, started_at: datetime, resumed: bool, list_complete: bool, total_cases: int):
+        self.run_id = run_id
+        self.started_at = started_at
+        self.resumed = resumed
+        self.list_complete = list_complete
+        self.total_cases = total_cases
+        # Filled when resuming: results recorded before the interruption, and the
+        # finished case IDs if the case list has to be streamed again
+        self.prior_result_counts = {}
+        self.done_case_ids = set()
+
+        self._listed = []
+        self._results = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+
+    @classmethod
+    def resume_interrupted(cls) -> Optional["SyncRunCheckpoint"]:
+        """Claims an interrupted run. Returns None if there is none to claim."""
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print("Failed to get database connection to look for interrupted sync runs.")
+            return None
+        try:
+            checkpoint = cls._claim_interrupted_run(cnx)
+            if checkpoint is not None:
+                checkpoint._start_flusher()
+            return checkpoint
+        except mysql.connector.Error as err:
+            print(f"Could not claim an interrupted sync run: {err}")
+            cnx.rollback()
+            return None
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+
+    @classmethod
+    def start_or_resume(cls, start_time_utc: datetime) -> Optional["SyncRunCheckpoint"]:
+        """Claims an interrupted run if there is one, otherwise starts a new run."""
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print("Sync checkpoints disabled: failed to get database connection.")
+            return None
+        try:
+            checkpoint = cls._claim_interrupted_run(cnx)
+            if checkpoint is None:
+                now = _utcnow()
+                cursor = cnx.cursor()
+                cursor.execute(
+                    "INSERT INTO sync_runs (status, startedAt, heartbeatAt) VALUES ('running', %s, %s)",
+                    (start_time_utc.replace(tzinfo=None), now),
+                )
+                run_id = cursor.lastrowid
+                cursor.close()
+                cnx.commit()
+                checkpoint = cls(run_id, start_time_utc, False, False, 0)
+                print(f"Started sync run {run_id}.")
+            checkpoint._start_flusher()
+            return checkpoint
+        except mysql.connector.Error as err:
+            print(f"Sync checkpoints disabled: {err}")
+            cnx.rollback()
+            return None
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+
+    @classmethod
+    def _claim_interrupted_run(cls, cnx) -> Optional["SyncRunCheckpoint"]:
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=RUN_STALE_SECONDS)
+        cursor = cnx.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT runId, startedAt, listComplete, totalCases FROM sync_runs "
+            "WHERE status = 'running' AND heartbeatAt < %s ORDER BY runId DESC LIMIT 1",
+            (stale_before,),
+        )
+        run = cursor.fetchone()
+        if run is None:
+            cursor.close()
+            return None
+
+        # The conditional update makes the claim atomic if two processes try at once
+        cursor.execute(
+            "UPDATE sync_runs SET heartbeatAt = %s WHERE runId = %s AND status = 'running' AND heartbeatAt < %s",
+            (now, run["runId"], stale_before),
+        )
+        claimed = cursor.rowcount == 1
+        if claimed:
+            # Older orphaned runs are not worth resuming once a newer one exists
+            cursor.execute(
+                "UPDATE sync_runs SET status = 'failed', finishedAt = %s "
+                "WHERE status = 'running' AND heartbeatAt < %s AND runId < %s",
+                (now, stale_before, run["runId"]),
+            )
+        cnx.commit()
+        if not claimed:
+            cursor.close()
+            return None
+
+        checkpoint = cls(
+            run["runId"],
+            run["startedAt"].replace(tzinfo=timezone.utc),
+            True,
+            bool(run["listComplete"]),
+            run["totalCases"],
+        )
+        cursor.execute(
+            "SELECT result, COUNT(*) AS n FROM sync_run_cases WHERE runId = %s AND done = 1 GROUP BY result",
+            (checkpoint.run_id,),
+        )
+        checkpoint.prior_result_counts = {row["result"]: row["n"] for row in cursor.fetchall()}
+        if not checkpoint.list_complete:
+            cursor.execute("SELECT caseId FROM sync_run_cases WHERE runId = %s AND done = 1", (checkpoint.run_id,))
+            checkpoint.done_case_ids = {row["caseId"] for row in cursor.fetchall()}
+        cursor.close()
+        print(f"Resuming interrupted sync run {checkpoint.run_id} "
+              f"({sum(checkpoint.prior_result_counts.values())} cases already done).")
+        return checkpoint
+
+    async def iter_remaining_case_ids(self):
+        """Yields the case IDs of this run that are not done yet, read from the database in chunks."""
+        last_case_id = 0
+        while True:
+            chunk = await asyncio.to_thread(self._fetch_remaining_chunk, last_case_id)
+            if not chunk:
+                return
+            for case_id in chunk:
+                yield case_id
+            last_case_id = chunk[-1]
+
+    def _fetch_remaining_chunk(self, after_case_id: int) -> list:
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            raise RuntimeError("Failed to get database connection to read remaining sync cases.")
+        try:
+            cursor = cnx.cursor()
+            cursor.execute(
+                "SELECT caseId FROM sync_run_cases WHERE runId = %s AND done = 0 AND caseId > %s "
+                "ORDER BY caseId LIMIT %s",
+                (self.run_id, after_case_id, REMAINING_CHUNK_SIZE),
+            )
+            chunk = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            return chunk
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+
+    def _start_flusher(self):
+        self._thread = threading.Thread(target=self._run, name=f"sync-checkpoint-{self.run_id}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closing:
+            self._wake.wait(CHECKPOINT_INTERVAL)
+            self._wake.clear()
+            if not self._closing:
+                self.flush()
+
+    def _stop_flusher(self):
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def record_listed(self, case_id: int):
+        """Buffers a listed case ID. Only touches memory, so it is safe to call from the event loop."""
+        with self._lock:
+            self._listed.append(case_id)
+            pending = len(self._listed) + len(self._results)
+        if pending >= CHECKPOINT_BATCH_SIZE:
+            self._wake.set()
+
+    def record_result(self, case_id: int, result: str):
+        """Buffers the result of a case. Only touches memory, so it is safe to call from the event loop."""
+        with self._lock:
+            self._results.append((case_id, result))
+            pending = len(self._listed) + len(self._results)
+        if pending >= CHECKPOINT_BATCH_SIZE:
+            self._wake.set()
+
+    def mark_list_complete(self, total_cases: int):
+        """Writes the whole case list, which the presence sweep reads. Blocks, run it in a worker thread from async code."""
+        self.list_complete = True
+        self.total_cases = total_cases
+        self.flush()
+
+    def flush(self):
+        """Writes pending list entries and results, and refreshes the run heartbeat."""
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            listed, self._listed = self._listed, []
+            results, self._results = self._results, []
+
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print("Failed to get database connection to write sync checkpoint.")
+            self._requeue(listed, results)
+            return
+        try:
+            cursor = cnx.cursor()
+            if listed:
+                cursor.executemany(
+                    "INSERT IGNORE INTO sync_run_cases (runId, caseId) VALUES (%s, %s)",
+                    [(self.run_id, case_id) for case_id in listed],
+                )
+            if results:
+                cursor.executemany(
+                    "INSERT INTO sync_run_cases (runId, caseId, done, result) VALUES (%s, %s, 1, %s) "
+                    "ON DUPLICATE KEY UPDATE done = 1, result = VALUES(result)",
+                    [(self.run_id, case_id, result) for case_id, result in results],
+                )
+            cursor.execute(
+                "UPDATE sync_runs SET heartbeatAt = %s, listComplete = %s, totalCases = %s WHERE runId = %s",
+                (_utcnow(), int(self.list_complete), self.total_cases, self.run_id),
+            )
+            cursor.close()
+            cnx.commit()
+        except mysql.connector.Error as err:
+            print(f"Failed to write sync checkpoint for run {self.run_id}: {err}")
+            cnx.rollback()
+            self._requeue(listed, results)
+        finally:
+            if cnx.is_connected():
+                cnx.close()
+
+    def _requeue(self, listed: list, results: list):
+        with self._lock:
+            self._listed[:0] = listed
+            self._results[:0] = results
+
+    def complete(self):
+        self._finish("completed")
+
+    def fail(self):
+        self._finish("failed")
+
+    def _finish(self, status: str):
+        """Stops the flusher thread and writes the final state. Blocks, run it in a worker thread from async code."""
+        self._stop_flusher()
+        self.flush()
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            print(f"Failed to get database connection to mark sync run {self.run_id} as {status}.")
+            return
+        try:
+            cursor = cnx.cursor()
+            # Case lists are only needed while a run can still be resumed
+            cursor.execute(
+                "DELETE c FROM sync_run_cases c JOIN sync_runs r ON r.runId = c.runId "
+                "WHERE r.status <> 'running' AND c.runId <> %s",
+                (self.run_id,),
+            )
+            cursor.execute(
+                "UPDATE sync_runs SET status = %s, finishedAt = %s WHERE runId = %s",
+                (status, _utcnow(), self.run_id),
+            )
+            cursor.close()
+            cnx.commit()
+            print(f"Sync run {self.run_id} marked as {status}.")
+        except mysql.connector.Error as err:
+            print(f"Failed to mark sync run {self.run_id} as {status}: {err}")
+            cnx.rollback()
+        finally:
+            if cnx.is_connected():
+                cnx.close()
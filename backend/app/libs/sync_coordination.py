@@ -0,0 +1,154 @@
+"""Cross-worker sync leadership and shared progress.
+
+Usage:
+
+    coordinator = SyncCoordinator()
+    if coordinator.try_acquire():  # Raises SyncCoordinationError if the database is unreachable
+        try:
+            coordinator.publish_status(True, started_at, stats)
+            ...
+        finally:
+            coordinator.publish_status(False, started_at, stats, force=True)
+            coordinator.release()
+
+    status = read_shared_sync_status()
+
+Leadership is a MySQL named lock (GET_LOCK) held on one connection for the
+whole run, so only one uvicorn worker or node syncs at a time, and the lock
+is freed by the server if that process dies. Progress goes to the single
+row of sync_status, so every worker answers /sync-status the same way.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import mysql.connector
+
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+
+SYNC_LOCK_NAME = "versicherung_x_case_sync"
+STATUS_PUBLISH_INTERVAL = 1.0  # Seconds between non-forced status writes
+
+
+class SyncCoordinationError(Exception):
+    """Raised when the sync lock cannot be checked because the database is unavailable."""
+
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SyncCoordinator:
+    """Holds the database sync lock and publishes progress for one run."""
+
+    def __init__(self):
+        self.owner_id = _owner_id()
+        self._cnx = None
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+
+    def try_acquire(self) -> bool:
+        """Takes the sync lock without waiting. Returns False if another process holds it."""
+        cnx = get_mysql_connection(SYNC_POOL)
+        if not cnx:
+            raise SyncCoordinationError("Failed to get database connection for the sync lock.")
+        try:
+            cursor = cnx.cursor()
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (SYNC_LOCK_NAME,))
+            (acquired,) = cursor.fetchone()
+            cursor.close()
+        except mysql.connector.Error as err:
+            cnx.close()
+            raise SyncCoordinationError(f"Could not take the sync lock: {err}")
+
+        if acquired != 1:
+            cnx.close()
+            return False
+        # The lock belongs to this session, so the connection is kept until release()
+        self._cnx = cnx
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._cnx is None:
+                return
+            try:
+                cursor = self._cnx.cursor()
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (SYNC_LOCK_NAME,))
+                cursor.fetchone()
+                cursor.close()
+            except mysql.connector.Error as err:
+                print(f"Failed to release the sync lock: {err}")
+            finally:
+                if self._cnx.is_connected():
+                    self._cnx.close()
+                self._cnx = None
+
+    def publish_status(self, is_running: bool, started_at: Optional[datetime], stats: dict, force: bool = False):
+        """Writes the shared status row, at most once per STATUS_PUBLISH_INTERVAL unless forced."""
+        with self._lock:
+            if self._cnx is None:
+                return
+            now = time.monotonic()
+            if not force and now - self._last_publish < STATUS_PUBLISH_INTERVAL:
+                return
+            self._last_publish = now
+            try:
+                cursor = self._cnx.cursor()
+                cursor.execute(
+                    "INSERT INTO sync_status (id, isRunning, ownerId, startedAt, updatedAt, statsJson) "
+                    "VALUES (1, %s, %s, %s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE isRunning = VALUES(isRunning), ownerId = VALUES(ownerId), "
+                    "startedAt = VALUES(startedAt), updatedAt = VALUES(updatedAt), statsJson = VALUES(statsJson)",
+                    (
+                        int(is_running),
+                        self.owner_id,
+                        started_at.astimezone(timezone.utc).replace(tzinfo=None) if started_at else None,
+                        datetime.now(timezone.utc).replace(tzinfo=None),
+                        json.dumps(stats),
+                    ),
+                )
+                cursor.close()
+                self._cnx.commit()
+            except mysql.connector.Error as err:
+                print(f"Failed to publish sync status: {err}")
+                self._cnx.rollback()
+
+
+def read_shared_sync_status() -> Optional[dict]:
+    """
+    Returns the shared sync status, or None if it cannot be read.
+    A run is only reported as running while its owner still holds the sync lock.
+    """
+    cnx = get_mysql_connection()
+    if not cnx:
+        return None
+    try:
+        cursor = cnx.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT isRunning, ownerId, startedAt, statsJson, IS_USED_LOCK(%s) AS lockHolder "
+            "FROM sync_status WHERE id = 1",
+            (SYNC_LOCK_NAME,),
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    except mysql.connector.Error as err:
+        print(f"Could not read shared sync status: {err}")
+        return None
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+    if row is None:
+        return None
+    return {
+        "is_running": bool(row["isRunning"]) and row["lockHolder"] is not None,
+        "owner": row["ownerId"],
+        "start_time": row["startedAt"].replace(tzinfo=timezone.utc) if row["startedAt"] else None,
+        "stats": json.loads(row["statsJson"]) if row["statsJson"] else {},
+    }
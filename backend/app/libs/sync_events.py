@@ -0,0 +1,96 @@
+"""Fan-out of sync status snapshots to server-sent event streams.
+
+Usage:
+
+    broadcaster = SyncEventBroadcaster(get_snapshot, interval=1.0)
+
+    async def stream():
+        async for event in broadcaster.subscribe():
+            yield event  # Already formatted as "event: ...\\ndata: ...\\n\\n"
+
+One producer task per process takes a snapshot every interval while at least
+one viewer is subscribed, and every subscriber receives the same snapshot.
+The number of status lookups therefore does not grow with the number of
+open dashboards. Subscribers only keep the latest snapshot, so a slow client
+skips intermediate updates instead of buffering them.
+
+Events:
+    status   - a snapshot, sent on every interval while a sync runs and on change otherwise
+    summary  - the final snapshot, sent once when a running sync has ended
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+
+KEEPALIVE_SECONDS = 15  # Comment lines keep idle connections open through proxies
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class SyncEventBroadcaster:
+    """Shares one snapshot producer between all subscribed event streams."""
+
+    def __init__(self, snapshot: Callable[[], Awaitable[dict]], interval: float = 1.0):
+        self.snapshot = snapshot
+        self.interval = interval
+        self._subscribers = set()
+        self._producer: Optional[asyncio.Task] = None
+        self._last: Optional[dict] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self):
+        """Yields formatted events until the consumer stops iterating."""
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.create_task(self._produce())
+        try:
+            # New viewers get the current state right away instead of waiting for a change
+            initial = self._last or await self.snapshot()
+            yield format_event("status", initial)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event
+        finally:
+            self._subscribers.discard(queue)
+
+    def _publish(self, event: str):
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()  # Drop the stale snapshot, the newer one supersedes it
+            queue.put_nowait(event)
+
+    async def _produce(self):
+        while self._subscribers:
+            try:
+                current = await self.snapshot()
+            except Exception as e:
+                print(f"Could not take sync status snapshot: {e}")
+                await asyncio.sleep(self.interval)
+                continue
+
+            previous = self._last
+            self._last = current
+            was_running = bool(previous and previous.get("is_running"))
+            if was_running and not current.get("is_running"):
+                self._publish(format_event("summary", current))
+            elif current.get("is_running") or _changed(previous, current):
+                self._publish(format_event("status", current))
+            await asyncio.sleep(self.interval)
+        self._last = None
+
+
+def _changed(previous: Optional[dict], current: dict) -> bool:
+    if previous is None:
+        return True
+    return (previous.get("is_running"), previous.get("stats")) != (current.get("is_running"), current.get("stats"))
@@ -0,0 +1,84 @@
+"""Prometheus metrics of the case sync.
+
+Usage:
+
+    from app.libs import sync_metrics
+
+    with sync_metrics.DB_READ_SECONDS.time():
+        cursor.execute(...)
+    sync_metrics.CASE_RESULTS.labels(result="upserted").inc()
+
+    body, content_type = sync_metrics.render_metrics()
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before the app starts. Every worker then writes its
+samples there and /metrics aggregates all of them, whichever worker answers.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# Upstream requests take from a few milliseconds up to REQUEST_TIMEOUT
+_REQUEST_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Local work (hashing, mapping, single-row queries) is much faster
+_LOCAL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+_RUN_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+UPSTREAM_FETCH_SECONDS = Histogram(
+    "sync_upstream_fetch_seconds", "Duration of one Repairline case detail request", buckets=_REQUEST_BUCKETS,
+)
+UPSTREAM_REQUESTS = Counter(
+    "sync_upstream_requests_total", "Repairline case detail requests by outcome", ["outcome"],
+)
+UPSTREAM_RETRIES = Counter(
+    "sync_upstream_retries_total", "Retried Repairline case detail requests",
+)
+NORMALIZE_SECONDS = Histogram(
+    "sync_normalize_seconds", "Time spent normalizing a payload, by step", ["step"], buckets=_LOCAL_BUCKETS,
+)
+DB_READ_SECONDS = Histogram(
+    "sync_db_read_seconds", "Duration of the per-case change detection query", buckets=_LOCAL_BUCKETS,
+)
+DB_WRITE_SECONDS = Histogram(
+    "sync_db_write_seconds", "Duration of one batched upsert including commit", buckets=_REQUEST_BUCKETS,
+)
+DB_WRITE_ROWS = Counter(
+    "sync_db_write_rows_total", "Rows upserted by the write buffer, by outcome", ["outcome"],
+)
+CASE_SECONDS = Histogram(
+    "sync_case_seconds", "Time from the start of a case's fetch until its result", buckets=_REQUEST_BUCKETS,
+)
+CASE_RESULTS = Counter(
+    "sync_case_results_total", "Processed cases by result", ["result"],
+)
+RUN_DURATION_SECONDS = Histogram(
+    "sync_run_duration_seconds", "Duration of sync runs, by tier", ["tier"], buckets=_RUN_BUCKETS,
+)
+RUNS = Counter(
+    "sync_runs_total", "Finished sync runs, by tier and outcome", ["tier", "outcome"],
+)
+LAST_SUCCESS_TIMESTAMP = Gauge(
+    "sync_last_success_timestamp_seconds", "Unix time of the last successful sync run, by tier", ["tier"],
+    multiprocess_mode="max",
+)
+
+
+def render_metrics() -> tuple:
+    """Returns the metrics in the Prometheus text format and their content type."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
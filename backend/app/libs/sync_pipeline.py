@@ -0,0 +1,121 @@
+"""Staged async pipeline with bounded queues.
+
+Usage:
+
+    pipeline = SyncPipeline([
+        PipelineStage("fetch", fetch_handler, concurrency=200),
+        PipelineStage("diff", diff_handler, concurrency=10, blocking=True),
+    ], on_error=lambda stage_name, item, err: print(err))
+    await pipeline.run(async_iterable_of_items)
+    print(pipeline.stats())
+
+Every stage has its own bounded input queue and its own number of workers.
+A handler returns the item for the next stage, or None once the item is
+finished. Blocking handlers run in a thread pool sized to the stage. When a
+queue is full the stage feeding it waits, so the slowest stage throttles
+everything upstream instead of letting work pile up in memory.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+_STOP = object()
+
+
+class PipelineStage:
+    """One step of the pipeline: a handler, its worker count and its input queue."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable,
+        concurrency: int,
+        queue_size: Optional[int] = None,
+        blocking: bool = False,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size or self.concurrency * 2
+        self.blocking = blocking
+
+        self.processed = 0
+        self.in_flight = 0
+        self.queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+
+    def stats(self) -> dict:
+        elapsed = (self._stopped_at or time.time()) - self._started_at if self._started_at else 0
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.queue_size,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "throughput_per_sec": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class SyncPipeline:
+    """Runs items from a source through a chain of PipelineStages."""
+
+    def __init__(self, stages: list, on_error: Callable[[str, object, Exception], None]):
+        self.stages = stages
+        self.on_error = on_error
+
+    def stats(self) -> dict:
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    async def run(self, source):
+        """Feeds every item of the async iterable source into the first stage and drains all stages."""
+        workers = []
+        for index, stage in enumerate(self.stages):
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+            stage._started_at = time.time()
+            if stage.blocking:
+                stage._executor = ThreadPoolExecutor(max_workers=stage.concurrency, thread_name_prefix=f"sync-{stage.name}")
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            workers.append([
+                asyncio.create_task(self._work(stage, next_stage)) for _ in range(stage.concurrency)
+            ])
+
+        try:
+            async for item in source:
+                await self.stages[0].queue.put(item)
+        finally:
+            # Stop stages front to back, so every stage has drained into the next one before it stops
+            for stage, stage_workers in zip(self.stages, workers):
+                for _ in stage_workers:
+                    await stage.queue.put(_STOP)
+                await asyncio.gather(*stage_workers)
+                stage._stopped_at = time.time()
+                if stage._executor is not None:
+                    stage._executor.shutdown(wait=True)
+                    stage._executor = None
+
+    async def _work(self, stage: PipelineStage, next_stage: Optional[PipelineStage]):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await stage.queue.get()
+            if item is _STOP:
+                return
+
+            stage.in_flight += 1
+            try:
+                if stage.blocking:
+                    result = await loop.run_in_executor(stage._executor, stage.handler, item)
+                else:
+                    result = await stage.handler(item)
+            except Exception as err:
+                self.on_error(stage.name, item, err)
+                result = None
+            finally:
+                stage.in_flight -= 1
+                stage.processed += 1
+
+            if result is not None and next_stage is not None:
+                await next_stage.queue.put(result)
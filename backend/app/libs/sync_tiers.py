@@ -0,0 +1,52 @@
+"""Refresh tiers for scheduled syncs, derived from status and lastApiUpdate.
+
+Usage:
+
+    from app.libs.sync_tiers import select_hot_case_ids
+
+    case_ids = select_hot_case_ids()  # Open cases changed in the last SYNC_HOT_DAYS days
+
+Hot cases are open and changed recently, so they are refreshed often by
+fetching just their details. Everything else (closed or stale cases) is the
+cold tier and is only refreshed by the full sync, which also discovers new
+cases through the upstream case list.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.libs.case_status import INACTIVE_STATUSES, LIFECYCLE_OPEN, LIFECYCLE_UNKNOWN
+from app.libs.database_management import SYNC_POOL, get_mysql_connection
+from app.libs.repair_case_schema import get_repair_case_schema
+
+HOT_DAYS = int(os.getenv("SYNC_HOT_DAYS", "14"))  # lastApiUpdate age up to which an open case is hot
+
+
+def select_hot_case_ids(hot_days: int = HOT_DAYS) -> list:
+    """Returns the IDs of open cases still in the API whose data changed within hot_days."""
+    cnx = get_mysql_connection(SYNC_POOL)
+    if not cnx:
+        raise RuntimeError("Failed to get database connection to select hot cases.")
+    try:
+        changed_since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=hot_days)
+        if get_repair_case_schema().has_lifecycle:
+            # Cases without a status are treated as open here
+            open_sql = "lifecycle IN (%s, %s)"
+            open_params = (LIFECYCLE_OPEN, LIFECYCLE_UNKNOWN)
+        else:
+            status_placeholders = ', '.join(['%s'] * len(INACTIVE_STATUSES))
+            open_sql = f"(status IS NULL OR LOWER(status) NOT IN ({status_placeholders}))"
+            open_params = INACTIVE_STATUSES
+        cursor = cnx.cursor()
+        cursor.execute(
+            "SELECT caseId FROM repair_cases "
+            f"WHERE isPresentInLastApiSync = 1 AND lastApiUpdate >= %s AND {open_sql} "
+            "ORDER BY caseId",
+            (changed_since, *open_params),
+        )
+        case_ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return case_ids
+    finally:
+        if cnx.is_connected():
+            cnx.close()
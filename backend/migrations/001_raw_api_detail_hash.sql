@@ -0,0 +1,7 @@
+-- Adds a SHA-256 digest of the canonical rawApiDetail payload.
+-- The sync compares this 32-byte value instead of loading and reparsing rawApiDetail.
+-- After running this, populate existing rows with:
+--   python -m scripts.backfill_raw_api_detail_hash
+
+ALTER TABLE repair_cases
+ADD COLUMN IF NOT EXISTS rawApiDetailHash BINARY(32) NULL;
@@ -0,0 +1,9 @@
+-- Remembers case IDs whose detail showed no active insurance, so the sync can
+-- skip fetching their details again until the entry expires.
+
+CREATE TABLE IF NOT EXISTS sync_non_insurance_cases (
+    caseId BIGINT NOT NULL PRIMARY KEY,
+    firstSeenAt DATETIME NOT NULL,
+    lastVerifiedAt DATETIME NOT NULL,
+    INDEX idx_last_verified (lastVerifiedAt)
+);
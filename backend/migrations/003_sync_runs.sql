@@ -0,0 +1,24 @@
+-- Durable checkpoints for the case sync.
+-- sync_runs holds one row per sync run; sync_run_cases holds the case list of a
+-- run and which cases are finished, so an interrupted run can be resumed with
+-- only the remaining case IDs.
+
+CREATE TABLE IF NOT EXISTS sync_runs (
+    runId BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    status VARCHAR(20) NOT NULL,  -- running, completed, failed
+    startedAt DATETIME NOT NULL,
+    finishedAt DATETIME NULL,
+    heartbeatAt DATETIME NOT NULL,
+    listComplete TINYINT(1) NOT NULL DEFAULT 0,
+    totalCases INT NOT NULL DEFAULT 0,
+    INDEX idx_status_heartbeat (status, heartbeatAt)
+);
+
+CREATE TABLE IF NOT EXISTS sync_run_cases (
+    runId BIGINT NOT NULL,
+    caseId BIGINT NOT NULL,
+    done TINYINT(1) NOT NULL DEFAULT 0,
+    result VARCHAR(40) NULL,
+    PRIMARY KEY (runId, caseId),
+    INDEX idx_run_done (runId, done, caseId)
+);
@@ -0,0 +1,11 @@
+-- Shared sync progress, so every uvicorn worker (or node) reports the same run.
+-- Written by the worker holding the sync lock (MySQL GET_LOCK), read by /sync-status.
+
+CREATE TABLE IF NOT EXISTS sync_status (
+    id TINYINT NOT NULL PRIMARY KEY,  -- Always 1, there is a single row
+    isRunning TINYINT(1) NOT NULL DEFAULT 0,
+    ownerId VARCHAR(255) NULL,
+    startedAt DATETIME NULL,
+    updatedAt DATETIME NOT NULL,
+    statsJson TEXT NULL
+);
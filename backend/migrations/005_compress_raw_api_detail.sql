@@ -0,0 +1,9 @@
+-- Stores rawApiDetail as bytes, so the sync can write it compressed (see app/libs/case_payload.py).
+-- Existing JSON text is kept as-is by the type change and still read transparently.
+-- Until this runs, the sync keeps writing plain JSON text.
+-- After running this, compress existing rows with:
+--   python -m scripts.compress_raw_api_detail
+-- and reclaim the freed space with OPTIMIZE TABLE repair_cases during a quiet period.
+
+ALTER TABLE repair_cases
+MODIFY COLUMN rawApiDetail LONGBLOB NULL;
@@ -0,0 +1,15 @@
+-- Keeps the raw Repairline payload out of the hot repair_cases rows.
+-- The sync writes rawApiDetail (compressed, see app/libs/case_payload.py) here
+-- and clears it in repair_cases; readers prefer this table and fall back to
+-- repair_cases.rawApiDetail for rows that have not been moved yet.
+-- caseId takes its type from repair_cases.caseId, so joins stay index lookups.
+-- After running this, move existing payloads with:
+--   python -m scripts.move_raw_api_detail
+-- and reclaim the freed space with OPTIMIZE TABLE repair_cases during a quiet period.
+
+CREATE TABLE IF NOT EXISTS repair_case_payloads (
+    rawApiDetail LONGBLOB NULL,
+    updatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (caseId)
+)
+SELECT caseId FROM repair_cases LIMIT 0;
@@ -0,0 +1,11 @@
+-- Change counter for repair_cases, bumped with every batch the sync writes and
+-- when a sync finishes. /cases caches filter counts per generation (see
+-- app/libs/case_counts.py), so a bump invalidates them in every worker.
+
+CREATE TABLE IF NOT EXISTS repair_cases_generation (
+    id TINYINT NOT NULL PRIMARY KEY,  -- Always 1, there is a single row
+    generation BIGINT NOT NULL DEFAULT 0,
+    updatedAt DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO repair_cases_generation (id, generation, updatedAt) VALUES (1, 0, UTC_TIMESTAMP());
@@ -0,0 +1,24 @@
+-- FULLTEXT index for the /cases search box (see app/libs/case_search.py).
+-- Written for MariaDB, like the other migrations, which has no ngram parser: the
+-- built-in parser indexes whole words of at least innodb_ft_min_token_size
+-- characters (3 by default, a server option), and the search matches every term
+-- as a word prefix, e.g. "müll" in "Müller". Shorter terms are checked on the
+-- matched rows with LIKE.
+-- Stopwords are disabled for this index, otherwise a required term that is a
+-- stopword (like "die" or "und") would match no row at all.
+-- Building the index rewrites the table, run it during a quiet period.
+
+SET SESSION innodb_ft_enable_stopword = OFF;
+
+CREATE FULLTEXT INDEX IF NOT EXISTS ft_case_search
+ON repair_cases(caseNumber, customerName, productName, insuranceContractNumber, status, insuranceName);
+
+SET SESSION innodb_ft_enable_stopword = ON;
+
+-- Searches for a case or contract number ("RL-12345") are prefix matches on these
+-- columns. Same indexes as in database_indexes.sql, for databases set up without it.
+CREATE INDEX IF NOT EXISTS idx_case_number
+ON repair_cases(caseNumber(50));
+
+CREATE INDEX IF NOT EXISTS idx_insurance_contract
+ON repair_cases(insuranceContractNumber(50));
@@ -0,0 +1,25 @@
+-- Lower-cased copies of insuranceName and status for the list filters (see app/libs/case_filters.py).
+-- LOWER(insuranceName) = ... cannot use an index on insuranceName; these columns
+-- can. They are STORED generated columns, so MariaDB fills them for existing rows
+-- here and keeps them current for every write, by the sync or anyone else.
+-- insuranceNameNorm is '' instead of NULL, matching the IFNULL() of the filter.
+-- Check that the dashboard queries use the indexes with:
+--   python -m scripts.check_case_indexes
+
+ALTER TABLE repair_cases
+ADD COLUMN IF NOT EXISTS insuranceNameNorm VARCHAR(191)
+    AS (LEFT(IFNULL(LOWER(insuranceName), ''), 191)) STORED,
+ADD COLUMN IF NOT EXISTS statusNorm VARCHAR(191)
+    AS (LEFT(LOWER(status), 191)) STORED;
+
+-- One insurance: equality on both leading columns, rows come out in sort order
+CREATE INDEX IF NOT EXISTS idx_cases_active_insurance_updated
+ON repair_cases(insuranceIsActive, insuranceNameNorm, lastApiUpdate, caseId);
+
+-- All insurances: equality on insuranceIsActive, rows come out in sort order
+CREATE INDEX IF NOT EXISTS idx_cases_active_updated
+ON repair_cases(insuranceIsActive, lastApiUpdate, caseId);
+
+-- Counts per insurance and status filter, answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_cases_active_insurance_status
+ON repair_cases(insuranceIsActive, insuranceNameNorm, statusNorm);
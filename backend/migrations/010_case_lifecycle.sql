@@ -0,0 +1,28 @@
+-- Lifecycle of each case (open, closed, cancelled, or unknown without a status),
+-- classified from its status by the sync when it writes the row, using the
+-- status list in app/libs/case_status.py. "Active only" in the case list is
+-- then a single indexed equality instead of a NOT IN over all ended statuses.
+-- case_lifecycle_state remembers which status list the stored values were
+-- classified with. The first sync after this migration, and the first one
+-- after the list changes, reclassifies all rows in batches before it starts.
+-- The case list only filters on lifecycle once the stored fingerprint matches
+-- the current status list, so it keeps using the status list until then.
+-- To reclassify right away, run:
+--   python -m scripts.reclassify_case_lifecycle
+
+ALTER TABLE repair_cases
+ADD COLUMN IF NOT EXISTS lifecycle VARCHAR(16) NULL;
+
+CREATE TABLE IF NOT EXISTS case_lifecycle_state (
+    id TINYINT NOT NULL PRIMARY KEY,  -- Always 1, there is a single row
+    fingerprint CHAR(64) NOT NULL,
+    reclassifiedAt DATETIME NOT NULL
+);
+
+-- All insurances, active only: equality on both leading columns, rows come out in sort order
+CREATE INDEX IF NOT EXISTS idx_cases_active_lifecycle_updated
+ON repair_cases(insuranceIsActive, lifecycle, lastApiUpdate, caseId);
+
+-- One insurance, active only
+CREATE INDEX IF NOT EXISTS idx_cases_active_insurance_lifecycle_updated
+ON repair_cases(insuranceIsActive, insuranceNameNorm, lifecycle, lastApiUpdate, caseId);
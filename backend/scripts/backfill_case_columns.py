@@ -0,0 +1,168 @@
+"""Fills mapped repair_cases columns from the stored rawApiDetail, without calling the Repairline API.
+
+Run from the backend directory, e.g. after adding a column to the table and
+an entry for it to CASE_MAPPING_SPEC in app/libs/case_mapping.py:
+
+    python -m scripts.backfill_case_columns --columns customerZipCode
+    python -m scripts.backfill_case_columns            # All mapped columns
+
+Rows are read in caseId order in chunks on one connection, mapped in a
+process pool, and written back per chunk through a temporary table with a
+single joined UPDATE. Only the listed columns are written; caseId, the raw
+payload and the sync bookkeeping columns are never touched. lifecycle is
+left to scripts/reclassify_case_lifecycle.py, which also records the status
+list it classified with. Each chunk bumps
+the data generation, so cached /cases counts are recomputed.
+"""
+
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs.case_counts import bump_data_generation
+from app.libs.case_mapping import MAPPED_COLUMNS, map_case_payload
+from app.libs.case_payload import decode_raw_detail
+from app.libs.database_management import get_mysql_connection
+from app.libs.repair_case_schema import RepairCaseSchema
+
+CHUNK_SIZE = 1000
+
+
+def _map_chunk(rows: list, columns: tuple) -> list:
+    """Maps (caseId, rawApiDetail) rows to (caseId, *values) tuples. Runs in a worker process."""
+    mapped = []
+    for case_id, raw_detail in rows:
+        raw_detail = decode_raw_detail(raw_detail)
+        try:
+            case_data = json.loads(raw_detail)
+        except (json.JSONDecodeError, TypeError):
+            continue  # Left untouched, the next sync of the case fills the columns
+        if not isinstance(case_data, dict):
+            continue
+        values = map_case_payload(case_data, columns)
+        mapped.append((case_id, *(values[column] for column in columns)))
+    return mapped
+
+
+def _iter_chunks(cnx, chunk_size: int, schema: RepairCaseSchema):
+    raw_detail_expr, payload_join = schema.raw_detail_source()
+    select = f"SELECT r.caseId, {raw_detail_expr} FROM repair_cases r {payload_join} WHERE {raw_detail_expr} IS NOT NULL"
+    last_case_id = None
+    while True:
+        cursor = cnx.cursor()
+        if last_case_id is None:
+            cursor.execute(f"{select} ORDER BY r.caseId LIMIT %s", (chunk_size,))
+        else:
+            cursor.execute(f"{select} AND r.caseId > %s ORDER BY r.caseId LIMIT %s", (last_case_id, chunk_size))
+        rows = cursor.fetchall()
+        cursor.close()
+        if not rows:
+            return
+        last_case_id = rows[-1][0]
+        yield rows
+
+
+def backfill_case_columns(
+    columns: tuple,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = None,
+    schema: RepairCaseSchema = None,
+) -> int:
+    """Recomputes the given columns for every row with a stored payload. Returns the number of rows updated."""
+    schema = schema or RepairCaseSchema.load()
+    read_cnx = get_mysql_connection()
+    write_cnx = get_mysql_connection()
+    if not read_cnx or not write_cnx:
+        raise RuntimeError("Failed to connect to database for backfill.")
+
+    column_list = ", ".join(f"`{column}`" for column in ("caseId", *columns))
+    assignments = ", ".join(f"r.`{column}` = t.`{column}`" for column in columns)
+    placeholders = ", ".join(["%s"] * (len(columns) + 1))
+    updated = 0
+    try:
+        cursor = write_cnx.cursor()
+        # The temporary table copies the column types of repair_cases
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS backfill_case_values")
+        cursor.execute(f"CREATE TEMPORARY TABLE backfill_case_values SELECT {column_list} FROM repair_cases LIMIT 0")
+        cursor.execute("ALTER TABLE backfill_case_values ADD PRIMARY KEY (caseId)")
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Chunks are mapped in parallel while the next ones are read. Only a few
+            # chunks are in flight at a time, so the table is never held in memory.
+            pending = deque()
+            chunks = _iter_chunks(read_cnx, chunk_size, schema)
+            while True:
+                while len(pending) < workers * 2:
+                    rows = next(chunks, None)
+                    if rows is None:
+                        break
+                    pending.append(pool.submit(_map_chunk, rows, columns))
+                if not pending:
+                    break
+                mapped = pending.popleft().result()
+                if not mapped:
+                    continue
+                cursor.execute("TRUNCATE TABLE backfill_case_values")
+                cursor.executemany(
+                    f"INSERT INTO backfill_case_values ({column_list}) VALUES ({placeholders})",
+                    mapped,
+                )
+                cursor.execute(
+                    f"UPDATE repair_cases r JOIN backfill_case_values t ON t.caseId = r.caseId SET {assignments}"
+                )
+                if schema.has_generation_table:
+                    # Invalidates the cached /cases counts together with the commit
+                    bump_data_generation(cursor)
+                write_cnx.commit()
+                updated += len(mapped)
+                print(f"Backfilled {updated} rows so far (last caseId: {mapped[-1][0]}).")
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS backfill_case_values")
+        cursor.close()
+    finally:
+        for cnx in (read_cnx, write_cnx):
+            if cnx.is_connected():
+                cnx.close()
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill mapped repair_cases columns from rawApiDetail.")
+    parser.add_argument("--columns", help="Comma-separated columns to fill (default: all mapped columns)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Mapping processes")
+    args = parser.parse_args(argv)
+
+    schema = RepairCaseSchema.load()
+    if args.columns:
+        columns = tuple(column.strip() for column in args.columns.split(",") if column.strip())
+        unknown = [column for column in columns if column not in MAPPED_COLUMNS]
+        if unknown:
+            raise SystemExit(f"No mapping for: {', '.join(unknown)}")
+        if "lifecycle" in columns:
+            raise SystemExit("Use python -m scripts.reclassify_case_lifecycle to rewrite lifecycle.")
+    else:
+        columns = tuple(column for column in MAPPED_COLUMNS if column not in ("caseId", "lifecycle"))
+
+    missing = [column for column in columns if column not in schema.columns]
+    if missing:
+        print(f"Skipping columns missing from repair_cases: {', '.join(missing)}")
+        columns = tuple(column for column in columns if column in schema.columns)
+    columns = tuple(column for column in columns if column != "caseId")
+    if not columns:
+        raise SystemExit("Nothing to backfill.")
+
+    print(f"Backfilling {', '.join(columns)}...")
+    total = backfill_case_columns(columns, args.chunk_size, args.workers, schema)
+    print(f"Backfill finished. Updated {total} rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""One-off backfill of repair_cases.rawApiDetailHash for existing rows.
+
+Run from the backend directory after applying migrations/001_raw_api_detail_hash.sql:
+
+    python -m scripts.backfill_raw_api_detail_hash
+
+Rows are processed in caseId order in chunks, so the job can be stopped and
+restarted at any time; it only touches rows whose digest is still NULL.
+"""
+
+import json
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs.case_payload import canonical_json, decode_raw_detail, payload_digest
+from app.libs.database_management import get_mysql_connection
+from app.libs.repair_case_schema import RepairCaseSchema
+
+CHUNK_SIZE = 500
+
+
+def backfill_raw_api_detail_hash(chunk_size: int = CHUNK_SIZE) -> int:
+    """Computes missing digests chunk by chunk. Returns the number of rows updated."""
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise RuntimeError("Failed to connect to database for backfill.")
+
+    raw_detail_expr, payload_join = RepairCaseSchema.load().raw_detail_source()
+    select = (
+        f"SELECT r.caseId, {raw_detail_expr} AS rawApiDetail FROM repair_cases r {payload_join} "
+        "WHERE r.rawApiDetailHash IS NULL"
+    )
+    updated = 0
+    last_case_id = None
+    try:
+        while True:
+            cursor = cnx.cursor(dictionary=True)
+            if last_case_id is None:
+                cursor.execute(f"{select} ORDER BY r.caseId LIMIT %s", (chunk_size,))
+            else:
+                cursor.execute(f"{select} AND r.caseId > %s ORDER BY r.caseId LIMIT %s", (last_case_id, chunk_size))
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                raw_detail = row.get('rawApiDetail')
+                try:
+                    raw_detail = decode_raw_detail(raw_detail)
+                    digest = payload_digest(canonical_json(json.loads(raw_detail or '{}')))
+                except (json.JSONDecodeError, TypeError) as json_err:
+                    # Leave the digest NULL; the sync falls back to a full compare for it
+                    print(f"[{row['caseId']}] Skipping, rawApiDetail is not valid JSON: {json_err}")
+                    continue
+                updates.append((digest, row['caseId']))
+
+            if updates:
+                cursor = cnx.cursor()
+                cursor.executemany(
+                    "UPDATE repair_cases SET rawApiDetailHash = %s WHERE caseId = %s",
+                    updates,
+                )
+                cursor.close()
+                cnx.commit()
+                updated += len(updates)
+
+            last_case_id = rows[-1]['caseId']
+            print(f"Backfilled {updated} digests so far (last caseId: {last_case_id}).")
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+    return updated
+
+
+if __name__ == "__main__":
+    total = backfill_raw_api_detail_hash()
+    print(f"Backfill finished. Updated {total} rows.")
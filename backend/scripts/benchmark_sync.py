@@ -0,0 +1,232 @@
+"""End-to-end benchmark of the case sync against the fake Repairline API.
+
+Run from the backend directory with MYSQL_* pointing at a local database that
+has the repair_cases table and the migrations applied:
+
+    python -m scripts.benchmark_sync --cases 5000 --latency-ms 50 --reset
+
+This starts scripts/fake_repairline.py as a subprocess (or uses --fake-url),
+then runs sync_insurance_cases_task once per scenario:
+
+    cold   - empty repair_cases and sync tables (needs --reset)
+    warm   - the same data again, nothing changed upstream
+    churn  - after changing --churn-fraction of the upstream cases
+
+and reports wall time, cases/sec, p95 per-case and per-request latency, and
+the MySQL statements executed (from SHOW GLOBAL STATUS, so run it on a
+database nothing else uses).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import dotenv
+
+dotenv.load_dotenv()
+
+RESET_TABLES = ["repair_cases", "repair_case_payloads", "sync_non_insurance_cases", "sync_run_cases", "sync_runs", "sync_status"]
+STATEMENT_COUNTERS = ["Com_select", "Com_insert", "Com_update", "Com_delete", "Com_insert_select", "Questions"]
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def _http_json(url: str, method: str = "GET") -> dict:
+    request = urllib.request.Request(url, method=method)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _start_fake_server(args) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "scripts.fake_repairline",
+        "--port", str(args.fake_port),
+        "--cases", str(args.cases),
+        "--payload-kb", str(args.payload_kb),
+        "--insurance-ratio", str(args.insurance_ratio),
+        "--latency-ms", str(args.latency_ms),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+    ]
+    process = subprocess.Popen(command)
+    admin_url = f"http://127.0.0.1:{args.fake_port}/admin/stats"
+    for _ in range(100):
+        try:
+            _http_json(admin_url)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake Repairline server did not start.")
+
+
+def _reset_database():
+    from app.libs.database_management import get_mysql_connection
+
+    if os.getenv("MYSQL_HOST", "localhost") not in LOCAL_HOSTS:
+        raise SystemExit("Refusing to reset tables on a non-local MYSQL_HOST.")
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise SystemExit("Failed to connect to database for the reset.")
+    try:
+        cursor = cnx.cursor()
+        for table in RESET_TABLES:
+            try:
+                cursor.execute(f"DELETE FROM {table}")
+            except Exception as e:
+                print(f"Could not reset {table}: {e}")
+        cursor.close()
+        cnx.commit()
+    finally:
+        cnx.close()
+
+
+def _statement_counts() -> dict:
+    from app.libs.database_management import get_mysql_connection
+
+    cnx = get_mysql_connection()
+    if not cnx:
+        return {}
+    try:
+        cursor = cnx.cursor()
+        placeholders = ", ".join(["%s"] * len(STATEMENT_COUNTERS))
+        cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})", STATEMENT_COUNTERS)
+        counts = {name: int(value) for name, value in cursor.fetchall()}
+        cursor.close()
+        return counts
+    except Exception as e:
+        print(f"Could not read statement counters: {e}")
+        return {}
+    finally:
+        cnx.close()
+
+
+def _bucket_counts(histogram) -> list:
+    """Returns the cumulative (upper bound, count) pairs of an unlabelled histogram."""
+    samples = histogram.collect()[0].samples
+    return [(float(s.labels["le"]), s.value) for s in samples if s.name.endswith("_bucket")]
+
+
+def _quantile(before: list, after: list, q: float):
+    """Estimates a quantile from the bucket deltas, interpolating like histogram_quantile()."""
+    buckets = [(bound, count_after - count_before) for (bound, count_before), (_, count_after) in zip(before, after)]
+    total = buckets[-1][1] if buckets else 0
+    if total <= 0:
+        return None
+    rank = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / max(count - lower_count, 1e-9)
+        lower_bound, lower_count = bound, count
+    return None
+
+
+def run_scenario(name: str) -> dict:
+    from app.apis import simple_sync
+    from app.libs import sync_metrics
+
+    case_before = _bucket_counts(sync_metrics.CASE_SECONDS)
+    fetch_before = _bucket_counts(sync_metrics.UPSTREAM_FETCH_SECONDS)
+    statements_before = _statement_counts()
+
+    started = time.monotonic()
+    simple_sync.sync_insurance_cases_task()
+    wall_seconds = time.monotonic() - started
+
+    statements_after = _statement_counts()
+    stats = dict(simple_sync._sync_stats)
+    case_p95 = _quantile(case_before, _bucket_counts(sync_metrics.CASE_SECONDS), 0.95)
+    fetch_p95 = _quantile(fetch_before, _bucket_counts(sync_metrics.UPSTREAM_FETCH_SECONDS), 0.95)
+    return {
+        "scenario": name,
+        "wall_seconds": round(wall_seconds, 2),
+        "processed": stats["processed"],
+        "cases_per_sec": round(stats["processed"] / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        "case_p95_ms": round(case_p95 * 1000, 1) if case_p95 is not None else None,
+        "fetch_p95_ms": round(fetch_p95 * 1000, 1) if fetch_p95 is not None else None,
+        "upserted": stats["upserted"],
+        "skipped_no_change": stats["skipped_no_change"],
+        "skipped_not_insurance": stats["skipped_not_insurance"],
+        "errors": stats["errors"],
+        "fetch_limit": stats.get("fetch_limit", {}).get("limit"),
+        "statements": {
+            counter: statements_after[counter] - statements_before.get(counter, 0)
+            for counter in statements_after
+        },
+    }
+
+
+def print_report(results: list):
+    header = f"{'scenario':<8} {'wall s':>8} {'cases/s':>8} {'case p95':>9} {'fetch p95':>9} " \
+             f"{'upserted':>8} {'no chg':>7} {'no ins':>7} {'errors':>6} {'limit':>5} {'queries':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['scenario']:<8} {r['wall_seconds']:>8} {r['cases_per_sec']:>8} "
+              f"{r['case_p95_ms'] or '-':>9} {r['fetch_p95_ms'] or '-':>9} "
+              f"{r['upserted']:>8} {r['skipped_no_change']:>7} {r['skipped_not_insurance']:>7} "
+              f"{r['errors']:>6} {r['fetch_limit'] or '-':>5} {r['statements'].get('Questions', '-'):>8}")
+    for r in results:
+        counts = ", ".join(f"{name}={value}" for name, value in r["statements"].items() if name != "Questions")
+        print(f"{r['scenario']} statements: {counts or 'n/a'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the case sync against the fake Repairline API.")
+    parser.add_argument("--scenarios", default="cold,warm,churn", help="Comma-separated: cold, warm, churn")
+    parser.add_argument("--reset", action="store_true", help="Empty repair_cases and the sync tables before 'cold'")
+    parser.add_argument("--fake-url", help="Base URL of an already running fake server, e.g. http://127.0.0.1:9100")
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--payload-kb", type=float, default=4.0)
+    parser.add_argument("--insurance-ratio", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--churn-fraction", type=float, default=0.2)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    if "cold" in scenarios and not args.reset:
+        raise SystemExit("The cold scenario empties repair_cases, pass --reset to confirm.")
+
+    fake_process = None
+    fake_url = args.fake_url
+    if not fake_url:
+        fake_process = _start_fake_server(args)
+        fake_url = f"http://127.0.0.1:{args.fake_port}"
+    # Must be set before the sync modules are imported
+    os.environ["REPAIRLINE_API_BASE_URL"] = f"{fake_url.rstrip('/')}/v2/"
+
+    results = []
+    try:
+        for scenario in scenarios:
+            if scenario == "cold":
+                _reset_database()
+            elif scenario == "churn":
+                changed = _http_json(f"{fake_url}/admin/churn?fraction={args.churn_fraction}", method="POST")
+                print(f"Changed {changed['changed']} upstream cases.")
+            elif scenario != "warm":
+                raise SystemExit(f"Unknown scenario: {scenario}")
+            print(f"=== Running {scenario} sync ===")
+            results.append(run_scenario(scenario))
+    finally:
+        if fake_process is not None:
+            fake_process.terminate()
+            fake_process.wait()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
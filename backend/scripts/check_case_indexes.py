@@ -0,0 +1,111 @@
+"""Checks with EXPLAIN that the dashboard's case list queries use the filter indexes.
+
+Run from the backend directory after applying migrations/009_normalized_filter_columns.sql
+and migrations/010_case_lifecycle.sql:
+
+    python -m scripts.check_case_indexes
+    python -m scripts.check_case_indexes --insurance allianz
+
+The WHERE clauses are built by app/libs/case_filters.py, exactly as /cases
+and the CSV export build them. For every filter combination the dashboard
+can send, the page query (ORDER BY lastApiUpdate DESC LIMIT 50) and the count
+query are explained. The check fails if a query does not use one of the
+expected indexes, or if a page query needs a filesort. Exits with status 1 on
+failure, so it can run after a migration in a deploy script. Run it against a
+database with realistic data, since the optimizer prefers a table scan for
+tiny tables.
+"""
+
+import argparse
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs.case_filters import NORMALIZED_COLUMNS, build_case_filters
+from app.libs.database_management import get_mysql_connection
+from app.libs.repair_case_schema import RepairCaseSchema
+
+EXPECTED_INDEXES = {
+    "idx_cases_active_insurance_updated",
+    "idx_cases_active_updated",
+    "idx_cases_active_insurance_status",
+    "idx_cases_active_lifecycle_updated",
+    "idx_cases_active_insurance_lifecycle_updated",
+}
+
+
+def _scenarios(insurance: str) -> list:
+    """(name, filter arguments) for the combinations of dashboard filters."""
+    scenarios = []
+    for insurance_name in (None, insurance):
+        for active_only in (True, False):
+            for months in (None, 6):
+                name = (f"insurance={insurance_name or 'all'} active_only={active_only} "
+                        f"months={months or 'all'}")
+                scenarios.append((name, dict(insurance_name=insurance_name, active_only=active_only,
+                                             time_range_months=months)))
+    return scenarios
+
+
+def _explain(cursor, sql: str, params: list) -> list:
+    cursor.execute("EXPLAIN " + sql, tuple(params))
+    return cursor.fetchall()
+
+
+def check_case_indexes(schema: RepairCaseSchema, insurance: str) -> bool:
+    """Prints the plan of every scenario. Returns True if all of them use the indexes."""
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise RuntimeError("Failed to connect to database for the index check.")
+
+    all_ok = True
+    try:
+        cursor = cnx.cursor(dictionary=True)
+        for name, filters in _scenarios(insurance):
+            where_clauses, params = build_case_filters(schema, **filters)
+            where_clause = " WHERE " + " AND ".join(where_clauses)
+            queries = {
+                "page": (f"SELECT caseId FROM repair_cases{where_clause} "
+                         "ORDER BY lastApiUpdate DESC, caseId DESC LIMIT 50"),
+                "count": f"SELECT COUNT(*) FROM repair_cases{where_clause}",
+            }
+            for kind, sql in queries.items():
+                plan = _explain(cursor, sql, params)[0]
+                key = plan.get('key')
+                extra = plan.get('Extra') or ""
+                problems = []
+                if key not in EXPECTED_INDEXES:
+                    problems.append(f"uses {key or 'no index'}")
+                if kind == "page" and "filesort" in extra:
+                    problems.append("needs a filesort")
+                status = "OK  " if not problems else "FAIL"
+                all_ok = all_ok and not problems
+                print(f"{status} {kind:<5} {name}: key={key}, rows={plan.get('rows')}, extra={extra or '-'}"
+                      + (f" ({', '.join(problems)})" if problems else ""))
+        cursor.close()
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+    return all_ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN the case list queries and check their indexes.")
+    parser.add_argument("--insurance", default="allianz", help="Insurance name used for the single-insurance filter")
+    args = parser.parse_args(argv)
+
+    schema = RepairCaseSchema.load()
+    missing_columns = [column for column in NORMALIZED_COLUMNS + ('lifecycle',) if column not in schema.columns]
+    missing_indexes = sorted(EXPECTED_INDEXES - schema.indexes)
+    if missing_columns or missing_indexes:
+        raise SystemExit(f"Missing columns {missing_columns} / indexes {missing_indexes}, "
+                         "apply migrations/009_normalized_filter_columns.sql and 010_case_lifecycle.sql first.")
+
+    if not check_case_indexes(schema, args.insurance.lower()):
+        raise SystemExit(1)
+    print("All case list queries use the filter indexes.")
+
+
+if __name__ == "__main__":
+    main()
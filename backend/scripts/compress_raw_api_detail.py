@@ -0,0 +1,117 @@
+"""One-off compression of existing repair_cases.rawApiDetail values.
+
+Run from the backend directory after applying migrations/005_compress_raw_api_detail.sql:
+
+    python -m scripts.compress_raw_api_detail
+    python -m scripts.compress_raw_api_detail --compression zstd --chunk-size 200
+
+Rows are processed in caseId order in chunks, so the job can be stopped and
+restarted at any time; values that already carry a compression marker are
+skipped. A row is only overwritten if its payload did not change since it was
+read, so the job can run while the sync is writing.
+"""
+
+import argparse
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs import case_payload
+from app.libs.case_payload import RAW_DETAIL_COMPRESSION, encode_raw_detail, is_compressed_raw_detail
+from app.libs.database_management import get_mysql_connection
+from app.libs.repair_case_schema import RepairCaseSchema
+
+CHUNK_SIZE = 500
+
+
+def compress_raw_api_detail(compression: str = RAW_DETAIL_COMPRESSION, chunk_size: int = CHUNK_SIZE) -> tuple:
+    """Compresses plain JSON payloads chunk by chunk. Returns (rows updated, bytes before, bytes after)."""
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise RuntimeError("Failed to connect to database for compression.")
+
+    updated = 0
+    bytes_before = 0
+    bytes_after = 0
+    last_case_id = None
+    try:
+        while True:
+            cursor = cnx.cursor()
+            # Compressed values start with a NUL byte, plain JSON never does
+            if last_case_id is None:
+                cursor.execute(
+                    "SELECT caseId, rawApiDetail FROM repair_cases "
+                    "WHERE rawApiDetail IS NOT NULL AND LEFT(rawApiDetail, 1) <> 0x00 "
+                    "ORDER BY caseId LIMIT %s",
+                    (chunk_size,),
+                )
+            else:
+                cursor.execute(
+                    "SELECT caseId, rawApiDetail FROM repair_cases "
+                    "WHERE rawApiDetail IS NOT NULL AND LEFT(rawApiDetail, 1) <> 0x00 AND caseId > %s "
+                    "ORDER BY caseId LIMIT %s",
+                    (last_case_id, chunk_size),
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+
+            updates = []
+            for case_id, raw_detail in rows:
+                if is_compressed_raw_detail(raw_detail):
+                    continue
+                original = raw_detail.encode('utf-8') if isinstance(raw_detail, str) else bytes(raw_detail)
+                try:
+                    encoded = encode_raw_detail(original.decode('utf-8'), compression)
+                except UnicodeDecodeError as decode_err:
+                    print(f"[{case_id}] Skipping, rawApiDetail is not valid UTF-8: {decode_err}")
+                    continue
+                bytes_before += len(original)
+                bytes_after += len(encoded)
+                updates.append((encoded, case_id, original))
+
+            if updates:
+                cursor = cnx.cursor()
+                cursor.executemany(
+                    "UPDATE repair_cases SET rawApiDetail = %s WHERE caseId = %s AND rawApiDetail = %s",
+                    updates,
+                )
+                cursor.close()
+                cnx.commit()
+                updated += len(updates)
+
+            last_case_id = rows[-1][0]
+            print(f"Compressed {updated} rows so far (last caseId: {last_case_id}).")
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+    return updated, bytes_before, bytes_after
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress existing repair_cases.rawApiDetail values.")
+    parser.add_argument("--compression", choices=("zlib", "zstd"), default=None,
+                        help=f"Codec to use (default: RAW_DETAIL_COMPRESSION, currently {RAW_DETAIL_COMPRESSION})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    compression = args.compression or RAW_DETAIL_COMPRESSION
+    if compression == "none":
+        raise SystemExit("RAW_DETAIL_COMPRESSION is 'none', pass --compression zlib or zstd.")
+    if compression == "zstd" and case_payload.zstandard is None:
+        raise SystemExit("The zstandard package is not installed.")
+
+    schema = RepairCaseSchema.load()
+    if 'rawApiDetail' not in schema.binary_columns:
+        raise SystemExit("rawApiDetail is still a text column, apply migrations/005_compress_raw_api_detail.sql first.")
+
+    total, bytes_before, bytes_after = compress_raw_api_detail(compression, args.chunk_size)
+    ratio = f" ({bytes_after / bytes_before:.0%} of the original size)" if bytes_before else ""
+    print(f"Compression finished. Updated {total} rows, {bytes_before} -> {bytes_after} bytes{ratio}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Local stand-in for the Repairline API, for benchmarks and offline testing.
+
+Run from the backend directory:
+
+    python -m scripts.fake_repairline --cases 20000 --insurance-ratio 0.3 --latency-ms 80 --port 9100
+
+and point the sync at it with REPAIRLINE_API_BASE_URL=http://127.0.0.1:9100/v2/.
+
+Serves GET /v2/cases (streamed JSON array) and GET /v2/cases/{id}. Payloads
+are generated deterministically from the case ID and a per-case version, so
+repeated syncs see identical data until POST /admin/churn?fraction=0.2
+changes a random share of the cases. Latency is log-normal around
+--latency-ms, and --error-rate / --throttle-rate inject 500 and 429
+(with Retry-After) responses. GET /admin/stats reports the requests served.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+STATUSES = ['Eingegangen', 'In Reparatur', 'Warten auf Teile', 'Kostenvoranschlag', 'Abgeschlossen', 'Storniert']
+INSURANCES = ['Allianz', 'ERGO', 'HDI', 'Ammerländer', 'Barmenia']
+LIST_CHUNK_SIZE = 1000
+
+
+def build_case(case_id: int, version: int, insured: bool, payload_kb: float) -> dict:
+    """Returns a case detail with the fields the sync maps, padded to about payload_kb."""
+    rnd = random.Random(case_id * 1000003 + version)
+    status = rnd.choice(STATUSES)
+    case = {
+        'CaseId': case_id,
+        'CaseNumber': f"RL-{case_id:08d}",
+        'Status': status,
+        'Bookings': [{'Status': rnd.choice(STATUSES)}, {'Status': status}],
+        'Warranty': rnd.choice(['Ja', 'Nein']),
+        'Currency': 'EUR',
+        'Customer': {
+            'FirstName': rnd.choice(['Anna', 'Jonas', 'Lea', 'Paul', 'Mia']),
+            'LastName': rnd.choice(['Müller', 'Schmidt', 'Weber', 'Fischer']),
+            'Email': f"kunde{case_id}@example.com",
+            'City': rnd.choice(['Berlin', 'Hamburg', 'München', 'Köln']),
+            'CompanyName': None,
+            'CustomerNumber': f"K{case_id:07d}",
+            'PhoneMain': f"0{rnd.randint(100000000, 999999999)}",
+            'ZipCode': f"{rnd.randint(10000, 99999)}",
+        },
+        'Product': {
+            'ProductName': rnd.choice(['iPhone 14', 'Galaxy S23', 'Pixel 8', 'MacBook Air']),
+            'Manufacturer': rnd.choice(['Apple', 'Samsung', 'Google']),
+            'SerialNumber': f"SN{rnd.getrandbits(40):010x}",
+        },
+        'Symptoms': {'Comment': rnd.choice(['Display gebrochen', 'Akku defekt', 'Wasserschaden'])},
+        'Store': {'Current': rnd.choice(['Filiale Nord', 'Filiale Süd', 'Zentrale'])},
+        'Service': {'Servicetype': rnd.choice(['Einsendung', 'Vor Ort'])},
+        'Positions': [{'PriceGross': round(rnd.uniform(10, 400), 2)} for _ in range(rnd.randint(0, 4))],
+        'Insurance': {
+            'InsuranceIsActivated': True,
+            'ContractNumber': f"V-{case_id:09d}",
+            'Name': rnd.choice(INSURANCES),
+            'Retention': rnd.choice([0, 50, 100]),
+            'SettlementAmount': None,
+        } if insured else None,
+    }
+    padding = int(payload_kb * 1024) - len(json.dumps(case))
+    if padding > 0:
+        case['Notes'] = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(padding))
+    return case
+
+
+def create_fake_app(args) -> FastAPI:
+    app = FastAPI()
+    rnd = random.Random(args.seed)
+    insured_ids = {case_id for case_id in range(1, args.cases + 1) if rnd.random() < args.insurance_ratio}
+    versions = {}
+    served = Counter()
+
+    async def simulate_latency():
+        await asyncio.sleep(random.lognormvariate(0, args.latency_sigma) * args.latency_ms / 1000)
+
+    @app.get("/v2/cases")
+    async def list_cases():
+        served["list"] += 1
+
+        def stream():
+            yield "["
+            for start in range(1, args.cases + 1, LIST_CHUNK_SIZE):
+                chunk = range(start, min(start + LIST_CHUNK_SIZE, args.cases + 1))
+                separator = "," if start > 1 else ""
+                yield separator + ",".join(
+                    json.dumps({'CaseId': case_id, 'CaseNumber': f"RL-{case_id:08d}"}) for case_id in chunk
+                )
+            yield "]"
+
+        return StreamingResponse(stream(), media_type="application/json")
+
+    @app.get("/v2/cases/{case_id}")
+    async def get_case(case_id: int):
+        await simulate_latency()
+        roll = random.random()
+        if roll < args.throttle_rate:
+            served["throttled"] += 1
+            return Response(status_code=429, headers={"Retry-After": str(args.retry_after)})
+        if roll < args.throttle_rate + args.error_rate:
+            served["error"] += 1
+            return Response(status_code=500)
+        if not 1 <= case_id <= args.cases:
+            served["not_found"] += 1
+            raise HTTPException(status_code=404, detail="Case not found")
+        served["detail"] += 1
+        return build_case(case_id, versions.get(case_id, 0), case_id in insured_ids, args.payload_kb)
+
+    @app.post("/admin/churn")
+    async def churn(fraction: float = 0.1):
+        """Changes the payload of a random share of the cases."""
+        changed = random.sample(range(1, args.cases + 1), int(args.cases * fraction))
+        for case_id in changed:
+            versions[case_id] = versions.get(case_id, 0) + 1
+        return {"changed": len(changed)}
+
+    @app.get("/admin/stats")
+    async def stats():
+        return {"cases": args.cases, "insured_cases": len(insured_ids), "served": dict(served)}
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Repairline API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--cases", type=int, default=10000, help="Number of cases in the list")
+    parser.add_argument("--payload-kb", type=float, default=4.0, help="Approximate size of one case detail")
+    parser.add_argument("--insurance-ratio", type=float, default=0.3, help="Share of cases with an active insurance")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Median detail request latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of detail requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of detail requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    uvicorn.run(create_fake_app(args), host=args.host, port=args.port, log_level="warning")
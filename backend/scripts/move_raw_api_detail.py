@@ -0,0 +1,107 @@
+"""One-off move of repair_cases.rawApiDetail into the repair_case_payloads side table.
+
+Run from the backend directory after applying migrations/006_repair_case_payloads.sql:
+
+    python -m scripts.move_raw_api_detail
+    python -m scripts.move_raw_api_detail --chunk-size 200
+
+Rows are processed in caseId order in chunks, so the job can be stopped and
+restarted at any time; it only touches rows that still carry a payload in
+repair_cases. Payloads are compressed on the way (see app/libs/case_payload.py)
+unless they already are. A payload the sync has meanwhile written to the side
+table is never overwritten, and the repair_cases copy is only cleared if it
+did not change since it was read, so the job can run while the sync is writing.
+"""
+
+import argparse
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs.case_payload import RAW_DETAIL_COMPRESSION, encode_raw_detail, is_compressed_raw_detail
+from app.libs.database_management import get_mysql_connection
+from app.libs.repair_case_schema import PAYLOAD_TABLE, RepairCaseSchema
+
+CHUNK_SIZE = 500
+
+
+def move_raw_api_detail(chunk_size: int = CHUNK_SIZE) -> int:
+    """Moves payloads chunk by chunk. Returns the number of rows moved."""
+    cnx = get_mysql_connection()
+    if not cnx:
+        raise RuntimeError("Failed to connect to database for the move.")
+
+    moved = 0
+    last_case_id = None
+    try:
+        while True:
+            cursor = cnx.cursor()
+            if last_case_id is None:
+                cursor.execute(
+                    "SELECT caseId, rawApiDetail FROM repair_cases "
+                    "WHERE rawApiDetail IS NOT NULL ORDER BY caseId LIMIT %s",
+                    (chunk_size,),
+                )
+            else:
+                cursor.execute(
+                    "SELECT caseId, rawApiDetail FROM repair_cases "
+                    "WHERE rawApiDetail IS NOT NULL AND caseId > %s ORDER BY caseId LIMIT %s",
+                    (last_case_id, chunk_size),
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+
+            payloads = []
+            clears = []
+            for case_id, raw_detail in rows:
+                if is_compressed_raw_detail(raw_detail) or RAW_DETAIL_COMPRESSION == "none":
+                    encoded = raw_detail.encode('utf-8') if isinstance(raw_detail, str) else bytes(raw_detail)
+                else:
+                    original = raw_detail if isinstance(raw_detail, str) else bytes(raw_detail).decode('utf-8')
+                    encoded = encode_raw_detail(original)
+                payloads.append((case_id, encoded))
+                clears.append((case_id, raw_detail))
+
+            cursor = cnx.cursor()
+            # INSERT IGNORE keeps a payload the sync already wrote to the side table
+            cursor.executemany(
+                f"INSERT IGNORE INTO {PAYLOAD_TABLE} (caseId, rawApiDetail) VALUES (%s, %s)",
+                payloads,
+            )
+            cursor.executemany(
+                "UPDATE repair_cases SET rawApiDetail = NULL WHERE caseId = %s AND rawApiDetail = %s",
+                clears,
+            )
+            cursor.close()
+            cnx.commit()
+            moved += len(payloads)
+
+            last_case_id = rows[-1][0]
+            print(f"Moved {moved} payloads so far (last caseId: {last_case_id}).")
+    finally:
+        if cnx.is_connected():
+            cnx.close()
+
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move repair_cases.rawApiDetail into repair_case_payloads.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    schema = RepairCaseSchema.load()
+    if not schema.has_payload_table:
+        raise SystemExit(f"{PAYLOAD_TABLE} does not exist, apply migrations/006_repair_case_payloads.sql first.")
+    if 'rawApiDetail' not in schema.columns:
+        raise SystemExit("repair_cases has no rawApiDetail column, nothing to move.")
+
+    total = move_raw_api_detail(args.chunk_size)
+    print(f"Move finished. Moved {total} payloads.")
+
+
+if __name__ == "__main__":
+    main()
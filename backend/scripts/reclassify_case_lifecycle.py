@@ -0,0 +1,51 @@
+"""Rewrites repair_cases.lifecycle from the status list in app/libs/case_status.py.
+
+Run from the backend directory after applying migrations/010_case_lifecycle.sql,
+or after changing CASE_STATUS_LIFECYCLES:
+
+    python -m scripts.reclassify_case_lifecycle
+    python -m scripts.reclassify_case_lifecycle --force --chunk-size 2000
+
+The sync does the same at its start whenever the status list changed, so this
+script is only needed to apply a change right away. Without --force it does
+nothing if the stored lifecycles were classified with the current list. Rows
+are updated in caseId chunks, so it can run while the sync is writing.
+"""
+
+import argparse
+
+import dotenv
+
+dotenv.load_dotenv()
+
+from app.libs.case_counts import bump_data_generation_now
+from app.libs.lifecycle_reclassification import CHUNK_SIZE, reclassify_if_outdated, reclassify_lifecycles
+from app.libs.repair_case_schema import RepairCaseSchema
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reclassify the lifecycle of all repair cases.")
+    parser.add_argument("--force", action="store_true", help="Reclassify even if the status list did not change")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    schema = RepairCaseSchema.load()
+    if not schema.has_lifecycle_column:
+        raise SystemExit("repair_cases has no lifecycle column, apply migrations/010_case_lifecycle.sql first.")
+
+    if args.force:
+        changed = reclassify_lifecycles(args.chunk_size)
+    else:
+        changed = reclassify_if_outdated()
+        if changed is None:
+            print("Lifecycles are already classified with the current status list.")
+            return
+
+    # Cached /cases counts may include rows whose lifecycle changed
+    if changed and schema.has_generation_table:
+        bump_data_generation_now()
+    print(f"Reclassification finished. {changed} rows changed.")
+
+
+if __name__ == "__main__":
+    main()
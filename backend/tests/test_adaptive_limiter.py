@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.libs import adaptive_limiter
+from app.libs.adaptive_limiter import DECREASE_COOLDOWN, AdaptiveConcurrencyLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(adaptive_limiter.time, "monotonic", fake)
+    return fake
+
+
+def test_limit_is_clamped():
+    assert AdaptiveConcurrencyLimiter(initial_limit=500, max_limit=10).limit == 10
+    assert AdaptiveConcurrencyLimiter(initial_limit=0, max_limit=10).limit == 1
+
+
+def test_additive_increase_per_round():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=10)
+    # Each success adds 1/limit, so a round of about `limit` successes adds one slot
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert int(limiter.limit) == 4
+    limiter.on_success(0.1)
+    assert int(limiter.limit) == 5
+    assert limiter.increases == 1
+
+
+def test_increase_stops_at_max_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=3)
+    for _ in range(100):
+        limiter.on_success(0.1)
+    assert limiter.limit == 3
+
+
+def test_slow_response_holds_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=10)
+    limiter.on_success(0.1)
+    before = limiter.limit
+    limiter.on_success(0.1 * adaptive_limiter.LATENCY_TOLERANCE * 2)
+    assert limiter.limit == before
+
+
+def test_overload_halves_once_per_cooldown(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=32)
+    limiter.on_overload()
+    limiter.on_overload()  # Same burst, ignored
+    assert limiter.limit == 8
+    assert limiter.decreases == 1
+
+    clock.now += DECREASE_COOLDOWN
+    limiter.on_overload()
+    assert limiter.limit == 4
+    assert limiter.decreases == 2
+
+
+def test_decrease_stops_at_min_limit(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=32)
+    for _ in range(5):
+        limiter.on_overload()
+        clock.now += DECREASE_COOLDOWN
+    assert limiter.limit == 1
+    assert limiter.decreases == 1
+
+
+def test_pause_only_extends(clock):
+    limiter = AdaptiveConcurrencyLimiter()
+    limiter.pause(10)
+    limiter.pause(5)
+    assert limiter.pauses == 1
+    assert limiter.stats()["paused_for_seconds"] == 10
+
+
+def test_acquire_waits_for_a_free_slot():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_passes_its_wakeup_on():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()  # Wakes first, which is cancelled before it runs
+        first.cancel()
+        await asyncio.wait_for(second, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
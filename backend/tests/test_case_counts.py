@@ -0,0 +1,119 @@
+import pytest
+
+from app.libs import case_counts
+from app.libs.case_counts import CountCache
+from app.libs.repair_case_schema import RepairCaseSchema
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(case_counts.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_count_is_reused_within_a_generation(clock):
+    cache = CountCache(ttl=300)
+    cache.put("active", 4, 120)
+    assert cache.get("active", 4) == 120
+    assert cache.hits == 1
+
+
+def test_new_generation_invalidates(clock):
+    cache = CountCache(ttl=300)
+    cache.put("active", 4, 120)
+    assert cache.get("active", 5) is None
+    assert cache.misses == 1
+
+
+def test_ttl_bounds_the_age(clock):
+    cache = CountCache(ttl=300)
+    cache.put("active", 4, 120)
+    clock[0] += 301
+    assert cache.get("active", 4) is None
+
+
+def test_unknown_generation_is_never_cached(clock):
+    cache = CountCache()
+    cache.put("active", None, 120)
+    assert cache.get("active", None) is None
+    assert cache._entries == {}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = CountCache(max_entries=2)
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    cache.get("a", 1)
+    cache.put("c", 1, 3)
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == 1
+    assert cache.get("c", 1) == 3
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self._row = None
+
+    def execute(self, sql, params=()):
+        if "generation" in sql:
+            self._row = {"generation": 1}
+        elif sql.startswith("SELECT COUNT(*)"):
+            self.cnx.counts += 1
+            self._row = {"total": 0}
+
+    def fetchone(self):
+        return self._row
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.counts = 0
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def test_relative_time_filter_is_cached_per_minute(monkeypatch):
+    pytest.importorskip("pandas")
+    import app.apis.view_cases as view_cases
+
+    cnx = FakeConnection()
+    now = [60_000.0]
+    monkeypatch.setattr(view_cases, "get_mysql_connection", lambda *args: cnx)
+    monkeypatch.setattr(view_cases.time, "time", lambda: now[0])
+    monkeypatch.setattr(view_cases, "case_count_cache", CountCache())
+    monkeypatch.setattr(view_cases, "get_repair_case_schema", lambda: RepairCaseSchema(["caseId", "status"]))
+
+    def get_cases(**filters):
+        view_cases.get_cases(
+            insuranceName=None, page=1, limit=50, search=None, showActiveOnly=True,
+            sortBy="lastApiUpdate", sortDirection="desc", fields=None, pageCursor=None,
+            approximateCount=False, **filters,
+        )
+
+    get_cases(timeRangeMonths=3)
+    get_cases(timeRangeMonths=3)
+    assert cnx.counts == 1
+    now[0] += 60
+    get_cases(timeRangeMonths=3)
+    assert cnx.counts == 2
+
+    # Filters without a relative time are not tied to the clock
+    get_cases(timeRangeMonths=None)
+    now[0] += 3600
+    get_cases(timeRangeMonths=None)
+    assert cnx.counts == 3
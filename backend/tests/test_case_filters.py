@@ -0,0 +1,42 @@
+from app.libs.case_filters import EXCLUDED_INSURANCE, build_case_filters
+from app.libs.case_status import INACTIVE_STATUSES
+from app.libs.repair_case_schema import RepairCaseSchema
+
+MIGRATED = RepairCaseSchema(["caseId", "insuranceName", "status", "insuranceNameNorm", "statusNorm"])
+UNMIGRATED = RepairCaseSchema(["caseId", "insuranceName", "status"])
+
+
+def test_core_filter_only():
+    where_clauses, params = build_case_filters(MIGRATED)
+    assert where_clauses == ["insuranceIsActive = 1 AND insuranceNameNorm != %s"]
+    assert params == [EXCLUDED_INSURANCE]
+
+
+def test_normalized_columns_once_migrated():
+    where_clauses, params = build_case_filters(
+        MIGRATED, insurance_name="Allianz", active_only=True, time_range_months=6,
+    )
+    assert where_clauses[1] == "insuranceNameNorm = %s"
+    assert where_clauses[2].startswith("statusNorm NOT IN (")
+    assert where_clauses[3] == "lastApiUpdate >= DATE_SUB(NOW(), INTERVAL %s MONTH)"
+    assert not any("LOWER(" in clause for clause in where_clauses)
+    assert params == [EXCLUDED_INSURANCE, "allianz", *(s.lower() for s in INACTIVE_STATUSES), 6]
+
+
+def test_lower_fallback_before_the_migration():
+    where_clauses, params = build_case_filters(UNMIGRATED, insurance_name="Allianz", active_only=True)
+    assert where_clauses[0] == "insuranceIsActive = 1 AND IFNULL(LOWER(insuranceName), '') != %s"
+    assert where_clauses[1] == "IFNULL(LOWER(insuranceName), '') = %s"
+    assert where_clauses[2].startswith("LOWER(status) NOT IN (")
+    assert params == [EXCLUDED_INSURANCE, "allianz", *(s.lower() for s in INACTIVE_STATUSES)]
+
+
+def test_placeholders_match_params():
+    for schema in (MIGRATED, UNMIGRATED):
+        where_clauses, params = build_case_filters(schema, "x", True, 3)
+        assert " AND ".join(where_clauses).count("%s") == len(params)
+
+
+def test_zero_months_means_no_time_filter():
+    where_clauses, _ = build_case_filters(MIGRATED, time_range_months=0)
+    assert len(where_clauses) == 1
@@ -0,0 +1,109 @@
+from app.libs import lifecycle_reclassification
+from app.libs.case_mapping import map_case_payload
+from app.libs.case_status import (
+    LIFECYCLE_CANCELLED,
+    LIFECYCLE_CLOSED,
+    LIFECYCLE_OPEN,
+    LIFECYCLE_UNKNOWN,
+    classify_lifecycle,
+)
+from app.libs.lifecycle_reclassification import outdated_lifecycles, reclassify_lifecycles
+
+# Statuses as the API sends them and as other writers may have stored them
+STATUSES = [
+    "Abgeschlossen", " abgeschlossen ", "ABGESCHLOSSEN", "Gerät entsorgen", "GERÄT ENTSORGEN",
+    "Gerat entsorgen", "Storniert", "Reparaturabbruch", "In Reparatur", "Closed\t", "", "   ", None,
+]
+
+
+def test_classification():
+    assert classify_lifecycle(" Abgeschlossen ") == LIFECYCLE_CLOSED
+    assert classify_lifecycle("STORNIERT") == LIFECYCLE_CANCELLED
+    assert classify_lifecycle("Gerat entsorgen") == LIFECYCLE_OPEN
+    assert classify_lifecycle("  ") == LIFECYCLE_UNKNOWN
+    assert classify_lifecycle(None) == LIFECYCLE_UNKNOWN
+
+
+def test_sync_and_reclassification_agree():
+    # What the sync writes for each status, then what the reclassification makes of the stored rows
+    synced = [
+        map_case_payload({"CaseId": case_id, "Status": status}, columns=("caseId", "status", "lifecycle"))
+        for case_id, status in enumerate(STATUSES)
+    ]
+    assert outdated_lifecycles([(row["caseId"], row["status"], row["lifecycle"]) for row in synced]) == []
+
+    # Stored statuses that were not cleaned by the sync classify the same as their payload
+    raw_rows = [
+        (case_id, status, map_case_payload({"Status": status}, columns=("lifecycle",))["lifecycle"])
+        for case_id, status in enumerate(STATUSES)
+    ]
+    assert outdated_lifecycles(raw_rows) == []
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.cnx.executed.append((sql, params))
+        self._rows = []
+        if sql.startswith("SELECT caseId, status, lifecycle"):
+            after = params[0] if len(params) == 2 else None
+            rows = [row for row in self.cnx.rows if after is None or row[0] > after]
+            self._rows = rows[:params[-1]]
+        elif sql.startswith("UPDATE repair_cases"):
+            self.rowcount = len(self.cnx.loaded)
+        elif sql.startswith("TRUNCATE"):
+            self.cnx.loaded = []
+
+    def executemany(self, sql, params):
+        self.cnx.executed.append((sql, list(params)))
+        self.cnx.loaded = list(params)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.loaded = []
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def test_reclassification_writes_only_outdated_rows(monkeypatch):
+    cnx = FakeConnection([
+        (1, "Abgeschlossen", LIFECYCLE_CLOSED),
+        (2, " storniert", None),
+        (3, "In Reparatur", LIFECYCLE_CLOSED),
+        (4, None, LIFECYCLE_UNKNOWN),
+        (5, "Neu", LIFECYCLE_OPEN),
+    ])
+    monkeypatch.setattr(lifecycle_reclassification, "get_mysql_connection", lambda *args: cnx)
+
+    assert reclassify_lifecycles(chunk_size=2) == 2
+
+    loads = [params for sql, params in cnx.executed if sql.startswith("INSERT INTO case_lifecycle_values")]
+    assert loads == [[(2, " storniert", LIFECYCLE_CANCELLED)], [(3, "In Reparatur", LIFECYCLE_OPEN)]]
+    # A status changed since it was read keeps the lifecycle the sync wrote for it
+    update_sql = next(sql for sql, _ in cnx.executed if sql.startswith("UPDATE repair_cases"))
+    assert "BINARY r.status <=> BINARY t.status" in update_sql
+    assert any(sql.startswith("INSERT INTO case_lifecycle_state") for sql, _ in cnx.executed)
+    assert cnx.executed[-1][0] == "DROP TEMPORARY TABLE IF EXISTS case_lifecycle_values"
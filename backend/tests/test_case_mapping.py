@@ -0,0 +1,159 @@
+import copy
+from datetime import datetime, timezone
+
+import pytest
+
+from app.apis.simple_sync import _map_case
+from app.libs.case_mapping import MAPPED_COLUMNS, map_case_payload
+from app.libs.case_status import classify_lifecycle
+from app.libs.repair_case_schema import RepairCaseSchema
+
+
+def _baseline_mapping(case_data: dict) -> dict:
+    """Frozen copy of the inline mapping the sync used before CASE_MAPPING_SPEC existed."""
+    bookings = case_data.get('Bookings') or []
+    latest_status = bookings[-1].get('Status') if bookings and len(bookings) > 0 else None
+    if not latest_status:
+        latest_status = case_data.get('Status')
+
+    customer_data = case_data.get('Customer') or {}
+    product_data = case_data.get('Product') or {}
+    insurance_data = case_data.get('Insurance') or {}
+    symptoms_data = case_data.get('Symptoms') or {}
+    store_data = case_data.get('Store') or {}
+    service_data = case_data.get('Service') or {}
+
+    def clean_value(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value.strip() if value.strip() else None
+        return value
+
+    first_name = clean_value(customer_data.get('FirstName'))
+    last_name = clean_value(customer_data.get('LastName'))
+    customer_name = None
+    if first_name and last_name:
+        customer_name = f"{first_name} {last_name}"
+    elif first_name:
+        customer_name = first_name
+    elif last_name:
+        customer_name = last_name
+
+    positions = case_data.get('Positions') or []
+    total_repair_cost = None
+    if positions:
+        try:
+            total_repair_cost = sum(float(pos.get('PriceGross', 0.0) or 0.0) for pos in positions)
+            if total_repair_cost == 0.0:
+                total_repair_cost = None
+        except (ValueError, TypeError):
+            total_repair_cost = None
+
+    return {
+        'caseId': case_data.get('CaseId'),
+        'caseNumber': clean_value(case_data.get('CaseNumber')),
+        'customerName': customer_name,
+        'customerEmail': clean_value(customer_data.get('Email')),
+        'customerCity': clean_value(customer_data.get('City')),
+        'productName': clean_value(product_data.get('ProductName')),
+        'manufacturer': clean_value(product_data.get('Manufacturer')),
+        'symptoms': clean_value(symptoms_data.get('Comment')),
+        'storeName': clean_value(store_data.get('Current')),
+        'status': clean_value(latest_status),
+        'warranty': clean_value(case_data.get('Warranty')),
+        'serviceType': clean_value(service_data.get('Servicetype')),
+        'currency': clean_value(case_data.get('Currency')),
+        'insuranceContractNumber': clean_value(insurance_data.get('ContractNumber')),
+        'insuranceIsActive': 1,
+        'insuranceName': clean_value(insurance_data.get('Name')),
+        'insuranceDeductible': insurance_data.get('Retention') if insurance_data.get('Retention') is not None else None,
+        'insuranceSettlementAmount': insurance_data.get('SettlementAmount') if insurance_data.get('SettlementAmount') is not None else None,
+        'customerCompanyName': clean_value(customer_data.get('CompanyName')),
+        'customerNumber': clean_value(customer_data.get('CustomerNumber')),
+        'customerFirstName': first_name,
+        'customerLastName': last_name,
+        'customerPhoneMain': clean_value(customer_data.get('PhoneMain')),
+        'customerZipCode': clean_value(customer_data.get('ZipCode')),
+        'productSerialNumber': clean_value(product_data.get('SerialNumber')),
+        'totalRepairCost': total_repair_cost,
+    }
+
+
+FULL_CASE = {
+    "CaseId": 481516,
+    "CaseNumber": " RL-2342 ",
+    "Status": "Neu",
+    "Bookings": [{"Status": "In Bearbeitung"}, {"Status": " Warten auf Teile "}],
+    "Customer": {
+        "FirstName": "Jürgen", "LastName": "Müller", "Email": "j.mueller@example.de",
+        "City": "Köln", "CompanyName": "", "CustomerNumber": "K-77", "PhoneMain": "0221 123",
+        "ZipCode": "50667",
+    },
+    "Product": {"ProductName": "iPhone 13", "Manufacturer": "Apple", "SerialNumber": "F2LX"},
+    "Insurance": {
+        "InsuranceIsActivated": True, "ContractNumber": "V-1", "Name": "Wertgarantie",
+        "Retention": 50, "SettlementAmount": 0,
+    },
+    "Symptoms": {"Comment": "Display gebrochen"},
+    "Store": {"Current": "Filiale Köln"},
+    "Service": {"Servicetype": "Einsendung"},
+    "Warranty": "   ",
+    "Currency": "EUR",
+    "Positions": [{"PriceGross": "129.90"}, {"PriceGross": None}, {"PriceGross": 20}],
+}
+
+SAMPLE_PAYLOADS = [
+    FULL_CASE,
+    # Nested objects missing or null
+    {"CaseId": 1, "Customer": None, "Product": None, "Insurance": None, "Bookings": None, "Positions": None},
+    {"CaseId": 2},
+    # Status falls back to the top level when the last booking has none
+    {**FULL_CASE, "Bookings": [{"Status": "Offen"}, {"Status": ""}]},
+    {**FULL_CASE, "Bookings": []},
+    # Only one name part
+    {**FULL_CASE, "Customer": {"FirstName": "  ", "LastName": "Schmidt"}},
+    {**FULL_CASE, "Customer": {"FirstName": "Anna"}},
+    # Costs that sum to zero or cannot be parsed
+    {**FULL_CASE, "Positions": [{"PriceGross": 0}, {}]},
+    {**FULL_CASE, "Positions": [{"PriceGross": "n/a"}]},
+    # Inactive insurance still maps to 1, the sync never stores such cases
+    {**FULL_CASE, "Insurance": {"InsuranceIsActivated": False, "Name": "Allianz"}},
+]
+
+
+def _sync_row(case_data: dict) -> dict:
+    columns = set(_baseline_mapping({})) | {"rawApiDetail", "rawApiDetailHash", "isPresentInLastApiSync", "lastApiUpdate"}
+    work = {
+        "case_id": case_data["CaseId"],
+        "case_data": copy.deepcopy(case_data),
+        "raw_detail_json": "{}",
+        "raw_detail_hash": b"",
+    }
+    return _map_case(work, RepairCaseSchema(columns), datetime(2026, 1, 5, tzinfo=timezone.utc))["row"]
+
+
+@pytest.mark.parametrize("case_data", SAMPLE_PAYLOADS)
+def test_sync_row_matches_the_baseline_mapping(case_data):
+    row = _sync_row(case_data)
+    expected = _baseline_mapping(case_data)
+    assert {column: row[column] for column in expected} == expected
+    assert row["isPresentInLastApiSync"] == 1
+
+
+@pytest.mark.parametrize("case_data", SAMPLE_PAYLOADS)
+def test_spec_covers_the_payload_columns(case_data):
+    # insuranceIsActive is set by the sync, not derived from the payload
+    expected = _baseline_mapping(case_data)
+    del expected["insuranceIsActive"]
+    # lifecycle is new in the spec, classified from the mapped status
+    expected["lifecycle"] = classify_lifecycle(expected["status"])
+    assert map_case_payload(case_data) == expected
+    assert set(MAPPED_COLUMNS) == set(expected)
+
+
+def test_selected_columns_only():
+    assert map_case_payload(FULL_CASE, columns=("customerZipCode", "status")) == {
+        "customerZipCode": "50667",
+        "status": "Warten auf Teile",
+    }
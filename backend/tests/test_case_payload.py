@@ -0,0 +1,65 @@
+import json
+import zlib
+
+import pytest
+
+from app.libs import case_payload
+from app.libs.case_payload import (
+    canonical_json,
+    decode_raw_detail,
+    encode_raw_detail,
+    is_compressed_raw_detail,
+    payload_digest,
+)
+
+CASE = {"CaseId": 7, "Customer": {"LastName": "Müller"}, "Symptoms": {"Comment": "Akku \"bläht\" sich"}}
+RAW_DETAIL = canonical_json(CASE)
+
+
+def test_zlib_round_trip():
+    stored = encode_raw_detail(RAW_DETAIL, "zlib")
+    assert stored.startswith(b"\x00zl1")
+    assert zlib.decompress(stored[4:]).decode("utf-8") == RAW_DETAIL
+    assert is_compressed_raw_detail(stored)
+    assert decode_raw_detail(stored) == RAW_DETAIL
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    stored = encode_raw_detail(RAW_DETAIL, "zstd")
+    assert stored.startswith(b"\x00zs1")
+    assert is_compressed_raw_detail(stored)
+    assert decode_raw_detail(stored) == RAW_DETAIL
+
+
+def test_zstd_value_without_zstandard_is_an_error(monkeypatch):
+    monkeypatch.setattr(case_payload, "zstandard", None)
+    with pytest.raises(RuntimeError):
+        decode_raw_detail(b"\x00zs1" + b"\x28\xb5\x2f\xfd")
+
+
+def test_uncompressed_encoding_is_plain_utf8():
+    stored = encode_raw_detail(RAW_DETAIL, "none")
+    assert stored == RAW_DETAIL.encode("utf-8")
+    assert not is_compressed_raw_detail(stored)
+    assert decode_raw_detail(stored) == RAW_DETAIL
+
+
+@pytest.mark.parametrize("legacy", [
+    RAW_DETAIL,                           # TEXT column, read as str
+    RAW_DETAIL.encode("utf-8"),           # Plain JSON in a LONGBLOB column
+    bytearray(RAW_DETAIL.encode("utf-8")),
+])
+def test_legacy_plain_values_are_read_unchanged(legacy):
+    assert not is_compressed_raw_detail(legacy)
+    assert decode_raw_detail(legacy) == RAW_DETAIL
+    assert json.loads(decode_raw_detail(legacy)) == CASE
+
+
+def test_missing_value():
+    assert decode_raw_detail(None) is None
+
+
+def test_digest_does_not_depend_on_the_codec():
+    digests = {payload_digest(decode_raw_detail(encode_raw_detail(RAW_DETAIL, codec))) for codec in ("zlib", "none")}
+    assert digests == {payload_digest(RAW_DETAIL)}
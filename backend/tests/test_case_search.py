@@ -0,0 +1,60 @@
+import pytest
+
+from app.libs.case_search import NUMBER_COLUMNS, SEARCH_COLUMNS, build_search, split_terms
+
+
+def _placeholders_match(search):
+    assert search.where_sql.count("%s") == len(search.where_params)
+    if search.relevance_sql:
+        assert search.relevance_sql.count("%s") == len(search.relevance_params)
+
+
+def test_long_words_use_the_fulltext_index():
+    search = build_search("Müller iPhone", use_fulltext=True)
+    assert search.where_sql.startswith("MATCH(")
+    assert search.where_params == ("+Müller* +iPhone*",)
+    assert search.relevance_params == ("+Müller* +iPhone*",)
+    assert search.relevance_sql.startswith("CAST(MATCH(")
+    _placeholders_match(search)
+
+
+def test_short_words_filter_the_matched_rows():
+    search = build_search("iphone 13", use_fulltext=True)
+    assert search.where_params[0] == "+iphone*"
+    assert " AND (LOWER(caseNumber) LIKE %s" in search.where_sql
+    assert search.where_params[1:] == ("%13%",) * len(SEARCH_COLUMNS)
+    _placeholders_match(search)
+
+
+def test_only_short_words_fall_back_to_the_like_scan():
+    search = build_search("ab 1", use_fulltext=True)
+    assert "MATCH" not in search.where_sql
+    assert search.where_params == ("%ab 1%",) * len(SEARCH_COLUMNS)
+    assert search.relevance_sql is None
+
+
+def test_like_scan_before_the_migration():
+    search = build_search("Müller", use_fulltext=False)
+    assert "MATCH" not in search.where_sql
+    assert search.where_params == ("%müller%",) * len(SEARCH_COLUMNS)
+
+
+@pytest.mark.parametrize("number", ["RL-12345", "rl-00012345", "V-1", "RL12345"])
+def test_numbers_are_prefix_matches(number):
+    for use_fulltext in (True, False):
+        search = build_search(f" {number} ", use_fulltext)
+        assert "LOWER(" not in search.where_sql
+        assert search.where_params == (f"{number}%",) * len(NUMBER_COLUMNS)
+        assert search.relevance_params == (number,) * len(NUMBER_COLUMNS)
+        _placeholders_match(search)
+
+
+def test_like_wildcards_in_numbers_are_escaped():
+    search = build_search("RL-1_2", use_fulltext=True)
+    assert search.where_params[0] == "RL-1\\_2%"
+
+
+def test_operators_are_not_passed_to_the_match():
+    long_terms, short_terms = split_terms('"Müller" -iphone +(x)')
+    assert long_terms == ["Müller", "iphone"]
+    assert short_terms == ["x"]
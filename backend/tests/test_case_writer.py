@@ -0,0 +1,130 @@
+import mysql.connector
+import pytest
+
+from app.libs import case_writer
+from app.libs.case_writer import CaseWriteBuffer
+from app.libs.repair_case_schema import RepairCaseSchema
+
+SCHEMA = RepairCaseSchema(["caseId", "caseNumber", "status"])
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+
+    def executemany(self, sql, params):
+        self.cnx.statements.append((sql, params))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records upserts and fails the first `failures` commits."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.statements = []
+        self.committed = []
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        if self.failures:
+            self.failures -= 1
+            self.statements.clear()
+            raise mysql.connector.Error(msg="Deadlock found")
+        self.committed.append(list(self.statements))
+        self.statements.clear()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.statements.clear()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    cnx = FakeConnection()
+    monkeypatch.setattr(case_writer, "get_mysql_connection", lambda *args: cnx)
+    monkeypatch.setattr(case_writer.time, "sleep", lambda seconds: None)
+    return cnx
+
+
+def _buffer(**kwargs):
+    return CaseWriteBuffer(schema=SCHEMA, **kwargs)
+
+
+def _row(case_id, **extra):
+    return {"caseId": case_id, "caseNumber": f"A-{case_id}", **extra}
+
+
+def test_rows_are_written_in_batches(connection):
+    # A long flush interval leaves all writing to close()
+    with _buffer(batch_size=3, flush_interval=60) as writer:
+        for case_id in range(7):
+            writer.add(_row(case_id))
+
+    assert [sum(len(params) for _, params in batch) for batch in connection.committed] == [3, 3, 1]
+    assert writer.batches_written == 3
+    assert writer.rows_written == 7
+    assert writer.rows_failed == 0
+
+
+def test_one_statement_per_column_set(connection):
+    writer = _buffer(batch_size=10, flush_interval=60)
+    writer.add(_row(1))
+    writer.add(_row(2, status="Offen"))
+    writer.add(_row(3))
+    writer.close()
+
+    (batch,) = connection.committed
+    assert len(batch) == 2
+    sql, params = batch[0]
+    assert sql.startswith("INSERT INTO repair_cases (`caseId`, `caseNumber`) VALUES (%s, %s)")
+    assert "`caseNumber` = VALUES(`caseNumber`)" in sql
+    assert params == [[1, "A-1"], [3, "A-3"]]
+    assert batch[1][1] == [[2, "A-2", "Offen"]]
+
+
+def test_failed_batch_is_retried_whole(connection):
+    connection.failures = 2
+    writer = _buffer(batch_size=10, flush_interval=60, max_retries=3)
+    writer.add(_row(1))
+    writer.add(_row(2))
+    writer.close()
+
+    assert connection.rollbacks == 2
+    assert len(connection.committed) == 1
+    assert writer.rows_written == 2
+    assert writer.rows_failed == 0
+
+
+def test_batch_counts_as_failed_after_last_retry(connection):
+    connection.failures = 3
+    writer = _buffer(batch_size=10, flush_interval=60, max_retries=3)
+    writer.add(_row(1))
+    writer.add(_row(2))
+    writer.close()
+
+    assert connection.committed == []
+    assert writer.batches_written == 0
+    assert writer.rows_written == 0
+    assert writer.rows_failed == 2
+
+
+def test_missing_connection_counts_as_failed(monkeypatch):
+    monkeypatch.setattr(case_writer, "get_mysql_connection", lambda *args: None)
+    monkeypatch.setattr(case_writer.time, "sleep", lambda seconds: None)
+    writer = _buffer(batch_size=10, flush_interval=60, max_retries=2)
+    writer.add(_row(1))
+    writer.close()
+
+    assert writer.rows_failed == 1
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from app.libs import database_management
+from app.libs.database_management import API_POOL, SYNC_POOL, MySQLConnectionPool
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    def make_pool(size):
+        pool = MySQLConnectionPool(size=size, checkout_timeout=0)
+        pool._connect = lambda: (FakeConnection(), time.monotonic())
+        return pool
+
+    monkeypatch.setattr(database_management, "MySQLConnectionPool", make_pool)
+    monkeypatch.setattr(database_management, "_POOL_SIZES", {API_POOL: 2, SYNC_POOL: 1})
+    monkeypatch.setattr(database_management, "_pools", {})
+
+
+def test_closed_connection_returns_to_pool(pools):
+    cnx = database_management.get_mysql_connection()
+    raw = cnx._cnx
+    cnx.close()
+    assert database_management.get_mysql_connection()._cnx is raw
+
+
+def test_exhausted_pool_times_out():
+    pool = MySQLConnectionPool(size=1, checkout_timeout=0)
+    pool._connect = lambda: (FakeConnection(), time.monotonic())
+    held = pool.get_connection()
+    with pytest.raises(database_management.PoolTimeoutError):
+        pool.get_connection()
+    held.close()
+    assert pool.get_connection() is not None
+    assert pool.stats()["checkout_timeouts"] == 1
+
+
+def test_sync_pool_does_not_take_api_connections(pools):
+    sync_cnx = database_management.get_mysql_connection(SYNC_POOL)
+    assert sync_cnx is not None
+    assert database_management.get_mysql_connection(SYNC_POOL) is None
+
+    api = [database_management.get_mysql_connection() for _ in range(2)]
+    assert all(cnx is not None for cnx in api)
+
+    stats = database_management.get_pool_stats()
+    assert stats[SYNC_POOL]["in_use"] == 1
+    assert stats[API_POOL]["in_use"] == 2
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+from app.libs.repairline_client import _iter_json_array
+
+
+async def _chunks(parts):
+    for part in parts:
+        yield part
+
+
+def _parse(parts):
+    async def collect():
+        return [item async for item in _iter_json_array(_chunks(parts))]
+    return asyncio.run(collect())
+
+
+def _split_every(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+CASES = [
+    {"CaseId": 1, "Status": "Abgeschlossen"},
+    {"CaseId": 2, "Customer": "Jürgen Müller", "Note": "Er sagte: \"[nicht] reparieren, {bitte}\""},
+    {"CaseId": 3, "Path": "C:\\Geräte\\", "Empty": [], "Nested": {"a": [1, 2, {"b": None}]}},
+    12345,
+    "text with , and ]",
+]
+
+
+def test_parses_whole_array_in_one_chunk():
+    assert _parse([json.dumps(CASES).encode("utf-8")]) == CASES
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_chunk_boundaries_anywhere(size):
+    # Boundaries fall inside strings, escapes, multi-byte characters and numbers
+    data = json.dumps(CASES, ensure_ascii=False, indent=1).encode("utf-8")
+    assert _parse(_split_every(data, size)) == CASES
+
+
+def test_split_inside_escape_sequence():
+    data = b'[{"v": "a\\"b"}, {"v": "\\u00fc"}]'
+    split_at = data.index(b"\\u") + 3
+    assert _parse([data[:split_at], data[split_at:]]) == [{"v": 'a"b'}, {"v": "ü"}]
+
+
+def test_number_is_not_yielded_before_it_ends():
+    assert _parse([b"[12", b"34, 5", b"6]"]) == [1234, 56]
+
+
+def test_empty_array():
+    assert _parse([b"  [ ", b" ]\n"]) == []
+
+
+def test_rejects_non_array():
+    with pytest.raises(ValueError):
+        _parse([b'{"CaseId": 1}'])
+
+
+def test_rejects_truncated_array():
+    with pytest.raises(ValueError):
+        _parse([b'[{"CaseId": 1}, {"CaseId": 2'])
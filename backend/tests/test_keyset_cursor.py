@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+from app.libs.keyset_cursor import CursorError, decode_cursor, encode_cursor, keyset_predicate
+
+
+@pytest.mark.parametrize("value", [
+    None,
+    42,
+    "Müller",
+    datetime.datetime(2024, 5, 1, 12, 30, 15),
+    datetime.date(2024, 5, 1),
+])
+def test_cursor_round_trip(value):
+    token = encode_cursor("lastApiUpdate", "DESC", value, 17, "next")
+    assert "=" not in token
+    assert decode_cursor(token, "lastApiUpdate", "DESC") == {"value": value, "id": 17, "direction": "next"}
+
+
+def test_cursor_of_another_sort_order_is_rejected():
+    token = encode_cursor("lastApiUpdate", "DESC", None, 1, "next")
+    with pytest.raises(CursorError):
+        decode_cursor(token, "lastApiUpdate", "ASC")
+    with pytest.raises(CursorError):
+        decode_cursor(token, "caseNumber", "DESC")
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", "e30", encode_cursor("caseId", "ASC", 1, 1, "sideways")])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(CursorError):
+        decode_cursor(token, "caseId", "ASC")
+
+
+def test_predicate_on_the_tiebreaker_alone():
+    assert keyset_predicate("caseId", "caseId", True, 5, 5) == ("caseId > %s", [5])
+    assert keyset_predicate("caseId", "caseId", False, 5, 5) == ("caseId < %s", [5])
+
+
+def test_predicate_ascending():
+    sql, params = keyset_predicate("status", "caseId", True, "open", 7)
+    assert sql == "(status > %s OR (status = %s AND caseId > %s))"
+    assert params == ["open", "open", 7]
+
+
+def test_predicate_descending_includes_nulls_at_the_end():
+    sql, params = keyset_predicate("status", "caseId", False, "open", 7)
+    assert sql == "(status < %s OR (status = %s AND caseId < %s) OR status IS NULL)"
+    assert params == ["open", "open", 7]
+
+
+def test_predicate_after_null_ascending_continues_into_values():
+    sql, params = keyset_predicate("status", "caseId", True, None, 7)
+    assert sql == "((status IS NULL AND caseId > %s) OR status IS NOT NULL)"
+    assert params == [7]
+
+
+def test_predicate_after_null_descending_stays_in_nulls():
+    sql, params = keyset_predicate("status", "caseId", False, None, 7)
+    assert sql == "(status IS NULL AND caseId < %s)"
+    assert params == [7]
+
+
+
+def test_predicate_repeats_expression_params():
+    sql, params = keyset_predicate("CAST(MATCH(a) AGAINST (%s) AS SIGNED)", "caseId", False, 512, 7, ("+word*",))
+    assert sql.count("%s") == len(params)
+    assert params == ["+word*", 512, "+word*", 512, 7, "+word*"]
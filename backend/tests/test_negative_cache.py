@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.libs import negative_cache
+from app.libs.negative_cache import NonInsuranceCaseCache
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def cache():
+    cache = NonInsuranceCaseCache(ttl_days=7, sample_rate=0.1)
+    cache.enabled = True
+    now = _utc_now()
+    cache._verified_at = {
+        1: now - timedelta(days=1),
+        2: now - timedelta(days=8),
+    }
+    return cache
+
+
+@pytest.fixture
+def no_sampling(monkeypatch):
+    monkeypatch.setattr(negative_cache.random, "random", lambda: 0.5)
+
+
+def test_fresh_entry_is_skipped(cache, no_sampling):
+    assert cache.should_skip(1)
+    assert cache.hits == 1
+    assert cache.hit_rate == 1.0
+
+
+def test_expired_entry_is_fetched_again(cache, no_sampling):
+    assert not cache.should_skip(2)
+    assert cache.lookups == 1
+    assert cache.hits == 0
+
+
+def test_unknown_case_is_fetched(cache, no_sampling):
+    assert not cache.should_skip(3)
+
+
+def test_sampled_fresh_entry_is_fetched_again(cache, monkeypatch):
+    monkeypatch.setattr(negative_cache.random, "random", lambda: 0.05)
+    assert not cache.should_skip(1)
+    assert cache.hits == 0
+
+
+def test_disabled_cache_skips_nothing(cache, no_sampling):
+    cache.enabled = False
+    assert not cache.should_skip(1)
+    assert cache.lookups == 0
+
+
+def test_case_that_became_insured_is_counted(cache):
+    cache.record_insurance(1)
+    cache.record_insurance(3)  # Never cached, nothing to remove
+    assert cache.flipped_to_insurance == 1
+    assert cache._insurance == {1}
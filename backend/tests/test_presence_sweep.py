@@ -0,0 +1,79 @@
+import mysql.connector
+import pytest
+
+from app.libs import presence_sweep
+from app.libs.presence_sweep import API_SOURCE_TYPE, sweep_presence_flags
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.cnx.executed.append((sql, params))
+        if sql.startswith("UPDATE") and self.cnx.fail_updates:
+            raise mysql.connector.Error(msg="Lock wait timeout exceeded")
+        self.rowcount = 3 if sql.startswith("UPDATE") else 0
+
+    def executemany(self, sql, params):
+        self.cnx.executed.append((sql, list(params)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, fail_updates=False):
+        self.fail_updates = fail_updates
+        self.executed = []
+        self.rolled_back = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def _sweep(cnx, monkeypatch, **kwargs):
+    monkeypatch.setattr(presence_sweep, "get_mysql_connection", lambda *args: cnx)
+    return sweep_presence_flags(**kwargs)
+
+
+def test_only_api_rows_are_marked_absent(monkeypatch):
+    cnx = FakeConnection()
+    assert _sweep(cnx, monkeypatch, seen_case_ids=[1, 2, 3]) == (3, 3)
+
+    updates = [(sql, params) for sql, params in cnx.executed if sql.startswith("UPDATE")]
+    present_sql, present_params = updates[0]
+    absent_sql, absent_params = updates[1]
+    assert "r.sourceType = %s" in present_sql.split("WHERE")[0]
+    assert present_params[0] == API_SOURCE_TYPE
+    assert "s.caseId IS NULL AND r.sourceType = %s" in absent_sql
+    assert absent_params == (API_SOURCE_TYPE,)
+
+
+def test_seen_ids_are_loaded_in_chunks(monkeypatch):
+    monkeypatch.setattr(presence_sweep, "LOAD_CHUNK_SIZE", 2)
+    cnx = FakeConnection()
+    _sweep(cnx, monkeypatch, seen_case_ids=range(5))
+    loads = [params for sql, params in cnx.executed if sql.startswith("INSERT IGNORE INTO sync_seen_cases (caseId) VALUES")]
+    assert loads == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+
+
+def test_temporary_table_is_dropped_after_a_failure(monkeypatch):
+    cnx = FakeConnection(fail_updates=True)
+    with pytest.raises(mysql.connector.Error):
+        _sweep(cnx, monkeypatch, run_id=7)
+    assert cnx.rolled_back
+    assert cnx.executed[-1][0] == "DROP TEMPORARY TABLE IF EXISTS sync_seen_cases"
@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.libs import repairline_client
+from app.libs.repairline_client import RepairlineClient
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    async def sleep(seconds):
+        pass
+
+    monkeypatch.setattr(repairline_client.asyncio, "sleep", sleep)
+
+
+def _fetch(responses, max_retries=4):
+    """Fetches case 1 against a transport that answers with the given responses in turn."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def scenario():
+        client = RepairlineClient(max_connections=4)
+        client._client = httpx.AsyncClient(base_url="http://repairline.test/v2/", transport=httpx.MockTransport(handler))
+        try:
+            return await client.fetch_case(1, max_retries=max_retries), client
+        finally:
+            await client._client.aclose()
+
+    result, client = asyncio.run(scenario())
+    return result, client, len(requests)
+
+
+def test_success_needs_one_request():
+    result, client, attempts = _fetch([httpx.Response(200, json={"CaseId": 1})])
+    assert result == {"CaseId": 1}
+    assert attempts == 1
+    assert client.retries == 0
+
+
+def test_server_errors_are_retried():
+    result, client, attempts = _fetch([httpx.Response(503), httpx.Response(500), httpx.Response(200, json={"CaseId": 1})])
+    assert result == {"CaseId": 1}
+    assert attempts == 3
+    assert client.retries == 2
+
+
+def test_client_errors_are_not_retried():
+    result, client, attempts = _fetch([httpx.Response(404)])
+    assert result is None
+    assert attempts == 1
+
+
+def test_too_many_requests_is_retried_and_pauses():
+    result, client, attempts = _fetch([
+        httpx.Response(429, headers={"Retry-After": "0.05"}),
+        httpx.Response(200, json={"CaseId": 1}),
+    ])
+    assert result == {"CaseId": 1}
+    assert attempts == 2
+    assert client.limiter.pauses == 1
+
+
+def test_timeouts_give_up_after_max_retries():
+    result, client, attempts = _fetch([httpx.ReadTimeout("timed out")], max_retries=4)
+    assert result is None
+    assert attempts == 4
+    assert client.retries == 3
+
+
+def test_invalid_json_is_retried():
+    result, client, attempts = _fetch([httpx.Response(200, content=b"{"), httpx.Response(200, json={"CaseId": 1})])
+    assert result == {"CaseId": 1}
+    assert attempts == 2
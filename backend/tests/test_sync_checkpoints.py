@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.libs import sync_checkpoints
+from app.libs.sync_checkpoints import RUN_STALE_SECONDS, SyncRunCheckpoint
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self.rowcount = 0
+        self.lastrowid = 42
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.cnx.executed.append((sql, params))
+        self.rowcount = 0
+        self._rows = []
+        for prefix, result in self.cnx.responses:
+            if sql.startswith(prefix):
+                if isinstance(result, int):
+                    self.rowcount = result
+                else:
+                    self._rows = list(result)
+                return
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Answers statements by prefix: a list of rows for SELECTs, a rowcount for UPDATEs."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+STALE_RUN = {
+    "runId": 7,
+    "startedAt": datetime(2026, 1, 5, 3, 0),
+    "listComplete": 0,
+    "totalCases": 1200,
+}
+
+
+def _connection(claimed=1, run=STALE_RUN):
+    return FakeConnection([
+        ("SELECT runId, startedAt", [run] if run else []),
+        ("UPDATE sync_runs SET heartbeatAt", claimed),
+        ("SELECT result, COUNT(*)", [{"result": "skipped_no_change", "n": 40}, {"result": "updated", "n": 2}]),
+        ("SELECT caseId FROM sync_run_cases", [{"caseId": 11}, {"caseId": 12}]),
+    ])
+
+
+@pytest.fixture
+def no_flusher(monkeypatch):
+    monkeypatch.setattr(SyncRunCheckpoint, "_start_flusher", lambda self: None)
+
+
+def test_stale_run_is_claimed_and_restored():
+    cnx = _connection()
+    checkpoint = SyncRunCheckpoint._claim_interrupted_run(cnx)
+
+    assert checkpoint.run_id == 7
+    assert checkpoint.resumed
+    assert checkpoint.started_at.tzinfo is not None
+    assert not checkpoint.list_complete
+    assert checkpoint.total_cases == 1200
+    assert checkpoint.prior_result_counts == {"skipped_no_change": 40, "updated": 2}
+    assert checkpoint.done_case_ids == {11, 12}
+
+    # Only runs whose heartbeat is older than the stale limit are claimed
+    select_params = cnx.executed[0][1]
+    claim_sql, claim_params = cnx.executed[1]
+    assert "heartbeatAt < %s" in claim_sql
+    assert claim_params[1] == 7
+    assert claim_params[0] - claim_params[2] == timedelta(seconds=RUN_STALE_SECONDS)
+    assert select_params == (claim_params[2],)
+    # Older orphaned runs are given up in the same transaction
+    assert cnx.executed[2][0].startswith("UPDATE sync_runs SET status = 'failed'")
+    assert cnx.commits == 1
+
+
+def test_done_ids_are_only_loaded_when_the_list_must_be_streamed_again():
+    cnx = _connection(run={**STALE_RUN, "listComplete": 1})
+    checkpoint = SyncRunCheckpoint._claim_interrupted_run(cnx)
+
+    assert checkpoint.list_complete
+    assert checkpoint.done_case_ids == set()
+    assert not any(sql.startswith("SELECT caseId") for sql, _ in cnx.executed)
+
+
+def test_run_claimed_by_another_process_is_left_alone():
+    cnx = _connection(claimed=0)
+    assert SyncRunCheckpoint._claim_interrupted_run(cnx) is None
+    assert not any("status = 'failed'" in sql for sql, _ in cnx.executed)
+
+
+def test_no_stale_run():
+    cnx = _connection(run=None)
+    assert SyncRunCheckpoint._claim_interrupted_run(cnx) is None
+    assert len(cnx.executed) == 1
+
+
+def test_resume_interrupted_claims_through_the_pool(monkeypatch, no_flusher):
+    cnx = _connection()
+    monkeypatch.setattr(sync_checkpoints, "get_mysql_connection", lambda *args: cnx)
+    checkpoint = SyncRunCheckpoint.resume_interrupted()
+    assert checkpoint.run_id == 7
+
+
+def test_start_or_resume_starts_a_new_run_without_a_stale_one(monkeypatch, no_flusher):
+    cnx = _connection(run=None)
+    monkeypatch.setattr(sync_checkpoints, "get_mysql_connection", lambda *args: cnx)
+    checkpoint = SyncRunCheckpoint.start_or_resume(datetime(2026, 1, 5, 4, 0))
+    assert checkpoint.run_id == 42
+    assert not checkpoint.resumed
+    assert any(sql.startswith("INSERT INTO sync_runs") for sql, _ in cnx.executed)
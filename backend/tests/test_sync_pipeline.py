@@ -0,0 +1,173 @@
+import asyncio
+import threading
+
+from app.libs.sync_pipeline import PipelineStage, SyncPipeline
+
+
+async def _items(values):
+    for value in values:
+        yield value
+
+
+def _run(pipeline, values):
+    asyncio.run(pipeline.run(_items(values)))
+
+
+def _collect_errors():
+    errors = []
+    return errors, lambda stage_name, item, err: errors.append((stage_name, item, str(err)))
+
+
+def test_items_pass_through_all_stages():
+    results = []
+
+    async def double(item):
+        return item * 2
+
+    def store(item):
+        results.append(item)
+
+    errors, on_error = _collect_errors()
+    pipeline = SyncPipeline([
+        PipelineStage("double", double, concurrency=3),
+        PipelineStage("store", store, concurrency=1, blocking=True),
+    ], on_error=on_error)
+    _run(pipeline, range(10))
+
+    assert sorted(results) == [i * 2 for i in range(10)]
+    assert errors == []
+    stats = pipeline.stats()
+    assert stats["double"]["processed"] == 10
+    assert stats["store"]["processed"] == 10
+    assert stats["store"]["in_flight"] == 0
+
+
+def test_none_finishes_an_item_early():
+    results = []
+
+    async def only_even(item):
+        return item if item % 2 == 0 else None
+
+    async def store(item):
+        results.append(item)
+
+    pipeline = SyncPipeline([
+        PipelineStage("filter", only_even, concurrency=2),
+        PipelineStage("store", store, concurrency=2),
+    ], on_error=_collect_errors()[1])
+    _run(pipeline, range(6))
+
+    assert sorted(results) == [0, 2, 4]
+    assert pipeline.stats()["store"]["processed"] == 3
+
+
+def test_handler_error_is_reported_and_the_item_dropped():
+    results = []
+
+    async def check(item):
+        if item == 3:
+            raise ValueError("broken payload")
+        return item
+
+    async def store(item):
+        results.append(item)
+
+    errors, on_error = _collect_errors()
+    pipeline = SyncPipeline([
+        PipelineStage("check", check, concurrency=1),
+        PipelineStage("store", store, concurrency=1),
+    ], on_error=on_error)
+    _run(pipeline, range(5))
+
+    assert errors == [("check", 3, "broken payload")]
+    assert sorted(results) == [0, 1, 2, 4]
+
+
+def test_slow_stage_throttles_the_source():
+    release = threading.Event()
+    stats = {}
+
+    def slow(item):
+        release.wait()
+
+    async def main():
+        pulled = []
+
+        async def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        async def fast(item):
+            return item
+
+        pipeline = SyncPipeline([
+            PipelineStage("fast", fast, concurrency=1, queue_size=2),
+            PipelineStage("slow", slow, concurrency=1, queue_size=2, blocking=True),
+        ], on_error=_collect_errors()[1])
+        run = asyncio.create_task(pipeline.run(source()))
+        await asyncio.sleep(0.2)
+        stats["pulled"] = len(pulled)
+        stats["pipeline"] = pipeline.stats()
+        release.set()
+        await run
+        stats["done"] = pipeline.stats()
+
+    asyncio.run(main())
+
+    # One item in the slow worker, two queued for it, one held by the fast
+    # worker, two queued for that and one waiting in the source's put()
+    assert stats["pulled"] <= 7
+    assert stats["pipeline"]["slow"]["queue_depth"] == 2
+    assert stats["pipeline"]["fast"]["queue_depth"] == 2
+    assert stats["done"]["slow"]["processed"] == 100
+
+
+def test_stages_stop_front_to_back_after_draining():
+    events = []
+
+    async def first(item):
+        await asyncio.sleep(0.01)
+        events.append(("first", item))
+        return item
+
+    def second(item):
+        events.append(("second", item))
+
+    pipeline = SyncPipeline([
+        PipelineStage("first", first, concurrency=2),
+        PipelineStage("second", second, concurrency=1, blocking=True),
+    ], on_error=_collect_errors()[1])
+    _run(pipeline, range(4))
+
+    assert sorted(item for stage, item in events if stage == "second") == [0, 1, 2, 3]
+    stats = pipeline.stats()
+    assert stats["first"]["queue_depth"] == 0
+    assert stats["second"]["queue_depth"] == 0
+    first_stop, second_stop = (stage._stopped_at for stage in pipeline.stages)
+    assert first_stop <= second_stop
+    # Blocking stages release their thread pool on shutdown
+    assert pipeline.stages[1]._executor is None
+
+
+def test_source_error_still_drains_the_stages():
+    results = []
+
+    async def source():
+        yield 1
+        yield 2
+        raise RuntimeError("list download failed")
+
+    async def store(item):
+        results.append(item)
+
+    pipeline = SyncPipeline([PipelineStage("store", store, concurrency=1)], on_error=_collect_errors()[1])
+
+    async def main():
+        try:
+            await pipeline.run(source())
+        except RuntimeError as err:
+            return str(err)
+
+    assert asyncio.run(main()) == "list download failed"
+    assert results == [1, 2]
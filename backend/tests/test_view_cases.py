@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.apis.view_cases as view_cases
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # The pool returns None once no connection became free within its checkout timeout
+    monkeypatch.setattr(view_cases, "get_mysql_connection", lambda *args: None)
+    app = FastAPI()
+    app.include_router(view_cases.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", [
+    "/cases",
+    "/repair-case/1",
+    "/export-repair-cases-csv",
+    "/export-old-repair-cases-excel",
+])
+def test_exhausted_pool_answers_503(client, path):
+    response = client.get(path)
+    assert response.status_code == 503
@@ -146,6 +146,12 @@ export namespace Brain {
       sortBy?: string | null;
       /** Sort direction: 'asc' or 'desc' */
       sortDirection?: string | null;
+      /** Comma-separated fields to return, e.g. 'caseNumber,status' (default: all) */
+      fields?: string | null;
+      /** next_cursor or prev_cursor of a previous response; replaces page */
+      cursor?: string | null;
+      /** Estimate total_count instead of counting (ignored with search) */
+      approximateCount?: boolean;
     };
     export type RequestBody = never;
     export type RequestHeaders = {};
@@ -23,7 +23,7 @@ export interface ExportOldCasesRequest {
 /** FilteredRepairCasesResponse */
 export interface FilteredRepairCasesResponse {
   /** Cases */
-  cases: RepairCaseDB[];
+  cases: RepairCaseListItem[];
   /** Total Count */
   total_count: number;
   /** Page */
@@ -32,6 +32,12 @@ export interface FilteredRepairCasesResponse {
   limit: number;
   /** Total Pages */
   total_pages: number;
+  /** Next Cursor */
+  next_cursor?: string | null;
+  /** Prev Cursor */
+  prev_cursor?: string | null;
+  /** Total Count Is Approximate */
+  total_count_is_approximate?: boolean;
 }
 
 /** HTTPValidationError */
@@ -116,6 +122,13 @@ export interface RepairCaseDB {
   totalRepairCost?: number | null;
 }
 
+/**
+ * RepairCaseListItem
+ * A /cases row: RepairCaseDB without the raw payload. Only the fields requested
+ * with `fields=` are present.
+ */
+export type RepairCaseListItem = Omit<RepairCaseDB, "rawApiDetail">;
+
 /** UserDetails */
 export interface UserDetails {
   /** Uid */
@@ -213,6 +226,12 @@ export interface GetCasesParams {
   sortBy?: string | null;
   /** Sort direction: 'asc' or 'desc' */
   sortDirection?: string | null;
+  /** Comma-separated fields to return, e.g. 'caseNumber,status' (default: all) */
+  fields?: string | null;
+  /** next_cursor or prev_cursor of a previous response; replaces page */
+  cursor?: string | null;
+  /** Estimate total_count instead of counting (ignored with search) */
+  approximateCount?: boolean;
 }
 
 export type GetCasesData = FilteredRepairCasesResponse;
@@ -253,6 +272,8 @@ export interface SyncStatusData {
     skipped_not_insurance: number;
     errors: number;
   };
+  /** Worker that runs (or last ran) the sync */
+  owner?: string | null;
 }
 
 export interface TestSingleSyncParams {
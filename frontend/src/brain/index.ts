@@ -75,4 +75,10 @@ const constructClient = () => {
 
 const brain = constructClient();
 
+// Absolute URL of an API route, for clients that cannot go through brain (e.g. EventSource)
+export const routeUrl = (path: string): string => {
+  const url = `${brain.baseUrl}${path}`;
+  return isDeployedToCustomApiPath ? url.replace(API_PREFIX_PATH + "/routes", API_PREFIX_PATH) : url;
+};
+
 export default brain;
@@ -1,7 +1,7 @@
 
 import React, { useEffect, useMemo, useState, useCallback, useRef } from "react";
-import brain from "brain";
-import type { RepairCaseDB, FilteredRepairCasesResponse, SyncStatusData } from "../brain/data-contracts";
+import brain, { routeUrl } from "brain";
+import type { RepairCaseListItem, FilteredRepairCasesResponse, SyncStatusData } from "../brain/data-contracts";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
@@ -55,12 +55,18 @@ const formatCurrency = (amount?: number | null) => {
   return new Intl.NumberFormat("de-DE", { style: "currency", currency: "EUR" }).format(amount);
 };
 
+// Columns the case table renders; /cases only selects and returns these
+const CASE_LIST_FIELDS: (keyof RepairCaseListItem)[] = [
+  "caseId", "caseNumber", "customerName", "productName", "status",
+  "insuranceName", "insuranceContractNumber", "lastApiUpdate",
+];
+
 // Type for sort direction
 type SortDirection = "ascending" | "descending";
 
 // Interface for sort configuration
 interface SortConfig {
-  key: keyof RepairCaseDB | null;
+  key: keyof RepairCaseListItem | null;
   direction: SortDirection;
 }
 
@@ -87,7 +93,7 @@ const timeRangeOptions: TimeRangeOption[] = [
 ];
 
 export default function DashboardPage() {
-  const [cases, setCases] = useState<RepairCaseDB[]>([]);
+  const [cases, setCases] = useState<RepairCaseListItem[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [totalCount, setTotalCount] = useState<number>(0);
@@ -111,7 +117,7 @@ export default function DashboardPage() {
   const [currentPage, setCurrentPage] = useState<number>(1);
   const [pageSize, setPageSize] = useState<number>(50);
   const [totalPages, setTotalPages] = useState<number>(1);
-  const syncStatusIntervalRef = useRef<NodeJS.Timeout | null>(null);
+  const [syncFinishedAt, setSyncFinishedAt] = useState<number | null>(null);
   const isSyncInProgressRef = useRef<boolean>(false);
   const syncStartTimeRef = useRef<number | null>(null); // Track when we optimistically started sync
 
@@ -126,160 +132,81 @@ export default function DashboardPage() {
     return () => clearTimeout(timer);
   }, [searchTerm]);
 
-  // Poll sync status when sync is running
-  useEffect(() => {
-    const checkSyncStatus = async () => {
-      try {
-        const response = await brain.get_sync_status();
-        if (response.ok && response.data) {
-          const status = response.data;
-          setSyncStatus(status);
-          setIsSyncing(status.is_running);
-          isSyncInProgressRef.current = status.is_running;
-          
-          // If sync finished, refresh cases and stop polling
-          if (!status.is_running) {
-            if (syncStatusIntervalRef.current) {
-              clearInterval(syncStatusIntervalRef.current);
-              syncStatusIntervalRef.current = null;
-            }
-            isSyncInProgressRef.current = false;
-            // Refresh cases after sync completes
-            setTimeout(() => {
-              fetchCases(selectedInsurance, currentPage);
-            }, 1000);
-          }
-        }
-      } catch (error) {
-        console.error("Error checking sync status:", error);
-        // On error, assume sync is not running
-        setIsSyncing(false);
-        isSyncInProgressRef.current = false;
-        if (syncStatusIntervalRef.current) {
-          clearInterval(syncStatusIntervalRef.current);
-          syncStatusIntervalRef.current = null;
-        }
-      }
-    };
+  // Applies a sync status received from the backend.
+  // Only uses refs and state setters, so the long-lived event stream can call it.
+  // A final status (the stream's summary event) is applied even during the optimistic start window.
+  const applySyncStatus = useCallback((status: SyncStatusData, final: boolean = false) => {
+    const wasRunning = isSyncInProgressRef.current;
 
-    // Check immediately if we think sync is running or if we have sync status
-    if (isSyncing || syncStatus?.is_running) {
-      checkSyncStatus();
-      // Poll every 2 seconds while syncing
-      if (!syncStatusIntervalRef.current) {
-        syncStatusIntervalRef.current = setInterval(checkSyncStatus, 2000);
-      }
+    // If we optimistically started a sync within the last 10 seconds,
+    // don't clear the state even if backend says it's not running yet
+    // This handles the race condition where backend hasn't started yet
+    const recentlyStarted = syncStartTimeRef.current !== null && Date.now() - syncStartTimeRef.current < 10000;
+
+    if (status.is_running) {
+      // Backend confirms sync is running - clear the optimistic start time
+      syncStartTimeRef.current = null;
+      setRecentlyStartedSync(false);
+    } else if (recentlyStarted && wasRunning && !final) {
+      // Backend says not running, but we just started it - keep optimistic state
+      // so the progress bar stays visible
+      setSyncStatus(status);
+      return;
     }
 
-    return () => {
-      if (syncStatusIntervalRef.current) {
-        clearInterval(syncStatusIntervalRef.current);
-        syncStatusIntervalRef.current = null;
-      }
-    };
-  }, [isSyncing, selectedInsurance, currentPage, syncStatus?.is_running]);
+    setSyncStatus(status);
+    setIsSyncing(status.is_running);
+    isSyncInProgressRef.current = status.is_running;
 
-  // Helper function to check sync status and start polling if needed
-  // This function is non-destructive - it only updates status, never clears it unless backend confirms sync is done
-  const checkSyncStatusAndStartPolling = useCallback(async () => {
+    if (wasRunning && !status.is_running) {
+      syncStartTimeRef.current = null;
+      setRecentlyStartedSync(false);
+      // Refresh cases after sync completes
+      setSyncFinishedAt(Date.now());
+    }
+  }, []);
+
+  // One-off status check, e.g. on manual refresh. Progress updates come from the event stream.
+  const checkSyncStatus = useCallback(async () => {
     try {
       const response = await brain.get_sync_status();
       if (response.ok && response.data) {
-        const status = response.data;
-        
-        // If we optimistically started a sync recently (within last 10 seconds), 
-        // don't clear the state even if backend says it's not running yet
-        // This handles the race condition where backend hasn't started yet
-        // Use state flag instead of time check for more reliable UI updates
-        const recentlyStarted = recentlyStartedSync;
-        
-        if (status.is_running) {
-          // Backend confirms sync is running - clear the optimistic start time
-          syncStartTimeRef.current = null;
-          setRecentlyStartedSync(false); // Clear the flag since backend confirmed
-        } else if (recentlyStarted && isSyncInProgressRef.current) {
-          // Backend says not running, but we just started it - keep optimistic state
-          // Update sync status but keep isSyncing true
-          setSyncStatus(status);
-          // Don't clear isSyncing or isSyncInProgressRef - keep them true
-          // Keep recentlyStartedSync true to maintain progress bar visibility
-          // This ensures progress bar stays visible
-          return;
-        }
-        
-        // Always update sync status with latest data from backend
-        setSyncStatus(status);
-        setIsSyncing(status.is_running);
-        isSyncInProgressRef.current = status.is_running;
-        
-        // Start polling if sync is running and we're not already polling
-        if (status.is_running && !syncStatusIntervalRef.current) {
-          syncStatusIntervalRef.current = setInterval(async () => {
-            const pollResponse = await brain.get_sync_status();
-            if (pollResponse.ok && pollResponse.data) {
-              const pollStatus = pollResponse.data;
-              setSyncStatus(pollStatus);
-              setIsSyncing(pollStatus.is_running);
-              isSyncInProgressRef.current = pollStatus.is_running;
-              if (!pollStatus.is_running) {
-                if (syncStatusIntervalRef.current) {
-                  clearInterval(syncStatusIntervalRef.current);
-                  syncStatusIntervalRef.current = null;
-                }
-                isSyncInProgressRef.current = false;
-                syncStartTimeRef.current = null; // Clear optimistic start time
-                setRecentlyStartedSync(false); // Clear the flag
-                // Refresh cases after sync completes - use current state values
-                setTimeout(() => {
-                  // Use a function to get current values at execution time
-                  const currentInsurance = selectedInsurance;
-                  const currentPageNum = currentPage;
-                  fetchCases(currentInsurance, currentPageNum);
-                }, 1000);
-              }
-            }
-          }, 2000);
-        } else if (!status.is_running && syncStatusIntervalRef.current && !recentlyStarted) {
-          // Only stop polling if backend explicitly says sync is not running
-          // AND we haven't just started it optimistically
-          clearInterval(syncStatusIntervalRef.current);
-          syncStatusIntervalRef.current = null;
-          isSyncInProgressRef.current = false;
-          syncStartTimeRef.current = null;
-          setRecentlyStartedSync(false); // Clear the flag
-        }
-        // If sync is not running and we're not polling, that's fine - just don't clear existing state
-        // This prevents the progress bar from disappearing during data fetches
+        applySyncStatus(response.data);
       }
     } catch (error) {
       console.error("Error checking sync status:", error);
-      // On error, don't clear sync status - just log the error
-      // This prevents the progress bar from disappearing due to network issues
-      // Only clear if we're certain sync is not running (which we can't be on error)
+      // On error, don't clear sync status - the event stream delivers the next update
     }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [selectedInsurance, currentPage]);
+  }, [applySyncStatus]);
+
+  // Receive sync progress as server-sent events instead of polling /sync-status.
+  // The stream sends the current status on connect and the browser reconnects on its own.
+  useEffect(() => {
+    const events = new EventSource(routeUrl("/routes/sync-events"));
+    events.addEventListener("status", (event) => {
+      applySyncStatus(JSON.parse((event as MessageEvent).data));
+    });
+    events.addEventListener("summary", (event) => {
+      applySyncStatus(JSON.parse((event as MessageEvent).data), true);
+    });
+    events.onerror = () => {
+      console.warn("Sync event stream interrupted, reconnecting...");
+    };
+    return () => events.close();
+  }, [applySyncStatus]);
 
-  // Check sync status on mount to see if a sync is already running
+  // Refresh cases after a sync completes
   useEffect(() => {
-    checkSyncStatusAndStartPolling();
-  }, [checkSyncStatusAndStartPolling]);
+    if (syncFinishedAt !== null) {
+      fetchCases(selectedInsurance, currentPage);
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [syncFinishedAt]);
 
   const fetchCases = async (insuranceFilter: string | null = null, page: number = 1) => {
     setLoading(true);
     setError(null);
 
-    // Always check sync status when fetching cases to see if a sync is running globally
-    // Do this asynchronously so it doesn't block the data fetch
-    // But only if we're not in the grace period after starting a sync
-    // Use state flag instead of ref for reliable UI updates
-    if (!recentlyStartedSync) {
-      checkSyncStatusAndStartPolling().catch(err => {
-        console.error("Error checking sync status during fetch:", err);
-        // Don't let sync status check errors affect data fetching
-      });
-    }
-
     try {
       const filterToUse = insuranceFilter !== null ? insuranceFilter : selectedInsurance;
       const apiFilterValue = filterToUse === "_ALL_INSURANCES_" ? null : filterToUse;
@@ -289,9 +216,10 @@ export default function DashboardPage() {
         ? timeRangeOptions.find(opt => opt.value === selectedTimeRange)?.months || null
         : null;
 
-      // Get sort field and direction
-      const sortBy: string = sortConfig.key || "lastApiUpdate";
-      const sortDirection = sortConfig.direction === "ascending" ? "asc" : "desc";
+      // Get sort field and direction. Without a chosen column, searches are ranked by relevance.
+      const rankByRelevance = sortConfig.key === null && debouncedSearchTerm.trim() !== "";
+      const sortBy: string = sortConfig.key || (rankByRelevance ? "relevance" : "lastApiUpdate");
+      const sortDirection = rankByRelevance || sortConfig.direction !== "ascending" ? "desc" : "asc";
 
       console.log(`[Dashboard.tsx] Fetching cases with filter: ${apiFilterValue || '(all)'}, page: ${page}, limit: ${pageSize}`);
 
@@ -303,7 +231,8 @@ export default function DashboardPage() {
         showActiveOnly: showActiveOnly,
         timeRangeMonths: timeRangeMonths,
         sortBy: sortBy,
-        sortDirection: sortDirection
+        sortDirection: sortDirection,
+        fields: CASE_LIST_FIELDS.join(",")
       });
 
       if (!response.ok) {
@@ -364,7 +293,7 @@ export default function DashboardPage() {
   // We just use the cases directly from the API
   const filteredAndSortedCases = cases;
 
-  const requestSort = useCallback((key: keyof RepairCaseDB) => {
+  const requestSort = useCallback((key: keyof RepairCaseListItem) => {
     setSortConfig(current => {
       if (current.key === key) {
         const newDirection = current.direction === "ascending" ? "descending" : "ascending";
@@ -505,9 +434,12 @@ export default function DashboardPage() {
     // Clear the flag after grace period (10 seconds) as a safety measure
     // This ensures it doesn't stay true forever if something goes wrong
     setTimeout(() => {
-      // Only clear if backend hasn't confirmed sync is running
-      if (!syncStatus?.is_running && !isSyncing) {
+      // Only clear if backend hasn't confirmed sync is running, and check again
+      // in case the run already ended during the grace period
+      if (syncStartTimeRef.current !== null) {
+        syncStartTimeRef.current = null;
         setRecentlyStartedSync(false);
+        checkSyncStatus();
       }
     }, 10000);
     
@@ -573,7 +505,7 @@ export default function DashboardPage() {
       syncStartTimeRef.current = null;
       setRecentlyStartedSync(false);
     }
-  }, [canStartSync]);
+  }, [canStartSync, checkSyncStatus]);
 
   // Toggle theme
   const toggleTheme = useCallback(() => {
@@ -617,7 +549,7 @@ export default function DashboardPage() {
               <Button
                 onClick={async () => {
                   // Check sync status first, then refresh cases
-                  await checkSyncStatusAndStartPolling();
+                  await checkSyncStatus();
                   fetchCases(selectedInsurance, currentPage);
                 }}
                 disabled={loading}
@@ -700,7 +632,7 @@ export default function DashboardPage() {
             <div className="lg:hidden mt-4 p-4 bg-white dark:bg-slate-800 rounded-lg shadow-lg border border-gray-200 dark:border-slate-700">
               <div className="flex flex-col space-y-2">
                 <Button onClick={async () => {
-                  await checkSyncStatusAndStartPolling();
+                  await checkSyncStatus();
                   fetchCases(selectedInsurance, currentPage);
                 }} disabled={loading} variant="ghost" className="justify-start text-gray-700 dark:text-gray-200">
                   <RefreshCw className={`mr-2 h-4 w-4 ${loading ? "animate-spin" : ""}`} />
@@ -918,7 +850,7 @@ export default function DashboardPage() {
                       </p>
                       <div className="mt-4 flex flex-wrap items-center gap-2">
                         <Button onClick={async () => {
-                          await checkSyncStatusAndStartPolling();
+                          await checkSyncStatus();
                           fetchCases(selectedInsurance, currentPage);
                         }} disabled={loading}>
                           <RefreshCw className={`mr-2 h-4 w-4 ${loading ? 'animate-spin' : ''}`} />